@@ -0,0 +1,379 @@
+# FILE: asset_bundler.py
+#
+# 功能: 导出时把每种格式的前端资源合并、压缩为少数几个文件。
+#       - CSS: 展开 @import (包括共享的 hotspot-enhancer.css)，改写其中的相对 url()，合并为一个样式表。
+#       - JS : 把 ES 模块 (main.js 及其 import 的模块) 按依赖顺序合并为一个脚本，每个模块保留独立作用域。
+#       文件名带内容摘要 (如 bundles/flip.3f2a9c1d0b.css)，内容不变时文件名不变，
+#       静态服务器可以对它们设置长期缓存，画册更新后文件名随之变化，浏览器自然会取新版本。
+#       遇到不支持的模块语法时放弃合并，入口页面继续引用未合并的原始文件。
+
+import hashlib
+import os
+import re
+
+from PySide6.QtCore import QSettings
+
+from export_cache import write_text_if_changed
+
+# 合并后的资源存放在导出目录下的这个子目录中
+BUNDLE_DIR_NAME = "bundles"
+# 文件名中内容摘要的长度
+HASH_LENGTH = 10
+
+
+class BundleError(Exception):
+    """资源无法合并 (例如使用了不支持的模块语法)。调用方应退回到未合并的原始文件。"""
+
+
+def is_bundling_enabled() -> bool:
+    return QSettings("MyCompany", "HotspotEditor").value("export/bundle_assets", True, type=bool)
+
+
+# --- 压缩 ---
+
+_CSS_TIGHT = set('{};,')
+
+
+def minify_css(text: str) -> str:
+    """删除注释和多余空白。字符串内容原样保留。"""
+    out = []
+    pending_space = False
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c.isspace():
+            pending_space = True
+            i += 1
+            continue
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            pending_space = True
+            continue
+        if pending_space and out and out[-1][-1] not in _CSS_TIGHT and c not in _CSS_TIGHT:
+            out.append(' ')
+        pending_space = False
+        if c in '"\'':
+            end = _skip_quoted(text, i)
+            out.append(text[i:end])
+            i = end
+            continue
+        if c == '}' and out and out[-1] == ';':
+            out.pop()  # 规则块最后一条声明的分号可以省略
+        out.append(c)
+        i += 1
+    return ''.join(out)
+
+
+# 空白两侧出现这些字符时可以删除该空白 (不包括 + - / .，避免 "a + +b"、除号与正则等歧义)
+_JS_TIGHT = set('{}()[];,:=<>*%&|!?~^')
+# 这些字符之后的换行不会影响自动分号插入 (ASI)，可以删除
+_JS_NEWLINE_DROPPABLE = set('{;,([')
+# 出现在这些字符或关键字之后的 "/" 是正则表达式的开始，而不是除号
+_JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+                      "void", "throw", "instanceof", "yield", "await"}
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c in '_$'
+
+
+def _skip_quoted(text: str, start: int) -> int:
+    """返回从 start 处的引号开始的字符串字面量之后的位置。"""
+    quote = text[start]
+    i = start + 1
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+            continue
+        if text[i] == quote:
+            return i + 1
+        i += 1
+    raise BundleError("字符串没有结束")
+
+
+def _skip_template(text: str, start: int) -> int:
+    """返回从 start 处的反引号开始的模板字符串之后的位置 (处理 ${...} 中嵌套的字符串和模板)。"""
+    i = start + 1
+    while i < len(text):
+        c = text[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif text.startswith('${', i):
+            i += 2
+            depth = 1
+            while depth:
+                if i >= len(text):
+                    raise BundleError("模板字符串没有结束")
+                c = text[i]
+                if c in '"\'':
+                    i = _skip_quoted(text, i)
+                    continue
+                if c == '`':
+                    i = _skip_template(text, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(c, 0)
+                i += 1
+        else:
+            i += 1
+    raise BundleError("模板字符串没有结束")
+
+
+def _skip_regex(text: str, start: int) -> int:
+    """返回从 start 处的 "/" 开始的正则表达式字面量 (包括标志) 之后的位置。"""
+    i = start + 1
+    in_class = False
+    while i < len(text):
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            break
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < len(text) and _is_word_char(text[i]):
+                i += 1
+            return i
+        i += 1
+    raise BundleError("正则表达式没有结束")
+
+
+def minify_js(text: str) -> str:
+    """
+    保守的 JS 压缩: 删除注释、缩进和空行，合并多余空白。
+
+    不改写标识符，也不删除可能影响自动分号插入的换行，因此不依赖源码中的分号风格。
+    """
+    out = []
+    pending = ''  # 待输出的空白: '' / ' ' / '\n'
+    last_char = ''  # 最近输出的非空白字符
+    last_word = ''  # 最近输出的标识符或关键字
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c.isspace():
+            pending = '\n' if c == '\n' or pending == '\n' else ' '
+            i += 1
+            continue
+        if text.startswith('//', i):
+            end = text.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            if end == -1:
+                raise BundleError("注释没有结束")
+            pending = '\n' if '\n' in text[i:end] or pending == '\n' else (pending or ' ')
+            i = end + 2
+            continue
+
+        if pending and out:
+            if pending == '\n' and last_char not in _JS_NEWLINE_DROPPABLE:
+                out.append('\n')
+            elif pending == ' ' and last_char not in _JS_TIGHT and c not in _JS_TIGHT:
+                out.append(' ')
+        pending = ''
+
+        if c in '"\'':
+            end = _skip_quoted(text, i)
+        elif c == '`':
+            end = _skip_template(text, i)
+        elif c == '/' and (not last_char or last_char in _JS_REGEX_PRECEDERS
+                           or (_is_word_char(last_char) and last_word in _JS_REGEX_KEYWORDS)):
+            end = _skip_regex(text, i)
+        elif _is_word_char(c):
+            end = i + 1
+            while end < n and _is_word_char(text[end]):
+                end += 1
+            last_word = text[i:end]
+        else:
+            end = i + 1
+        out.append(text[i:end])
+        last_char = text[end - 1]
+        i = end
+    return ''.join(out).strip()
+
+
+# --- CSS 合并 ---
+
+_CSS_IMPORT = re.compile(r'@import\s+(?:url\(\s*)?([\'"])(.+?)\1\s*\)?\s*([^;]*);')
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def _is_relative_url(url: str) -> bool:
+    return not re.match(r'^(?:[a-z][a-z0-9+.-]*:|/|#)', url, re.IGNORECASE)
+
+
+def _inline_css(path: str, bundle_dir: str, seen: set) -> str:
+    path = os.path.normpath(path)
+    if path in seen:
+        return ''  # 同一文件只包含一次
+    seen.add(path)
+    css_dir = os.path.dirname(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    def rewrite_url(match):
+        quote, url = match.group(1), match.group(2).strip()
+        if not _is_relative_url(url):
+            return match.group(0)
+        target = os.path.relpath(os.path.normpath(os.path.join(css_dir, url)), bundle_dir)
+        return f"url({quote}{target.replace(os.sep, '/')}{quote})"
+
+    def inline_import(match):
+        url, media = match.group(2), match.group(3).strip()
+        if not _is_relative_url(url):
+            return match.group(0)
+        imported = _inline_css(os.path.join(css_dir, url), bundle_dir, seen)
+        return f"@media {media}{{{imported}}}" if media else imported
+
+    # 先展开 @import (被导入文件中的 url() 由递归调用负责改写)，再改写本文件自己的 url()
+    parts = []
+    position = 0
+    for match in _CSS_IMPORT.finditer(text):
+        parts.append(_CSS_URL.sub(rewrite_url, text[position:match.start()]))
+        parts.append(inline_import(match))
+        position = match.end()
+    parts.append(_CSS_URL.sub(rewrite_url, text[position:]))
+    return ''.join(parts)
+
+
+def bundle_css(entry_paths, bundle_dir: str) -> str:
+    """按顺序合并多个样式表 (展开其中的 @import)，url() 改写为相对于 bundle_dir 的路径。"""
+    seen = set()
+    return '\n'.join(_inline_css(path, bundle_dir, seen) for path in entry_paths)
+
+
+# --- ES 模块合并 ---
+
+_JS_IMPORT = re.compile(r'^[ \t]*import\s*\{([^}]*)\}\s*from\s*([\'"])(.+?)\2[ \t]*;?', re.MULTILINE)
+_JS_EXPORT = re.compile(r'^([ \t]*)export\s+((?:async\s+)?function\*?\s*([A-Za-z_$][\w$]*)|const\s+([A-Za-z_$][\w$]*))',
+                        re.MULTILINE)
+# 其余形式 (export default、export {...}、export let、import * as、动态 import() 等) 均不支持
+_JS_UNSUPPORTED = re.compile(r'^[ \t]*(?:export|import)\b|\bimport\s*\(', re.MULTILINE)
+
+
+class _Module:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        self.imports = []  # [(依赖模块路径, "a, b: c"), ...]
+        self.exports = []
+
+        def take_import(match):
+            names = [name.strip() for name in match.group(1).split(',') if name.strip()]
+            bindings = ', '.join(re.sub(r'\s+as\s+', ': ', name) for name in names)
+            self.imports.append((os.path.normpath(os.path.join(os.path.dirname(path), match.group(3))), bindings))
+            return ''
+
+        def take_export(match):
+            self.exports.append(match.group(3) or match.group(4))
+            return match.group(1) + match.group(2)
+
+        source = _JS_IMPORT.sub(take_import, source)
+        source = _JS_EXPORT.sub(take_export, source)
+        if _JS_UNSUPPORTED.search(source):
+            raise BundleError(f"{os.path.basename(path)} 使用了不支持的模块语法")
+        self.body = source
+
+
+def bundle_es_modules(entry_path: str) -> str:
+    """
+    把入口模块及其依赖合并为一个脚本。
+
+    每个模块包装在独立的函数作用域中，按依赖顺序执行，导出的绑定以解构的方式传给依赖它的模块。
+    只支持 "export function / export const" 和 "import { ... } from './x.js'" 这两种形式
+    (导出的都是不可重新赋值的绑定，解构后与原来的实时绑定行为相同)；不支持循环依赖。
+    """
+    modules = {}  # 路径 -> _Module，按依赖顺序 (被依赖的模块在前)
+    visiting = set()
+
+    def visit(path):
+        if path in modules:
+            return
+        if path in visiting:
+            raise BundleError(f"{os.path.basename(path)} 存在循环依赖")
+        visiting.add(path)
+        module = _Module(path)
+        for dependency, _ in module.imports:
+            visit(dependency)
+        visiting.discard(path)
+        modules[path] = module
+
+    visit(os.path.normpath(entry_path))
+
+    variables = {path: f"__module{index}" for index, path in enumerate(modules)}
+    chunks = []
+    for path, module in modules.items():
+        lines = [f"const {{ {bindings} }} = {variables[dependency]};" for dependency, bindings in module.imports]
+        lines.append(module.body)
+        if module.exports:
+            lines.append(f"return {{ {', '.join(module.exports)} }};")
+        chunks.append(f"const {variables[path]} = (() => {{\n" + '\n'.join(lines) + "\n})();")
+    return '\n'.join(chunks)
+
+
+# --- 输出 ---
+
+def write_hashed_bundle(bundle_dir: str, name: str, extension: str, content: str) -> str:
+    """
+    把内容写入 bundle_dir/<name>.<摘要><extension>，并删除同名的旧版本。返回文件名。
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+    digest = hashlib.sha1(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    filename = f"{name}.{digest}{extension}"
+    write_text_if_changed(os.path.join(bundle_dir, filename), content)
+    remove_stale_bundles(bundle_dir, name, extension, keep=filename)
+    return filename
+
+
+def remove_stale_bundles(bundle_dir: str, name: str, extension: str, keep: str = None):
+    if not os.path.isdir(bundle_dir):
+        return
+    pattern = re.compile(re.escape(name) + r'\.[0-9a-f]{%d}' % HASH_LENGTH + re.escape(extension) + '$')
+    for filename in os.listdir(bundle_dir):
+        if filename != keep and pattern.match(filename):
+            os.remove(os.path.join(bundle_dir, filename))
+
+
+def build_format_bundle(project_path: str, name: str, css_entries, js_entry: str, js_is_module: bool = True):
+    """
+    为一种导出格式生成合并后的 CSS 与 JS (路径均为导出目录中已复制好的文件)。
+
+    Args:
+        name (str): 格式名，用作文件名前缀 (如 "flip")。
+        css_entries (list): 按引用顺序排列的样式表。
+        js_entry (str): 入口脚本。js_is_module 为 False 时它是普通脚本，只做压缩。
+
+    Returns:
+        dict | None: 作为 "asset_bundle" 传给 index 模板，包含 css / js 两个相对路径。
+                     关闭了合并或无法合并时返回 None，模板继续引用原始文件。
+    """
+    bundle_dir = os.path.join(project_path, BUNDLE_DIR_NAME)
+    if not is_bundling_enabled():
+        for extension in (".css", ".js"):
+            remove_stale_bundles(bundle_dir, name, extension)
+        return None
+    try:
+        css = minify_css(bundle_css(css_entries, bundle_dir))
+        if js_is_module:
+            js = minify_js(bundle_es_modules(js_entry))
+        else:
+            with open(js_entry, 'r', encoding='utf-8') as f:
+                js = minify_js(f.read())
+    except (BundleError, OSError, UnicodeDecodeError) as e:
+        print(f"Warning: 无法合并前端资源 ({name})，使用未合并的文件。{e}")
+        return None
+    return {
+        "css": f"{BUNDLE_DIR_NAME}/{write_hashed_bundle(bundle_dir, name, '.css', css)}",
+        "js": f"{BUNDLE_DIR_NAME}/{write_hashed_bundle(bundle_dir, name, '.js', js)}",
+    }
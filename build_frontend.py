@@ -0,0 +1,108 @@
+# FILE: build_frontend.py
+#
+# 功能: 开发时使用的前端构建脚本。
+#       把 templates/shared_assets/js/hotspot-enhancer.js (JSX) 预编译并压缩为
+#       普通 JavaScript (hotspot-enhancer.min.js)，导出的网页因此不再需要在
+#       读者的浏览器中加载 Babel 并实时转译。
+#
+# 用法: 修改 hotspot-enhancer.js 后运行
+#           python build_frontend.py
+#       需要 Node.js；编译使用项目自带的 js/babel.min.js，不需要联网安装依赖。
+#       编译结果需要与源文件一起提交。
+#
+#       python build_frontend.py --vendor-react
+#       通过 npm 下载与 js/ 中 development 构建同版本的 React production UMD 构建并放入 js/
+#       (需要联网)。仓库中已附带当前版本的 production 构建，只在升级 React 时需要运行，结果需要提交。
+
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+import frontend_assets
+
+# 在 Node 中执行的编译脚本。
+# 预设与插件和 Babel standalone 处理 <script type="text/babel"> 时的默认值一致，
+# 以保证预编译结果与浏览器中实时转译的行为相同。
+_NODE_COMPILE_SCRIPT = r"""
+const fs = require('fs');
+const [babelPath, sourcePath] = process.argv.slice(1);
+const Babel = require(babelPath);
+const source = fs.readFileSync(sourcePath, 'utf8');
+const result = Babel.transform(source, {
+  presets: ['react', 'env'],
+  plugins: ['transform-class-properties', 'transform-object-rest-spread', 'transform-flow-strip-types'],
+  sourceType: 'script',
+  comments: false,
+  compact: true,
+  minified: true,
+});
+process.stdout.write(result.code);
+"""
+
+
+def compile_hotspot_enhancer() -> str:
+    """编译 hotspot-enhancer.js，返回输出文件路径。失败时抛出 RuntimeError。"""
+    babel_path = os.path.join(frontend_assets.JS_LIBRARY_DIR, "babel.min.js")
+    try:
+        completed = subprocess.run(
+            ["node", "-e", _NODE_COMPILE_SCRIPT, babel_path, frontend_assets.ENHANCER_SOURCE_PATH],
+            capture_output=True, text=True, encoding="utf-8", check=True
+        )
+    except FileNotFoundError:
+        raise RuntimeError("未找到 Node.js，请先安装 Node.js 再运行此脚本。")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"编译 hotspot-enhancer.js 失败:\n{e.stderr}")
+
+    source_digest = frontend_assets.enhancer_source_digest()
+    # 整个文件包在一个函数作用域中，Babel 生成的辅助函数不会泄漏到全局
+    header = (f"/* hotspot-enhancer.js 的预编译版本，请勿手动修改。修改源文件后运行 build_frontend.py。\n"
+              f"   {frontend_assets.SOURCE_DIGEST_MARKER}{source_digest} */\n")
+    with open(frontend_assets.ENHANCER_COMPILED_PATH, "w", encoding="utf-8", newline="\n") as f:
+        f.write(header + "(function(){" + completed.stdout + "})();\n")
+    return frontend_assets.ENHANCER_COMPILED_PATH
+
+
+def vendor_react_production_builds() -> list:
+    """
+    用 npm pack 下载 React / ReactDOM 的包，取出其中的 production UMD 构建并复制到 js/。
+    返回写入的文件路径。失败时抛出 RuntimeError。
+    """
+    written = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for package_name, production_name, _ in frontend_assets.REACT_BUILDS:
+            spec = f"{package_name}@{frontend_assets.REACT_VERSION}"
+            try:
+                completed = subprocess.run(
+                    ["npm", "pack", spec, "--silent", "--pack-destination", temp_dir],
+                    capture_output=True, text=True, encoding="utf-8", check=True, shell=sys.platform == "win32"
+                )
+            except FileNotFoundError:
+                raise RuntimeError("未找到 npm，请先安装 Node.js 再运行此脚本。")
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError(f"下载 {spec} 失败:\n{e.stderr}")
+            tarball = os.path.join(temp_dir, completed.stdout.strip().splitlines()[-1])
+            try:
+                with tarfile.open(tarball) as archive:
+                    content = archive.extractfile(f"package/umd/{production_name}").read()
+            except (KeyError, AttributeError, tarfile.TarError) as e:
+                raise RuntimeError(f"无法从 {spec} 中取出 umd/{production_name}: {e}")
+            output_path = os.path.join(frontend_assets.JS_LIBRARY_DIR, production_name)
+            with open(output_path, "wb") as f:
+                f.write(content)
+            written.append(output_path)
+    return written
+
+
+if __name__ == "__main__":
+    try:
+        if "--vendor-react" in sys.argv[1:]:
+            outputs = vendor_react_production_builds()
+        else:
+            outputs = [compile_hotspot_enhancer()]
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    print(json.dumps([{"output": path, "bytes": os.path.getsize(path)} for path in outputs], ensure_ascii=False))
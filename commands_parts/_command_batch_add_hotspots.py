@@ -21,28 +21,43 @@ class BatchAddHotspotsCommand(QUndoCommand):
     用于撤销/重做批量添加热区操作的命令。
     """
 
-    def __init__(self, scene, viewer, main_window, hotspots_data, parent=None):
+    def __init__(self, scene, viewer, main_window, hotspots_data, parent=None, session=None):
         """
         初始化批量添加命令。
 
         Args:
-            scene (QGraphicsScene): 目标场景。
+            scene (QGraphicsScene): 目标场景。为 None 时表示页面的场景尚未创建 (需同时传入 session)，
+                热区数据会被追加到 session.pending_hotspots_data，场景创建时再生成热区项。
             viewer (PhotoViewer): 关联的视图。
             main_window (HotspotEditor): 主窗口实例。
             hotspots_data (list): 包含要添加的热区信息的字典列表。
             parent (QUndoCommand, optional): 父命令。
+            session (ImageEditingSession, optional): 目标页面。尚未显示过的页面没有 viewer，
+                批量处理多个页面时需要显式传入；为 None 时根据 viewer 查找。
         """
         super().__init__("批量导入热区", parent)
         self.scene = scene
         self.viewer = viewer
         self.main_window = main_window
         self.hotspots_data = hotspots_data
+        self.session = session
         self.added_items = []  # 用于存储此命令创建的图形项
+        self.pending_entries = []  # 场景尚未创建时，追加到 pending_hotspots_data 中的热区数据
+
+    def _target_scene(self):
+        """当前应操作的场景: 构造时传入的场景，或页面在此期间已创建的场景；都没有时返回 None。"""
+        if self.scene is None and self.session is not None and self.session.has_scene():
+            self.scene = self.session.scene
+        return self.scene
 
     def undo(self):
         """
         撤销操作：从场景中移除所有由此命令添加的热区项。
         """
+        if self.pending_entries:
+            self._undo_pending_entries()
+            return
+
         for item in self.added_items:
             self.scene.removeItem(item)
         # 清空列表，以便在重做时能重新创建它们
@@ -53,6 +68,23 @@ class BatchAddHotspotsCommand(QUndoCommand):
         if self.scene:
             self.scene.selectionChanged.emit()
 
+    def _undo_pending_entries(self):
+        """撤销追加到 pending_hotspots_data 中的热区。若页面此后已创建场景，则移除对应的热区项。"""
+        if self._target_scene() is None:
+            entry_ids = {id(entry) for entry in self.pending_entries}
+            self.session.pending_hotspots_data = [entry for entry in self.session.pending_hotspots_data
+                                                  if id(entry) not in entry_ids]
+            return
+        # 场景创建时热区数据已变为热区项: 按热区ID找到它们，之后的重做直接把这些项放回场景
+        hotspot_ids = {entry['data']['id'] for entry in self.pending_entries}
+        self.added_items = [item for item in self.scene.items()
+                            if item.data(0) and isinstance(item.data(0), dict)
+                            and item.data(0).get('id') in hotspot_ids]
+        self.pending_entries = []
+        for item in self.added_items:
+            self.scene.removeItem(item)
+        self.scene.selectionChanged.emit()
+
     def redo(self):
         """
         重做或首次执行操作：在场景中创建并添加所有热区项。
@@ -67,12 +99,24 @@ class BatchAddHotspotsCommand(QUndoCommand):
                 self.scene.selectionChanged.emit()
             return
 
-        # 如果是首次执行或撤销后重做
-        bounds = self.scene.sceneRect()
-        session = self.main_window.get_session_by_viewer(self.viewer)
+        session = self.session or self.main_window.get_session_by_viewer(self.viewer)
         if not session:
             return
 
+        # 页面的场景尚未创建 (按需加载且从未显示过): 只追加热区数据，不为此创建场景
+        if self._target_scene() is None:
+            if not self.pending_entries:
+                for hotspot_info in self.hotspots_data:
+                    item_data = hotspot_info['data']
+                    item_data['id'] = self.main_window.generate_new_hotspot_id(session)
+                    self.pending_entries.append({'type': hotspot_info['type'], 'pos': hotspot_info['pos'],
+                                                 'rect': hotspot_info['rect'], 'data': item_data})
+            session.pending_hotspots_data.extend(self.pending_entries)
+            return
+
+        # 如果是首次执行或撤销后重做
+        bounds = self.scene.sceneRect()
+
         for hotspot_info in self.hotspots_data:
             # 确定要创建的形状类型
             shape_class = ResizableEllipseItem if hotspot_info['type'] == 'ellipse' else ResizableRectItem
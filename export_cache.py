@@ -0,0 +1,233 @@
+# FILE: export_cache.py
+#
+# 功能: 增量导出。
+#       在输出目录中记录每个生成文件的“输入摘要” (页面热区、图片内容、模板版本等)，
+#       再次导出时只重写输入发生变化的文件，未变化的文件保持原样 (不改写、不更新修改时间)。
+#       静态资源目录按文件大小和修改时间同步，不再每次删除后整体复制。
+#       复制文件时优先使用 reflink (写时复制，支持的文件系统上几乎不占空间和时间)，
+#       不支持时退回到普通复制。
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+
+_APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(_APP_ROOT, "templates")
+
+# 缓存文件 (位于导出目录根部)
+CACHE_FILENAME = ".export_cache.json"
+# 缓存格式版本。生成逻辑发生不兼容的变化时递增，旧缓存会被整体视为过期
+CACHE_VERSION = 2
+
+# Linux 的 FICLONE ioctl (btrfs、XFS 等文件系统支持 reflink)
+_FICLONE = 0x40049409
+
+
+def input_digest(*parts) -> str:
+    """计算任意 JSON 可序列化输入的摘要。"""
+    payload = json.dumps([CACHE_VERSION, *parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def template_digest(*template_names) -> str:
+    """模板文件内容的摘要 (模板名相对于 templates/ 目录)，模板修改后相关页面会重新生成。"""
+    sha1 = hashlib.sha1()
+    for name in template_names:
+        with open(os.path.join(TEMPLATES_DIR, name), 'rb') as f:
+            sha1.update(f.read().replace(b'\r\n', b'\n'))
+    return sha1.hexdigest()
+
+
+def file_stamp(path: str) -> str:
+    """文件的大小和修改时间，用于不值得计算完整摘要的大文件 (如媒体文件)。"""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def write_text_if_changed(path: str, content: str) -> bool:
+    """只有内容不同时才写入文件。返回是否写入。"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+def _try_reflink(source_path: str, destination_path: str) -> bool:
+    """尝试以 reflink 方式复制 (目前只支持 Linux)。失败时不留下目标文件。"""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(source_path, 'rb') as src, open(destination_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    except OSError:
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        return False
+    shutil.copystat(source_path, destination_path)
+    return True
+
+
+def clone_or_copy(source_path: str, destination_path: str):
+    """复制文件并保留修改时间: 优先 reflink，不支持时普通复制。"""
+    if not _try_reflink(source_path, destination_path):
+        shutil.copy2(source_path, destination_path)
+
+
+def link_or_copy(existing_path: str, destination_path: str):
+    """
+    在输出目录内部为已有文件创建硬链接 (不占额外空间)，文件系统不支持时退回到复制。
+    只用于输出目录内部的文件，不会链接到项目的源文件，修改导出结果不会影响源文件。
+    """
+    try:
+        os.link(existing_path, destination_path)
+    except OSError:
+        clone_or_copy(existing_path, destination_path)
+
+
+def _is_same_file_stat(source_path: str, destination_path: str) -> bool:
+    if not os.path.exists(destination_path):
+        return False
+    src, dst = os.stat(source_path), os.stat(destination_path)
+    return src.st_size == dst.st_size and int(src.st_mtime) == int(dst.st_mtime)
+
+
+def copy_if_changed(source_path: str, destination: str) -> bool:
+    """
+    复制单个文件 (destination 可以是目录)，目标的大小和修改时间一致时跳过。
+    使用 copy2 保留修改时间，下次比较时才能判断为未变化。
+    """
+    if os.path.isdir(destination):
+        destination = os.path.join(destination, os.path.basename(source_path))
+    if _is_same_file_stat(source_path, destination):
+        return False
+    if os.path.exists(destination):
+        # 目标可能是硬链接，先删除，避免改写其他位置的同一文件
+        os.remove(destination)
+    clone_or_copy(source_path, destination)
+    return True
+
+
+def sync_directory(source_dir: str, destination_dir: str, keep=()):
+    """
+    让 destination_dir 与 source_dir 保持一致 (替代 rmtree + copytree)。
+
+    只复制新增或变化的文件，删除源目录中已不存在的文件，未变化的文件保持原样。
+
+    Args:
+        keep (iterable): 不在源目录中、但需要保留的文件 (相对于 destination_dir 的路径)，
+                         例如之后单独复制进来的 JS 库。
+    """
+    expected = {os.path.normpath(path) for path in keep}
+    for root, _, files in os.walk(source_dir):
+        relative_root = os.path.relpath(root, source_dir)
+        target_root = os.path.normpath(os.path.join(destination_dir, relative_root))
+        os.makedirs(target_root, exist_ok=True)
+        for filename in files:
+            copy_if_changed(os.path.join(root, filename), os.path.join(target_root, filename))
+            expected.add(os.path.normpath(os.path.join(relative_root, filename)))
+
+    for root, _, files in os.walk(destination_dir, topdown=False):
+        relative_root = os.path.relpath(root, destination_dir)
+        for filename in files:
+            if os.path.normpath(os.path.join(relative_root, filename)) not in expected:
+                os.remove(os.path.join(root, filename))
+        if root != destination_dir and not os.listdir(root):
+            os.rmdir(root)
+
+
+class ExportBuildCache:
+    """
+    导出目录中的构建缓存: 输出文件 (相对路径) -> [生成它时的输入摘要, 生成后文件的大小:修改时间]。
+
+    记录输出文件本身的大小和修改时间: 文件在导出之外被改写 (例如“更新页面片段”只重写了
+    单个页面的 HTML 和图片) 后，下次增量导出会把它视为过期并重新生成。
+
+    用法:
+        if not cache.is_current(path, key):
+            ...生成文件...
+            cache.record(path, key)
+        cache.prune_directory(pages_dir, produced_paths)
+        cache.save()
+    """
+
+    def __init__(self, project_path: str):
+        self.project_path = project_path
+        self.cache_path = os.path.join(project_path, CACHE_FILENAME)
+        self._outputs = {}
+        self._digests = {}  # 源文件路径 -> [大小:修改时间, 内容摘要]
+        # 导出的页面在多个线程中生成，记录和查询都在锁内进行 (计算摘要本身在锁外)
+        self._lock = threading.Lock()
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._outputs = data.get("outputs", {})
+                self._digests = data.get("digests", {})
+        except (OSError, ValueError):
+            pass  # 首次导出或缓存已损坏: 视为全部过期
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.project_path).replace(os.sep, '/')
+
+    def is_current(self, path: str, key: str) -> bool:
+        """文件存在，上次生成它时的输入摘要与 key 相同，且此后文件没有被改写。"""
+        with self._lock:
+            recorded = self._outputs.get(self._relative(path))
+        if not recorded or recorded[0] != key:
+            return False
+        try:
+            return file_stamp(path) == recorded[1]
+        except OSError:
+            return False
+
+    def record(self, path: str, key: str):
+        """在文件生成 (写入完成) 之后调用，同时记录文件当前的大小和修改时间。"""
+        stamp = file_stamp(path)
+        with self._lock:
+            self._outputs[self._relative(path)] = [key, stamp]
+
+    def content_digest(self, path: str) -> str:
+        """
+        文件内容的摘要，用于按内容去重。
+
+        结果按 (大小, 修改时间) 记录在缓存中，再次导出时未变化的大文件 (如视频) 不必重新读取。
+        """
+        stamp = file_stamp(path)
+        with self._lock:
+            recorded = self._digests.get(path)
+        if recorded and recorded[0] == stamp:
+            return recorded[1]
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(chunk)
+        digest = sha1.hexdigest()
+        with self._lock:
+            self._digests[path] = [stamp, digest]
+        return digest
+
+    def prune_directory(self, directory: str, produced_paths: set):
+        """删除 directory 中本次导出没有生成的文件 (例如页数减少后多出来的页面)。"""
+        if not os.path.isdir(directory):
+            return
+        produced = {os.path.normpath(p) for p in produced_paths}
+        for filename in os.listdir(directory):
+            path = os.path.normpath(os.path.join(directory, filename))
+            if os.path.isfile(path) and path not in produced:
+                os.remove(path)
+                with self._lock:
+                    self._outputs.pop(self._relative(path), None)
+
+    def save(self):
+        with self._lock:
+            # 不再存在的文件的摘要记录没有用处，顺便清理
+            self._digests = {path: entry for path, entry in self._digests.items() if os.path.exists(path)}
+            data = {"version": CACHE_VERSION, "outputs": dict(self._outputs), "digests": self._digests}
+        write_text_if_changed(self.cache_path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
@@ -0,0 +1,460 @@
+# FILE: export_model.py
+#
+# 功能: 导出流程的“中间模型”。
+#       一次遍历所有页面，得到每页的热区列表、引用的媒体文件和图片摘要，
+#       然后由各个导出格式 (双页画册、单页画册、动态网页) 共享，
+#       避免每种格式都重新遍历场景、重新判断 MIME 类型、重新复制文件。
+
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from export_cache import (ExportBuildCache, clone_or_copy, file_stamp, input_digest, link_or_copy,
+                          write_text_if_changed)
+from hotspot_geometry import collect_page_hotspot_geometry
+from image_derivatives import (DERIVATIVE_WIDTHS, IMAGE_FORMATS, generate_derivatives, load_derivative_settings,
+                               target_widths)
+from utils import create_default_data
+
+# 输出目录中媒体文件所在的子目录名
+MEDIA_DIR_NAME = "media"
+# 导出网页默认只加载当前页前后多少页 (设置项 export/page_window，0 表示全部加载)
+DEFAULT_PAGE_WINDOW = 2
+# manifest 文件格式版本，结构变化时递增
+MANIFEST_VERSION = 1
+# 逐页导出 (放置图片、渲染模板、写文件) 的线程数
+PAGE_STAGE_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class ExportCancelled(Exception):
+    """用户在导出过程中点击了取消。"""
+
+
+def _media_type_for(path: str) -> str:
+    mime_type, _ = mimetypes.guess_type(path)
+    if mime_type:
+        if mime_type.startswith("audio/"):
+            return 'audio'
+        if mime_type.startswith("video/"):
+            return 'video'
+        if mime_type.startswith("image/"):
+            return 'image'
+        if mime_type == "application/pdf":
+            return 'pdf'
+    return 'link'
+
+
+def file_digest(path: str) -> str:
+    """计算文件内容的 SHA-1 摘要 (分块读取)。"""
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def build_page_hotspots(session, media_files: dict) -> list:
+    """
+    生成一个页面的热区列表 (与格式无关的中间表示)。
+
+    文件类热区的 href 相对于输出根目录 (例如 "media/a.mp3")，并带有
+    'media_file': True 标记，各格式再按自己的页面位置加上路径前缀。
+
+    Args:
+        session: ImageEditingSession。
+        media_files (dict): 输出: 媒体文件名 -> 源文件路径，由调用方统一复制。
+    """
+    if session.image_width == 0 or session.image_height == 0:
+        return []
+
+    hotspots = []
+    for _, data, is_ellipse, rel_rect in collect_page_hotspot_geometry(session).iter_hotspots():
+        hotspot_info = {
+            **rel_rect,
+            'is_circle': is_ellipse, 'href': '#', 'target': '', 'onclick': '',
+            'description': data.get("description", ""),
+            'icon_type': data.get("icon_type", "default"),
+            'media_type': 'link',
+            'popup_width': 800,
+            'popup_height': 600,
+            'aspect_ratio': 'free',
+            'media_file': False,
+        }
+
+        htype = data.get("hotspot_type", "url")
+        if htype == "url":
+            udata = data.get("url_data", create_default_data()["url_data"])
+            url, target = udata.get("url", "#"), udata.get("target", "_blank")
+
+            hotspot_info['href'] = url
+            hotspot_info['target'] = target
+            hotspot_info['popup_width'] = udata.get('popup_width', 800)
+            hotspot_info['popup_height'] = udata.get('popup_height', 600)
+            hotspot_info['aspect_ratio'] = udata.get('aspect_ratio', 'free')
+
+            if url.lower().endswith(('.mp4', '.mov', '.webm')):
+                hotspot_info['media_type'] = 'video_url'
+
+            if target == "popup":
+                hotspot_info[
+                    'onclick'] = f"window.open('{url}', '_blank', 'width={hotspot_info['popup_width']},height={hotspot_info['popup_height']},resizable=yes,scrollbars=yes'); return false;"
+
+        elif htype == "file":
+            fdata = data.get("file_data", create_default_data()["file_data"])
+            source_path = fdata.get("source_path")
+            if not source_path or not os.path.exists(source_path): continue
+
+            media_filename = os.path.basename(source_path)
+            media_files.setdefault(media_filename, source_path)
+
+            hotspot_info['href'] = f"{MEDIA_DIR_NAME}/{media_filename}"
+            hotspot_info['media_file'] = True
+            hotspot_info['target'] = fdata.get("display", "popup")
+            hotspot_info['popup_width'] = fdata.get('popup_width', 800)
+            hotspot_info['popup_height'] = fdata.get('popup_height', 600)
+            hotspot_info['aspect_ratio'] = fdata.get('aspect_ratio', 'free')
+            hotspot_info['media_type'] = _media_type_for(media_filename)
+
+        hotspots.append(hotspot_info)
+
+    return hotspots
+
+
+def with_path_prefix(hotspots: list, path_prefix: str) -> list:
+    """为文件类热区的 href 加上路径前缀 (页面文件位于子目录中时使用，如 "../")。"""
+    if not path_prefix:
+        return hotspots
+    return [dict(h, href=f"{path_prefix}{h['href']}") if h['media_file'] else h for h in hotspots]
+
+
+def to_modular_hotspots(hotspots: list) -> list:
+    """转换为双页画册 page.html.j2 使用的格式 (shape + rect.x_rel ...)。"""
+    modular = []
+    for h in hotspots:
+        info = {k: v for k, v in h.items() if k not in ('rel_x', 'rel_y', 'rel_w', 'rel_h', 'is_circle')}
+        info['shape'] = "ellipse" if h['is_circle'] else "rectangle"
+        info['rect'] = {"x_rel": h['rel_x'], "y_rel": h['rel_y'], "w_rel": h['rel_w'], "h_rel": h['rel_h']}
+        # 双页画册的弹窗由前端脚本处理，不使用内联 onclick
+        info['onclick'] = ''
+        modular.append(info)
+    return modular
+
+
+def variant_urls(variants: list, path_prefix: str) -> list:
+    """把 stage_page_derivatives() 返回的文件列表转换为 [{"url", "width"}]。"""
+    return [{"url": f"{path_prefix}{v['filename']}", "width": v['width']} for v in variants]
+
+
+def srcset_string(urls: list) -> str:
+    """生成 srcset 属性值，如 "images/a-480w.webp 480w, images/a-960w.webp 960w"。"""
+    return ", ".join(f"{u['url']} {u['width']}w" for u in urls)
+
+
+def pick_variant(urls: list, min_width: int) -> str:
+    """选出宽度不小于 min_width 的最小版本；都不够宽时选最宽的版本。"""
+    wide_enough = [u for u in urls if u['width'] >= min_width]
+    return (min(wide_enough, key=lambda u: u['width']) if wide_enough
+            else max(urls, key=lambda u: u['width']))['url']
+
+
+class ExportPage:
+    """一个页面的导出中间模型。"""
+
+    def __init__(self, page_num: int, session, hotspots: list, digest_of=file_digest):
+        """
+        Args:
+            digest_of (callable): 计算文件内容摘要的函数 (可传入带缓存的版本)。
+        """
+        self.page_num = page_num
+        self.session = session
+        self.image_path = session.image_path
+        self.image_width = session.image_width
+        self.image_height = session.image_height
+        self.hotspots = hotspots
+        self._digest_of = digest_of
+        self._image_digest = None
+
+    @property
+    def image_filename(self) -> str:
+        _, ext = os.path.splitext(self.image_path)
+        return f"page-img-{self.page_num}{ext}"
+
+    @property
+    def image_digest(self) -> str:
+        """页面图片内容的摘要 (首次访问时计算)。"""
+        if self._image_digest is None:
+            self._image_digest = self._digest_of(self.image_path)
+        return self._image_digest
+
+    @property
+    def content_hash(self) -> str:
+        """页面内容 (图片 + 热区) 的摘要，前端可用它判断缓存是否仍然有效。"""
+        sha1 = hashlib.sha1(self.image_digest.encode('ascii'))
+        sha1.update(json.dumps(self.hotspots, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        return sha1.hexdigest()[:16]
+
+    def manifest_entry(self, url: str, image_url: str, variants: list = None, variant_type: str = None) -> dict:
+        """
+        生成 manifest 中该页的条目。
+
+        Args:
+            url (str): 页面片段相对于入口 HTML 的地址。
+            image_url (str): 页面原图相对于入口 HTML 的地址。
+            variants (list, optional): variant_urls() 生成的多尺寸版本。
+            variant_type (str, optional): 多尺寸版本的 MIME 类型。
+        """
+        entry = {
+            "page": self.page_num,
+            "url": url,
+            "image": image_url,
+            "width": self.image_width,
+            "height": self.image_height,
+            "hotspots": len(self.hotspots),
+            "hash": self.content_hash,
+        }
+        if variants:
+            entry["variants"] = variants
+            entry["variant_type"] = variant_type
+        return entry
+
+
+class ExportModel:
+    """
+    整个项目的导出中间模型，以及一次导出过程中的文件放置记录。
+
+    同一个模型可以依次交给多个导出格式使用:
+    - 热区和媒体列表只计算一次；
+    - 媒体文件只复制一次；
+    - 文件按内容去重: 同样内容的文件第一次放置时复制 (优先 reflink)，
+      之后在输出目录内部使用硬链接，三种格式的图片目录不再各占一份空间；
+    - 多尺寸压缩图片只编码一次，之后的格式同样使用硬链接；
+    - 输入未变化的输出文件 (按 build_cache 中的记录) 保持原样，不重新生成。
+    """
+
+    def __init__(self, pages: list, media_files: dict, project_path: str, build_cache: ExportBuildCache = None):
+        self.pages = pages
+        self.media_files = media_files
+        self.project_path = project_path
+        self._placed = {}  # 内容摘要 -> 输出目录中第一个具有该内容的文件
+        # 本次导出中未变化、尚未计算摘要的文件 [(源文件, 输出文件)]。只有真正需要复制时才计算它们的摘要
+        self._unhashed_placements = []
+        # 只保护上面的去重记录和 _produced，计算摘要和复制文件都在锁外进行
+        self._place_lock = threading.Lock()
+        self._item_locks = {}  # ("path", 输出文件) / ("digest", 内容摘要) -> threading.Lock
+        self._media_staged = False
+        self._derivatives = None  # 页码 -> ([(第一次生成的路径, 宽度)], 输入摘要)
+        self.derivative_type = None  # 多尺寸图片的 MIME 类型
+        self.build_cache = build_cache or ExportBuildCache(project_path)
+        self._produced = {}  # 输出目录 -> 本次导出放入该目录的文件路径
+        # 由调用方 (如一键导出) 设置，在 GUI 线程中调用:
+        self.progress_callback = None  # callable(格式名称, 已完成页数, 总页数)
+        self.cancel_check = None  # callable() -> bool，返回 True 时在下一页之前停止导出
+
+    @classmethod
+    def build(cls, parent_window, project_path: str) -> "ExportModel":
+        build_cache = ExportBuildCache(project_path)
+        media_files = {}
+        pages = [
+            ExportPage(page_num, session, build_page_hotspots(session, media_files), build_cache.content_digest)
+            for page_num, session in enumerate(parent_window.sessions, start=1)
+        ]
+        return cls(pages, media_files, project_path, build_cache)
+
+    def stage_media(self):
+        """把所有被引用的媒体文件放入输出目录的 media/ 中 (每次导出只执行一次)。"""
+        if self._media_staged:
+            return
+        media_dir = os.path.join(self.project_path, MEDIA_DIR_NAME)
+        os.makedirs(media_dir, exist_ok=True)
+        for media_filename, source_path in self.media_files.items():
+            # 媒体文件可能很大，用大小和修改时间判断是否变化
+            self.place_file(source_path, os.path.join(media_dir, media_filename), file_stamp(source_path))
+        self._media_staged = True
+
+    def place_file(self, source_path: str, destination_path: str, key: str = None):
+        """
+        把源文件放到目标位置。
+
+        按内容去重: 输出目录中已有相同内容的文件时创建硬链接，
+        否则从源文件复制 (优先 reflink)。源文件本身不会被链接，修改导出结果不会影响项目。
+
+        可以在多个线程中同时调用。
+
+        Args:
+            key (str, optional): 源文件内容的摘要。目标文件是用同样内容生成的时跳过。
+        """
+        self._mark_produced(destination_path)
+        # 同一目标的判断、删除和复制不能与另一个线程交错
+        with self._item_lock("path", os.path.abspath(destination_path)):
+            if key and self.build_cache.is_current(destination_path, key):
+                # 未变化的文件不读取内容，只在之后有文件需要复制时才计算摘要 (用于去重)
+                with self._place_lock:
+                    self._unhashed_placements.append((source_path, destination_path))
+                return
+            if os.path.exists(destination_path):
+                if os.path.samefile(source_path, destination_path):
+                    return
+                # 目标可能是上次导出时创建的硬链接，先删除，避免改写其他目录中的同一文件
+                os.remove(destination_path)
+            digest = self.build_cache.content_digest(source_path)
+            # 相同内容的文件依次放置: 第一个复制完成并登记之后，其余的才能从它创建链接
+            with self._item_lock("digest", digest):
+                first_copy = self._placed_copy_of(digest)
+                if first_copy and os.path.exists(first_copy):
+                    link_or_copy(first_copy, destination_path)
+                else:
+                    clone_or_copy(source_path, destination_path)
+                    with self._place_lock:
+                        self._placed[digest] = destination_path
+            if key:
+                self.build_cache.record(destination_path, key)
+
+    def _item_lock(self, kind: str, name: str) -> threading.Lock:
+        with self._place_lock:
+            return self._item_locks.setdefault((kind, name), threading.Lock())
+
+    def _placed_copy_of(self, digest: str):
+        """
+        输出目录中已有的、内容摘要为 digest 的文件 (没有时返回 None)。
+        先为尚未计算摘要的未变化文件计算摘要 (在锁外读取文件)。
+        """
+        with self._place_lock:
+            pending, self._unhashed_placements = self._unhashed_placements, []
+        hashed = [(self.build_cache.content_digest(source_path), destination_path)
+                  for source_path, destination_path in pending]
+        with self._place_lock:
+            for placed_digest, destination_path in hashed:
+                self._placed.setdefault(placed_digest, destination_path)
+            return self._placed.get(digest)
+
+    def run_pages(self, stage_label: str, stage) -> list:
+        """
+        对每页执行 stage(page)，在线程池中并行运行。
+
+        热区数据已在 build() 中 (GUI 线程) 收集为普通字典，stage 只做模板渲染和文件读写，
+        不访问场景对象，因此可以在工作线程中执行。
+        结果按页码顺序收集；每完成一页，在调用线程中报告进度并检查是否取消。
+
+        Raises:
+            ExportCancelled: cancel_check 返回 True 时，尚未开始的页面被丢弃。
+        """
+        total = len(self.pages)
+        results = []
+        with ThreadPoolExecutor(max_workers=PAGE_STAGE_WORKERS) as executor:
+            futures = [executor.submit(stage, page) for page in self.pages]
+            for done, future in enumerate(futures, start=1):
+                if self.cancel_check and self.cancel_check():
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise ExportCancelled()
+                results.append(future.result())
+                if self.progress_callback:
+                    self.progress_callback(stage_label, done, total)
+        return results
+
+    def write_page_file(self, path: str, key: str, render) -> bool:
+        """
+        生成一个页面文件。上次用相同输入 (key) 生成的文件仍然存在时跳过。
+
+        Args:
+            key (str): 页面全部输入的摘要 (模板版本 + 渲染上下文)。
+            render (callable): 返回页面内容的函数，只在需要重新生成时调用。
+
+        Returns:
+            bool: 是否重新生成。
+        """
+        self._mark_produced(path)
+        if self.build_cache.is_current(path, key):
+            return False
+        write_text_if_changed(path, render())
+        self.build_cache.record(path, key)
+        return True
+
+    def _mark_produced(self, path: str):
+        with self._place_lock:
+            self._produced.setdefault(os.path.dirname(os.path.abspath(path)), set()).add(os.path.abspath(path))
+
+    def prune_outputs(self, *directories):
+        """删除这些目录中本次导出没有放入的文件 (例如已删除的页面)，然后保存构建缓存。"""
+        for directory in directories:
+            self.build_cache.prune_directory(
+                os.path.abspath(directory), self._produced.get(os.path.abspath(directory), set()))
+        self.build_cache.save()
+
+    def write_manifest(self, filename: str, entries: list):
+        """
+        在输出根目录写入 manifest (页数、每页尺寸、图片地址、热区数量、内容摘要)。
+        前端先读取它，无需为了得到页面比例而加载页面片段和图片。
+
+        Args:
+            filename (str): manifest 文件名，每种导出格式一个 (如 "manifest.json")。
+            entries (list): ExportPage.manifest_entry() 生成的条目。
+        """
+        manifest = {"version": MANIFEST_VERSION, "page_count": len(self.pages), "pages": entries}
+        write_text_if_changed(os.path.join(self.project_path, filename),
+                              json.dumps(manifest, ensure_ascii=False, separators=(',', ':')))
+        return manifest
+
+    def stage_page_derivatives(self, images_dir: str) -> dict:
+        """
+        把每页的多尺寸压缩图片放入 images_dir。
+
+        第一次调用时并行生成 (直接写入该目录)，之后的调用从第一次的结果创建硬链接。
+        设置中关闭了该功能时返回空字典，各格式只使用原图。
+
+        Returns:
+            dict: 页码 -> [{"filename", "width"}, ...]，按宽度从小到大排列。
+        """
+        if self._derivatives is None:
+            self._derivatives = {}
+            enabled, fmt, quality, workers = load_derivative_settings()
+            if not enabled:
+                return {}
+            self.derivative_type = IMAGE_FORMATS[fmt][1]
+            extension = IMAGE_FORMATS[fmt][2]
+
+            # 原图、格式和质量都未变化且文件仍在的页面不再重新编码
+            jobs, keys = {}, {}
+            for page in self.pages:
+                if not (page.image_width and page.image_height):
+                    continue
+                stem = os.path.splitext(page.image_filename)[0]
+                key = input_digest(page.image_digest, fmt, quality, DERIVATIVE_WIDTHS)
+                expected = [(os.path.join(images_dir, f"{stem}-{width}w{extension}"), width)
+                            for width in target_widths(page.image_width)]
+                if all(self.build_cache.is_current(path, key) for path, _ in expected):
+                    self._derivatives[page.page_num] = (expected, key)
+                else:
+                    jobs[page.page_num] = (page.image_path, stem)
+                    keys[page.page_num] = key
+
+            generated = generate_derivatives(jobs, images_dir, fmt, quality, workers) if jobs else {}
+            for page_num, variants in generated.items():
+                if not variants:
+                    continue
+                paths = [(os.path.join(images_dir, filename), width) for filename, width in variants]
+                for path, _ in paths:
+                    self.build_cache.record(path, keys[page_num])
+                self._derivatives[page_num] = (paths, keys[page_num])
+
+            for paths, _ in self._derivatives.values():
+                for path, _ in paths:
+                    with self._place_lock:
+                        self._unhashed_placements.append((path, path))
+                    self._mark_produced(path)
+        else:
+            for paths, key in self._derivatives.values():
+                for path, _ in paths:
+                    self.place_file(path, os.path.join(images_dir, os.path.basename(path)), key)
+
+        return {
+            page_num: [{"filename": os.path.basename(path), "width": width} for path, width in paths]
+            for page_num, (paths, _) in sorted(self._derivatives.items())
+        }
+
+    def place_page_image(self, page: ExportPage, images_dir: str) -> str:
+        """把页面图片放入 images_dir，返回文件名。图片内容未变化时保留已有的文件。"""
+        self.place_file(page.image_path, os.path.join(images_dir, page.image_filename), page.image_digest)
+        return page.image_filename
@@ -32,12 +32,12 @@ class _ExporterFlip(
 
 # --- 2. 公共接口: 提供与重构前完全相同的函数 ---
 
-def export_as_modular_flipbook(parent_window, project_path: str):
+def export_as_modular_flipbook(parent_window, project_path: str, export_model=None):
     """
     公共接口函数。
     它将调用转发给内部 _ExporterFlip 类的同名方法。
     """
-    return _ExporterFlip.export_as_modular_flipbook(parent_window, project_path)
+    return _ExporterFlip.export_as_modular_flipbook(parent_window, project_path, export_model)
 
 def export_double_page_fragment(parent_window, output_dir):
     """
@@ -2,15 +2,15 @@
 
 import os
 import json
-import shutil
-import mimetypes
-from jinja2 import Environment, FileSystemLoader
 from PySide6.QtWidgets import QMessageBox
 from PySide6.QtCore import QSettings
 from PySide6.QtGui import QColor
 
-from graphics_items import AbstractResizableItem, ResizableEllipseItem
-from utils import create_default_data  # 导入 create_default_data
+from template_manager import template_manager
+from export_cache import copy_if_changed, input_digest, sync_directory, template_digest, write_text_if_changed
+from export_model import ExportCancelled, ExportModel, to_modular_hotspots, variant_urls, srcset_string
+from frontend_assets import copy_enhancer_runtime
+from asset_bundler import build_format_bundle
 
 
 class ExportAsModularFlipbookMixin:
@@ -19,7 +19,12 @@ class ExportAsModularFlipbookMixin:
     """
 
     @classmethod
-    def export_as_modular_flipbook(cls, parent_window, project_path: str):
+    def export_as_modular_flipbook(cls, parent_window, project_path: str, export_model=None):
+        """
+        Args:
+            export_model (ExportModel, optional): 与其他导出格式共享的中间模型。
+                为 None 时在此处构建。
+        """
         if not parent_window.sessions:
             return
 
@@ -28,7 +33,6 @@ class ExportAsModularFlipbookMixin:
             current_dir = os.path.dirname(__file__)
             hotspot_editor_root = os.path.abspath(os.path.join(current_dir, '..'))
             templates_root_dir = os.path.join(hotspot_editor_root, 'templates')
-            env = Environment(loader=FileSystemLoader(templates_root_dir))
             source_modular_assets_dir = os.path.join(templates_root_dir, "flipbook_modular_assets")
             dest_static_dir = os.path.join(project_path, "static_flip")
             source_shared_assets_dir = os.path.join(templates_root_dir, "shared_assets")
@@ -39,89 +43,48 @@ class ExportAsModularFlipbookMixin:
             images_dir = os.path.join(project_path, "images")
             js_dir = os.path.join(project_path, "js")
             media_dir = os.path.join(project_path, "media")
-            if os.path.exists(pages_dir): shutil.rmtree(pages_dir)
-            if os.path.exists(dest_static_dir): shutil.rmtree(dest_static_dir)
-            if os.path.exists(dest_shared_assets_dir): shutil.rmtree(dest_shared_assets_dir)
-            shutil.copytree(source_shared_assets_dir, dest_shared_assets_dir)
+            # --- *** 核心修改: 增量导出，只同步变化的文件，不再删除整个目录 *** ---
+            sync_directory(source_shared_assets_dir, dest_shared_assets_dir)
             for d in [pages_dir, images_dir, js_dir, media_dir]: os.makedirs(d, exist_ok=True)
-            shutil.copytree(source_modular_assets_dir, dest_static_dir)
+            sync_directory(source_modular_assets_dir, dest_static_dir)
 
             total_pages = len(parent_window.sessions)
 
-            for i, session in enumerate(parent_window.sessions):
-                page_num = i + 1
-                _, ext = os.path.splitext(session.image_path)
-                unique_image_filename = f"page-img-{page_num}{ext}"
-                shutil.copy(session.image_path, os.path.join(images_dir, unique_image_filename))
-
-                page_hotspots = []
-                image_width, image_height = session.image_width, session.image_height
-                if image_width == 0 or image_height == 0: continue
-
-                for item_index, item in enumerate(session.scene.items()):
-                    if not isinstance(item, AbstractResizableItem) or not item.data(0): continue
-                    data, scene_rect = item.data(0), item.sceneBoundingRect()
-
-                    hotspot_info = {
-                        "shape": "ellipse" if isinstance(item, ResizableEllipseItem) else "rectangle",
-                        "rect": {"x_rel": (scene_rect.left() / image_width) * 100,
-                                 "y_rel": (scene_rect.top() / image_height) * 100,
-                                 "w_rel": (scene_rect.width() / image_width) * 100,
-                                 "h_rel": (scene_rect.height() / image_height) * 100},
-                        'href': '#', 'target': '', 'onclick': '', 'description': data.get("description", ""),
-                        'icon_type': data.get("icon_type", "default"), 'media_type': 'link',
-                        'popup_width': 800, 'popup_height': 600,
-                        'aspect_ratio': 'free',
-                    }
-
-                    htype = data.get("hotspot_type", "url")
-                    if htype == "url":
-                        udata = data.get("url_data", create_default_data()["url_data"])
-                        hotspot_info["href"] = udata.get("url", "#")
-                        hotspot_info["target"] = udata.get("target", "_blank")
-                        hotspot_info["popup_width"] = udata.get('popup_width', 800)
-                        hotspot_info["popup_height"] = udata.get('popup_height', 600)
-                        hotspot_info['aspect_ratio'] = udata.get('aspect_ratio', 'free')
-
-                        if hotspot_info["href"].lower().endswith(('.mp4', '.mov', '.webm')):
-                            hotspot_info['media_type'] = 'video_url'
-
-                    elif htype == "file":
-                        fdata = data.get("file_data", create_default_data()["file_data"])
-                        source_path = fdata.get("source_path")
-                        if not source_path or not os.path.exists(source_path): continue
-
-                        media_filename = os.path.basename(source_path)
-                        destination_path = os.path.join(project_path, 'media', media_filename)
-                        media_relative_path = f"media/{media_filename}"
-                        os.makedirs(os.path.join(project_path, 'media'), exist_ok=True)
-                        if not os.path.exists(destination_path) or not os.path.samefile(source_path, destination_path):
-                            shutil.copy(source_path, destination_path)
-
-                        hotspot_info['href'] = media_relative_path
-                        hotspot_info['target'] = fdata.get("display", "popup")
-                        hotspot_info['popup_width'] = fdata.get('popup_width', 800)
-                        hotspot_info['popup_height'] = fdata.get('popup_height', 600)
-                        hotspot_info['aspect_ratio'] = fdata.get('aspect_ratio', 'free')
-
-                        mime_type, _ = mimetypes.guess_type(media_relative_path)
-                        if mime_type:
-                            if mime_type.startswith("audio/"):
-                                hotspot_info['media_type'] = 'audio'
-                            elif mime_type.startswith("video/"):
-                                hotspot_info['media_type'] = 'video'
-                            elif mime_type.startswith("image/"):
-                                hotspot_info['media_type'] = 'image'
-                            elif mime_type == "application/pdf":
-                                hotspot_info['media_type'] = 'pdf'
-
-                    page_hotspots.append(hotspot_info)
-
-                page_template = env.get_template('flipbook_modular/page.html.j2')
-                page_context = {"image_path": f"images/{unique_image_filename}", "hotspots": page_hotspots}
-                page_content = page_template.render(**page_context)
-                with open(os.path.join(pages_dir, f"page-{page_num}.html"), "w", encoding="utf-8") as f:
-                    f.write(page_content)
+            if export_model is None:
+                export_model = ExportModel.build(parent_window, project_path)
+            export_model.stage_media()
+
+            # 多尺寸压缩图片，浏览器按屏幕大小选择 (关闭时为空字典，只使用原图)
+            derivatives = export_model.stage_page_derivatives(images_dir)
+
+            page_template_digest = template_digest('flipbook_modular/page.html.j2')
+            page_template = template_manager.get_template('flipbook_modular/page.html.j2')
+
+            def export_page(page):
+                """单页的导出步骤 (在线程池中执行)，返回 manifest 条目。"""
+                page_num = page.page_num
+                unique_image_filename = export_model.place_page_image(page, images_dir)
+                if page.image_width == 0 or page.image_height == 0: return None
+                page_hotspots = to_modular_hotspots(page.hotspots)
+
+                variants = variant_urls(derivatives.get(page_num, []), "images/")
+                page_context = {"image_path": f"images/{unique_image_filename}", "hotspots": page_hotspots,
+                                "image_srcset": srcset_string(variants), "image_type": export_model.derivative_type}
+                # 输入 (模板 + 上下文) 未变化的页面保持原样
+                export_model.write_page_file(
+                    os.path.join(pages_dir, f"page-{page_num}.html"),
+                    input_digest(page_template_digest, page_context),
+                    lambda: page_template.render(**page_context))
+                return page.manifest_entry(f"pages/page-{page_num}.html", f"images/{unique_image_filename}",
+                                           variants, export_model.derivative_type)
+
+            # --- *** 核心修改: 各页并行渲染，逐页报告进度 *** ---
+            manifest_entries = [entry for entry in export_model.run_pages("双页画册", export_page) if entry]
+
+            # 前端先读取 manifest.json 得到页面比例，不再需要先加载第 2 页的片段和图片
+            export_model.write_manifest("manifest.json", manifest_entries)
+            # 删除已不存在的页面 (例如删除了页面后重新导出)
+            export_model.prune_outputs(pages_dir, images_dir)
 
             # --- 渲染主入口文件 ---
             outline_html = cls._generate_recursive_outline_for_flipbook(parent_window.outline_data)
@@ -156,24 +119,31 @@ class ExportAsModularFlipbookMixin:
             }
             # --- *** 修复结束 *** ---
 
+            # React 运行时与热区增强脚本 (优先使用预编译版本，不再附带 Babel)
+            enhancer_scripts = copy_enhancer_runtime(project_path)
+            # 合并、压缩样式表和模块脚本 (文件名带内容摘要)
+            asset_bundle = build_format_bundle(
+                project_path, "flip",
+                [os.path.join(dest_static_dir, "css", "main.css"),
+                 os.path.join(dest_shared_assets_dir, "css", "hotspot-enhancer.css")],
+                os.path.join(dest_static_dir, "js", "main.js"))
+
             context = {"project_title": "翻书画册", "nav_html": outline_html, "total_pages": total_pages,
-                       "hotspot_style": hotspot_style_context}
-            index_template = env.get_template('flipbook_modular/index.html.j2')
+                       "hotspot_style": hotspot_style_context, "enhancer_scripts": enhancer_scripts,
+                       "asset_bundle": asset_bundle}
+            index_template = template_manager.get_template('flipbook_modular/index.html.j2')
             index_content = index_template.render(**context)
-            with open(os.path.join(project_path, "index.html"), "w", encoding="utf-8") as f:
-                f.write(index_content)
+            write_text_if_changed(os.path.join(project_path, "index.html"), index_content)
 
             # --- 复制JS库 ---
             shared_js_dir = os.path.join(hotspot_editor_root, "js")
-            dest_root_js_dir = os.path.join(project_path, "js")
-            shutil.copy(os.path.join(shared_js_dir, "jquery.min.js"), js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "turn.min.js"), js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "modernizr.min.js"), js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "react.development.js"), dest_root_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "react-dom.development.js"), dest_root_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "babel.min.js"), dest_root_js_dir)
+            copy_if_changed(os.path.join(shared_js_dir, "jquery.min.js"), js_dir)
+            copy_if_changed(os.path.join(shared_js_dir, "turn.min.js"), js_dir)
+            copy_if_changed(os.path.join(shared_js_dir, "modernizr.min.js"), js_dir)
 
             parent_window.statusBar().showMessage(f"双页画册导出成功！", 5000)
+        except ExportCancelled:
+            raise  # 交给调用方 (一键导出) 处理
         except Exception as e:
             import traceback
             # 打印完整的堆栈跟踪，以便调试
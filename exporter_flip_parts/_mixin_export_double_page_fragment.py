@@ -1,13 +1,13 @@
 # FILE: _mixin_export_double_page_fragment.py (FIXED)
 
 import os
-import shutil
 import json
-from jinja2 import Environment, FileSystemLoader
 from PySide6.QtWidgets import QMessageBox
 
 # 导入与完整导出相同的依赖
-from graphics_items import AbstractResizableItem, ResizableEllipseItem
+from template_manager import template_manager
+from export_cache import copy_if_changed
+from hotspot_geometry import collect_page_hotspot_geometry
 
 
 class ExportDoublePageFragmentMixin:
@@ -29,12 +29,8 @@ class ExportDoublePageFragmentMixin:
         page_num = parent_window.active_session_index + 1
 
         try:
-            # --- 路径与模板设置 (与完整导出逻辑一致) ---
-            current_dir = os.path.dirname(__file__)
-            hotspot_editor_root = os.path.abspath(os.path.join(current_dir, '..'))
-            templates_root_dir = os.path.join(hotspot_editor_root, 'templates')
-            env = Environment(loader=FileSystemLoader(templates_root_dir))
-            page_template = env.get_template('flipbook_modular/page.html.j2')
+            # --- 模板设置: 使用全局模板环境，已编译的模板在多次更新之间复用 ---
+            page_template = template_manager.get_template('flipbook_modular/page.html.j2')
 
             # --- 目录创建 (保持不变) ---
             pages_dir = os.path.join(output_dir, "pages");
@@ -45,7 +41,8 @@ class ExportDoublePageFragmentMixin:
             # --- 复制图片 (保持不变) ---
             _, ext = os.path.splitext(session.image_path)
             unique_image_filename = f"page-img-{page_num}{ext}"
-            shutil.copy(session.image_path, os.path.join(images_dir, unique_image_filename))
+            # 图片未变化时 (大小和修改时间相同) 不再重复复制
+            copy_if_changed(session.image_path, os.path.join(images_dir, unique_image_filename))
 
             page_hotspots = []
             js_popups_to_inject = []
@@ -54,19 +51,13 @@ class ExportDoublePageFragmentMixin:
             image_width, image_height = session.image_width, session.image_height
             if image_width > 0 and image_height > 0:
 
-                for item_index, item in enumerate(session.scene.items()):
-                    if not isinstance(item, AbstractResizableItem) or not item.data(0): continue
-                    data, scene_rect = item.data(0), item.sceneBoundingRect()
-
-                    # --- *** 核心修复 2/2: 计算并使用百分比值 *** ---
+                # --- *** 核心修复 2/2: 百分比值由 hotspot_geometry 批量计算 *** ---
+                geometry = collect_page_hotspot_geometry(session)
+                for item_index, data, is_ellipse, rel_rect in geometry.iter_hotspots(
+                        keys=("x_rel", "y_rel", "w_rel", "h_rel")):
                     hotspot_info = {
-                        "shape": "ellipse" if isinstance(item, ResizableEllipseItem) else "rectangle",
-                        "rect": {
-                            "x_rel": (scene_rect.left() / image_width) * 100,
-                            "y_rel": (scene_rect.top() / image_height) * 100,
-                            "w_rel": (scene_rect.width() / image_width) * 100,
-                            "h_rel": (scene_rect.height() / image_height) * 100
-                        },
+                        "shape": "ellipse" if is_ellipse else "rectangle",
+                        "rect": rel_rect,
                         "href": "#", "target": "", "onclick": ""
                     }
                     # --- *** 修复结束 *** ---
@@ -88,7 +79,7 @@ class ExportDoublePageFragmentMixin:
                         os.makedirs(os.path.join(output_dir, 'media'), exist_ok=True)
 
                         if not os.path.exists(destination_path) or not os.path.samefile(source_path, destination_path):
-                            shutil.copy(source_path, destination_path)
+                            copy_if_changed(source_path, destination_path)
 
                         tag = cls._generate_media_tag_for_flipbook(media_relative_path)
                         js_body = f'<html><head><title>{media_filename}</title><style>body{{margin:0;display:flex;justify-content:center;align-items:center;background:#333;}}</style></head><body>{tag}</body></html>'
@@ -1,12 +1,20 @@
 # D:\projects\singlepage\hotspot_editor\exporter_parts\_mixin_export_as_dynamic_page.py
 import os
-import shutil
 from template_manager import template_manager
+from export_cache import input_digest, sync_directory, template_digest, write_text_if_changed
+from export_model import ExportModel, with_path_prefix, variant_urls, srcset_string
+from frontend_assets import copy_enhancer_runtime
+from asset_bundler import build_format_bundle
 
 
 class ExportAsDynamicPageMixin:
     @classmethod
-    def export_as_dynamic_page(cls, parent_window, project_path: str):
+    def export_as_dynamic_page(cls, parent_window, project_path: str, export_model=None):
+        """
+        Args:
+            export_model (ExportModel, optional): 与其他导出格式共享的中间模型。
+                为 None 时在此处构建。
+        """
         if not parent_window.sessions: return None
 
         # --- 路径定义 ---
@@ -18,73 +26,90 @@ class ExportAsDynamicPageMixin:
         scroll_view_pages_dir = os.path.join(project_path, "pages_scroll")
         scroll_view_images_dir = os.path.join(project_path, "images_scroll")
 
-        # --- 目录清理和创建 ---
-        if os.path.exists(scroll_view_pages_dir): shutil.rmtree(scroll_view_pages_dir)
-        if os.path.exists(scroll_view_images_dir): shutil.rmtree(scroll_view_images_dir)
+        # --- 目录创建 (增量导出: 不再删除整个目录，过期文件在渲染后清理) ---
         os.makedirs(scroll_view_pages_dir, exist_ok=True)
         os.makedirs(scroll_view_images_dir, exist_ok=True)
         os.makedirs(media_dir, exist_ok=True)  # 确保 media 目录存在
 
         # --- 渲染页面片段 ---
-        page_filenames = []
-        for i, session in enumerate(parent_window.sessions):
-            page_num = i + 1
-            _, ext = os.path.splitext(session.image_path)
-            unique_image_filename = f"page-img-{page_num}{ext}"
-            shutil.copy(session.image_path, os.path.join(scroll_view_images_dir, unique_image_filename))
+        if export_model is None:
+            export_model = ExportModel.build(parent_window, project_path)
+        export_model.stage_media()
+
+        # 每页的占位信息: 片段地址与图片尺寸 (前端据此预留版面，滚动到附近时再加载)
+        derivatives = export_model.stage_page_derivatives(scroll_view_images_dir)
+        fragment_template_digest = template_digest('dynamic_page/scroll_view/fragment.html.j2')
+
+        def export_page(page):
+            """单页的导出步骤 (在线程池中执行)，返回 manifest 条目。"""
+            page_num = page.page_num
+            unique_image_filename = export_model.place_page_image(page, scroll_view_images_dir)
+
+            variants = variant_urls(derivatives.get(page_num, []), "images_scroll/")
 
             # 注意 path_prefix，因为 fragment.html 在 pages_scroll/ 目录下
-            hotspots, _ = cls._collect_hotspots_for_session(session, media_dir, path_prefix="../")
+            hotspots = with_path_prefix(page.hotspots, "../")
 
             fragment_context = {
                 "page_num": page_num,
                 "image_filename": f"images_scroll/{unique_image_filename}",
+                "image_width": page.image_width,
+                "image_srcset": srcset_string(variants),
+                "image_type": export_model.derivative_type,
                 "hotspots": hotspots
             }
-            fragment_content = template_manager.render('dynamic_page/scroll_view/fragment.html.j2', **fragment_context)
             page_filename = f"page_{page_num}.html"
-            with open(os.path.join(scroll_view_pages_dir, page_filename), "w", encoding="utf-8") as f: f.write(
-                fragment_content)
-            page_filenames.append(f"pages_scroll/{page_filename}")
+            # 输入 (模板 + 上下文) 未变化的页面保持原样
+            export_model.write_page_file(
+                os.path.join(scroll_view_pages_dir, page_filename),
+                input_digest(fragment_template_digest, fragment_context),
+                lambda: template_manager.render('dynamic_page/scroll_view/fragment.html.j2', **fragment_context))
+            return page.manifest_entry(f"pages_scroll/{page_filename}",
+                                       f"images_scroll/{unique_image_filename}",
+                                       variants, export_model.derivative_type)
+
+        # --- *** 核心修改: 各页并行渲染，逐页报告进度 *** ---
+        pages_data = export_model.run_pages("动态网页", export_page)
+
+        # 占位元素的尺寸已直接写入页面，manifest 供其他前端和工具使用
+        export_model.write_manifest("manifest_scroll.json", pages_data)
+        export_model.prune_outputs(scroll_view_pages_dir, scroll_view_images_dir)
+
+        # --- 复制专属静态资源 ---
+        source_static_dir = os.path.join(templates_root_dir, "dynamic_page", "static")
+        dest_static_dir = os.path.join(project_path, "static_scroll")
+        source_shared_assets_dir = os.path.join(templates_root_dir, "shared_assets")
+        dest_shared_assets_dir = os.path.join(project_path, "shared_assets")
+        try:
+            sync_directory(source_static_dir, dest_static_dir)
+
+            # --- *** 核心修复: 复制共享资源 (React 运行时已由 copy_enhancer_runtime 复制) *** ---
+            sync_directory(source_shared_assets_dir, dest_shared_assets_dir)
+            # --- *** 修复结束 *** ---
+
+        except Exception as e:
+            print(f"Warning: Could not copy static assets for dynamic_page. {e}")
 
         # --- 渲染主入口文件 ---
         nav_html = cls._generate_outline_html(parent_window.outline_data, "#page-")
+        # React 运行时与热区增强脚本 (优先使用预编译版本，不再附带 Babel)
+        enhancer_scripts = copy_enhancer_runtime(project_path)
 
         index_context = {
             "project_title": "动态加载页面", "nav_html": nav_html,
-            "page_filenames": page_filenames,
-            "hotspot_style": cls._get_hotspot_style_context()
+            "pages_data": pages_data,
+            "hotspot_style": cls._get_hotspot_style_context(),
+            "enhancer_scripts": enhancer_scripts,
+            # 合并、压缩样式表和脚本 (文件名带内容摘要)，需要在静态资源复制完成之后进行
+            "asset_bundle": build_format_bundle(
+                project_path, "scroll",
+                [os.path.join(dest_static_dir, "css", "main.css"),
+                 os.path.join(dest_shared_assets_dir, "css", "hotspot-enhancer.css")],
+                os.path.join(dest_static_dir, "js", "layout.js"), js_is_module=False)
         }
         index_content = template_manager.render('dynamic_page/scroll_view/index.html.j2', **index_context)
 
-        with open(os.path.join(project_path, "index_scroll.html"), "w", encoding="utf--8") as f:
-            f.write(index_content)
-
-        try:
-            # --- 复制专属静态资源 ---
-            source_static_dir = os.path.join(templates_root_dir, "dynamic_page", "static")
-            dest_static_dir = os.path.join(project_path, "static_scroll")
-            if os.path.exists(dest_static_dir): shutil.rmtree(dest_static_dir)
-            shutil.copytree(source_static_dir, dest_static_dir)
-
-            # --- *** 核心修复: 复制共享资源和 JS 库 *** ---
-            # 1. 复制 shared_assets
-            source_shared_assets_dir = os.path.join(templates_root_dir, "shared_assets")
-            dest_shared_assets_dir = os.path.join(project_path, "shared_assets")
-            if os.path.exists(dest_shared_assets_dir): shutil.rmtree(dest_shared_assets_dir)
-            shutil.copytree(source_shared_assets_dir, dest_shared_assets_dir)
-
-            # 2. 复制 React 等 JS 库到项目根目录的 js 文件夹
-            shared_js_dir = os.path.join(hotspot_editor_root, "js")
-            dest_root_js_dir = os.path.join(project_path, "js")
-            os.makedirs(dest_root_js_dir, exist_ok=True)
-            shutil.copy(os.path.join(shared_js_dir, "react.development.js"), dest_root_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "react-dom.development.js"), dest_root_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "babel.min.js"), dest_root_js_dir)
-            # --- *** 修复结束 *** ---
-
-        except Exception as e:
-            print(f"Warning: Could not copy static assets for dynamic_page. {e}")
+        write_text_if_changed(os.path.join(project_path, "index_scroll.html"), index_content)
 
         parent_window.statusBar().showMessage(f"动态网页（长滚动）导出成功！", 5000)
         return project_path
\ No newline at end of file
@@ -1,10 +1,19 @@
 # FILE: _mixin_export_as_single_page_flipbook.py (FINAL REFACTORED VERSION & PATH FIXED)
 import os
 import json
-import shutil
 from pathlib import Path
 from PySide6.QtWidgets import QMessageBox
+from PySide6.QtCore import QSettings
 from template_manager import template_manager
+from export_cache import copy_if_changed, input_digest, sync_directory, template_digest, write_text_if_changed
+from export_model import ExportCancelled, ExportModel, with_path_prefix, pick_variant, variant_urls, DEFAULT_PAGE_WINDOW
+from frontend_assets import copy_enhancer_runtime
+from asset_bundler import build_format_bundle
+
+# 单页画册页面的典型显示宽度 (CSS 像素)，用于选择背景图的 1x / 2x 版本
+SINGLE_PAGE_CSS_WIDTH = 960
+# 复制到 static_single/js/ 的库文件
+SINGLE_FLIPBOOK_JS_LIBRARIES = ("jquery.min.js", "modernizr.min.js", "turn.min.js")
 
 
 class ExportAsSinglePageFlipbookMixin:
@@ -14,7 +23,12 @@ class ExportAsSinglePageFlipbookMixin:
     """
 
     @classmethod
-    def export_as_single_page_flipbook(cls, parent_window, project_path: str):
+    def export_as_single_page_flipbook(cls, parent_window, project_path: str, export_model=None):
+        """
+        Args:
+            export_model (ExportModel, optional): 与其他导出格式共享的中间模型。
+                为 None 时在此处构建。
+        """
         if not parent_window.sessions: return None
 
         try:
@@ -34,79 +48,96 @@ class ExportAsSinglePageFlipbookMixin:
             flipbook_pages_dir = os.path.join(project_path, "pages_single")
             flipbook_images_dir = os.path.join(project_path, "images_single")
 
-            if os.path.exists(flipbook_pages_dir): shutil.rmtree(flipbook_pages_dir)
-            if os.path.exists(flipbook_images_dir): shutil.rmtree(flipbook_images_dir)
-            if os.path.exists(dest_static_dir): shutil.rmtree(dest_static_dir)
-            if os.path.exists(dest_shared_assets_dir): shutil.rmtree(dest_shared_assets_dir)
-
+            # --- *** 核心修改: 增量导出，只同步变化的文件，不再删除整个目录 *** ---
             os.makedirs(flipbook_pages_dir, exist_ok=True)
             os.makedirs(flipbook_images_dir, exist_ok=True)
             os.makedirs(media_dir, exist_ok=True)
 
             # --- 资源复制 ---
-            shutil.copytree(source_assets_dir, dest_static_dir)
-            shutil.copytree(source_shared_assets_dir, dest_shared_assets_dir)
+            sync_directory(source_assets_dir, dest_static_dir,
+                           keep=[os.path.join("js", name) for name in SINGLE_FLIPBOOK_JS_LIBRARIES])
+            sync_directory(source_shared_assets_dir, dest_shared_assets_dir)
 
             shared_js_dir = os.path.join(hotspot_editor_root, "js")
 
             # --- *** 核心修复: 将JS库复制到正确的位置 *** ---
-            # 1. 复制 React 等库到项目根的 js/ 目录
-            dest_root_js_dir = os.path.join(project_path, "js")
-            os.makedirs(dest_root_js_dir, exist_ok=True)
-            shutil.copy(os.path.join(shared_js_dir, "react.development.js"), dest_root_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "react-dom.development.js"), dest_root_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "babel.min.js"), dest_root_js_dir)
+            # 1. 复制 React 运行时到项目根的 js/ 目录 (热区增强脚本已预编译时不再附带 Babel)
+            enhancer_scripts = copy_enhancer_runtime(project_path)
 
             # 2. 复制 turn.js 等库到 static_single/js/ 目录
             dest_single_js_dir = os.path.join(dest_static_dir, "js")
             os.makedirs(dest_single_js_dir, exist_ok=True)  # 确保 static_single/js 存在
-            shutil.copy(os.path.join(shared_js_dir, "jquery.min.js"), dest_single_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "modernizr.min.js"), dest_single_js_dir)
-            shutil.copy(os.path.join(shared_js_dir, "turn.min.js"), dest_single_js_dir)
+            for name in SINGLE_FLIPBOOK_JS_LIBRARIES:
+                copy_if_changed(os.path.join(shared_js_dir, name), dest_single_js_dir)
             # --- *** 修复结束 *** ---
 
-            # --- 渲染逻辑 (保持不变) ---
-            all_page_data = []
-            for i, session in enumerate(parent_window.sessions):
-                page_num = i + 1
-                _, ext = os.path.splitext(session.image_path)
-                unique_image_filename = f"page-img-{page_num}{ext}"
-                shutil.copy(session.image_path, os.path.join(flipbook_images_dir, unique_image_filename))
+            # --- 渲染逻辑 ---
+            if export_model is None:
+                export_model = ExportModel.build(parent_window, project_path)
+            export_model.stage_media()
+
+            derivatives = export_model.stage_page_derivatives(flipbook_images_dir)
+            page_template_digest = template_digest('flipbook_single/page.html.j2')
 
-                hotspots, _ = cls._collect_hotspots_for_session(session, media_dir, path_prefix="../")
+            def export_page(page):
+                """单页的导出步骤 (在线程池中执行)，返回 manifest 条目。"""
+                page_num = page.page_num
+                unique_image_filename = export_model.place_page_image(page, flipbook_images_dir)
+                hotspots = with_path_prefix(page.hotspots, "../")
 
                 image_path_for_css = f"images_single/{unique_image_filename}"
+                variants = variant_urls(derivatives.get(page_num, []), "images_single/")
                 page_context = {
                     "page_num": page_num,
                     "image_filename": image_path_for_css,
+                    # 背景图使用 image-set 按像素密度选择 (与前端 flipbook.js 的选择规则一致)
+                    "image_1x": pick_variant(variants, SINGLE_PAGE_CSS_WIDTH) if variants else None,
+                    "image_2x": pick_variant(variants, SINGLE_PAGE_CSS_WIDTH * 2) if variants else None,
                     "hotspots": hotspots
                 }
-                page_content = template_manager.render('flipbook_single/page.html.j2', **page_context)
                 page_filename = f"page_{page_num}.html"
-                with open(os.path.join(flipbook_pages_dir, page_filename), "w", encoding="utf-8") as f: f.write(
-                    page_content)
+                # 输入 (模板 + 上下文) 未变化的页面保持原样
+                export_model.write_page_file(
+                    os.path.join(flipbook_pages_dir, page_filename),
+                    input_digest(page_template_digest, page_context),
+                    lambda: template_manager.render('flipbook_single/page.html.j2', **page_context))
+
+                return page.manifest_entry(f"pages_single/{page_filename}", image_path_for_css,
+                                           variants, export_model.derivative_type)
+
+            # --- *** 核心修改: 各页并行渲染，逐页报告进度 *** ---
+            all_page_data = export_model.run_pages("单页画册", export_page)
 
-                all_page_data.append({
-                    "url": f"pages_single/{page_filename}",
-                    "width": session.image_width,
-                    "height": session.image_height
-                })
+            # manifest 同时内嵌到入口页面中，首屏不需要额外的请求
+            export_model.write_manifest("manifest_single.json", all_page_data)
+            export_model.prune_outputs(flipbook_pages_dir, flipbook_images_dir)
 
             nav_html = cls._generate_outline_html(parent_window.outline_data, "#page/")
 
             index_context = {
                 "project_title": "单页翻书画册", "nav_html": nav_html,
                 "pages_data_json": json.dumps(all_page_data),
-                "hotspot_style": cls._get_hotspot_style_context()
+                "hotspot_style": cls._get_hotspot_style_context(),
+                "enhancer_scripts": enhancer_scripts,
+                # 合并、压缩样式表和模块脚本 (文件名带内容摘要)
+                "asset_bundle": build_format_bundle(
+                    project_path, "single",
+                    [os.path.join(dest_static_dir, "css", "main.css"),
+                     os.path.join(dest_shared_assets_dir, "css", "hotspot-enhancer.css")],
+                    os.path.join(dest_static_dir, "js", "main.js")),
+                # 只加载当前页前后 page_window 页的内容 (0 表示一次性加载全部)
+                "page_window": QSettings("MyCompany", "HotspotEditor").value(
+                    "export/page_window", DEFAULT_PAGE_WINDOW, type=int)
             }
             index_content = template_manager.render('flipbook_single/flipbook_view/index.html.j2', **index_context)
 
-            with open(os.path.join(project_path, "index_single.html"), "w", encoding="utf-8") as f:
-                f.write(index_content)
+            write_text_if_changed(os.path.join(project_path, "index_single.html"), index_content)
 
             parent_window.statusBar().showMessage(f"单页画册（左右翻）导出成功！", 5000)
             return project_path
 
+        except ExportCancelled:
+            raise  # 交给调用方 (一键导出) 处理
         except Exception as e:
             import traceback
             QMessageBox.critical(parent_window, "导出失败",
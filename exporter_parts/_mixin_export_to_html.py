@@ -1,7 +1,8 @@
 # D:\projects\singlepage\hotspot_editor\exporter_parts\_mixin_export_to_html.py
 import os
-import shutil
 from PySide6.QtWidgets import QMessageBox
+
+from export_cache import copy_if_changed
 from template_manager import template_manager
 
 
@@ -27,7 +28,8 @@ class ExportToHtmlMixin:
 
         _, ext = os.path.splitext(session.image_path)
         unique_image_filename = f"page-img-{page_num}{ext}"
-        shutil.copy(session.image_path, os.path.join(images_dir, unique_image_filename))
+        # 目标可能是与其他页面或导出目录共享的硬链接，copy_if_changed 会先删除再复制
+        copy_if_changed(session.image_path, os.path.join(images_dir, unique_image_filename))
 
         hotspots, js_popups = cls._collect_hotspots_for_session(session, media_dir, path_prefix="../")
 
@@ -0,0 +1,99 @@
+# FILE: frontend_assets.py
+#
+# 功能: 决定导出网页使用哪些前端运行时脚本 (React、热区增强脚本)，
+#       并把它们复制到导出目录的 js/ 中。
+#
+#       - 如果存在与源文件一致的预编译 hotspot-enhancer.min.js，导出的网页直接加载它，
+#         不再附带 babel.min.js (约 3 MB)，也不需要在浏览器中转译 JSX；
+#       - 预编译文件缺失或已过期时，退回到原来的 Babel 实时转译方式；
+#       - 导出的网页使用 js/ 中附带的 React production 构建 (升级 React 时由 build_frontend.py --vendor-react 更新)；
+#         production 构建缺失时才退回到 development 构建，导出时打印警告，导出的页面中也会留下注释说明。
+
+import hashlib
+import os
+
+from export_cache import copy_if_changed
+
+_APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+JS_LIBRARY_DIR = os.path.join(_APP_ROOT, "js")
+ENHANCER_SOURCE_PATH = os.path.join(_APP_ROOT, "templates", "shared_assets", "js", "hotspot-enhancer.js")
+ENHANCER_COMPILED_PATH = os.path.join(_APP_ROOT, "templates", "shared_assets", "js", "hotspot-enhancer.min.js")
+# 预编译文件头部记录源文件摘要的标记
+SOURCE_DIGEST_MARKER = "source-sha1: "
+
+# React 的版本，与 js/ 中的 production / development 构建一致
+REACT_VERSION = "18.3.1"
+# (npm 包名, production 文件名, development 文件名)
+REACT_BUILDS = [
+    ("react", "react.production.min.js", "react.development.js"),
+    ("react-dom", "react-dom.production.min.js", "react-dom.development.js"),
+]
+
+
+def enhancer_source_digest() -> str:
+    with open(ENHANCER_SOURCE_PATH, 'rb') as f:
+        # 统一换行符，避免 Windows 检出 (CRLF) 时被误判为过期
+        return hashlib.sha1(f.read().replace(b'\r\n', b'\n')).hexdigest()
+
+
+def is_enhancer_precompiled() -> bool:
+    """预编译的增强脚本是否存在，且是由当前的源文件编译而来。"""
+    if not os.path.exists(ENHANCER_COMPILED_PATH):
+        return False
+    with open(ENHANCER_COMPILED_PATH, 'r', encoding='utf-8') as f:
+        header = f.read(512)
+    return f"{SOURCE_DIGEST_MARKER}{enhancer_source_digest()}" in header
+
+
+def has_react_production_builds() -> bool:
+    return all(os.path.exists(os.path.join(JS_LIBRARY_DIR, production_name))
+               for _, production_name, _ in REACT_BUILDS)
+
+
+def copy_enhancer_runtime(project_path: str) -> dict:
+    """
+    把热区增强脚本所需的运行时复制到 project_path/js/，并返回模板上下文。
+
+    Returns:
+        dict: 作为 "enhancer_scripts" 传给 index 模板，包含
+              react_js / react_dom_js / babel_js (不需要时为 None) / enhancer_js / precompiled /
+              react_build ("production" 或 "development")。
+    """
+    dest_root_js_dir = os.path.join(project_path, "js")
+    os.makedirs(dest_root_js_dir, exist_ok=True)
+
+    # 两个文件必须来自同一种构建，不能混用
+    react_build = "production" if has_react_production_builds() else "development"
+    if react_build == "production":
+        react_files = [production_name for _, production_name, _ in REACT_BUILDS]
+    else:
+        react_files = [development_name for _, _, development_name in REACT_BUILDS]
+        print("警告: js/ 中缺少 React 的 production 构建，导出的网页将使用 development 构建 (体积更大、运行更慢)。"
+              "请从版本库中恢复，或运行 python build_frontend.py --vendor-react 重新获取。")
+    precompiled = is_enhancer_precompiled()
+    runtime_files = react_files if precompiled else react_files + ["babel.min.js"]
+    for filename in runtime_files:
+        copy_if_changed(os.path.join(JS_LIBRARY_DIR, filename), dest_root_js_dir)
+
+    # 之前的导出可能使用了另一种 React 构建
+    for _, production_name, development_name in REACT_BUILDS:
+        unused = development_name if react_build == "production" else production_name
+        unused_path = os.path.join(dest_root_js_dir, unused)
+        if os.path.exists(unused_path):
+            os.remove(unused_path)
+
+    if precompiled:
+        # 旧的导出可能留下了 babel.min.js，现在已不再需要
+        stale_babel = os.path.join(dest_root_js_dir, "babel.min.js")
+        if os.path.exists(stale_babel):
+            os.remove(stale_babel)
+
+    return {
+        "react_js": f"js/{react_files[0]}",
+        "react_dom_js": f"js/{react_files[1]}",
+        "babel_js": None if precompiled else "js/babel.min.js",
+        "enhancer_js": "shared_assets/js/hotspot-enhancer.min.js" if precompiled
+        else "shared_assets/js/hotspot-enhancer.js",
+        "precompiled": precompiled,
+        "react_build": react_build,
+    }
@@ -0,0 +1,78 @@
+# FILE: hotspot_geometry.py
+#
+# 功能: 一次性提取一个页面上所有热区的几何数据，并用 NumPy 批量计算
+#       相对于页面图片的百分比坐标 (rel_x / rel_y / rel_w / rel_h)。
+#       所有导出格式都通过这里获取热区位置，而不是逐个热区做除法。
+
+import numpy as np
+from PySide6.QtCore import Qt
+
+from graphics_items import AbstractResizableItem, ResizableEllipseItem
+from utils import create_default_data
+
+
+class PageHotspotGeometry:
+    """
+    一个页面上所有 (带数据的) 热区的几何信息，顺序与 scene.items() 一致。
+
+    Attributes:
+        data (list[dict]): 每个热区的自定义数据。
+        is_ellipse (np.ndarray): 布尔数组，热区是否为椭圆。
+        scene_rects (np.ndarray): (n, 4) 数组，每行为场景中的 left, top, width, height。
+        relative_rects (np.ndarray): (n, 4) 数组，相对于图片尺寸的百分比。
+    """
+
+    def __init__(self, data: list, is_ellipse, scene_rects, image_width: int, image_height: int):
+        self.data = data
+        self.is_ellipse = np.asarray(is_ellipse, dtype=bool)
+        self.scene_rects = np.asarray(scene_rects, dtype=np.float64).reshape(-1, 4)
+        if image_width > 0 and image_height > 0:
+            scale = np.array([image_width, image_height, image_width, image_height], dtype=np.float64)
+            self.relative_rects = self.scene_rects / scale * 100
+        else:
+            self.relative_rects = np.zeros_like(self.scene_rects)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def relative_rect_dicts(self, keys=('rel_x', 'rel_y', 'rel_w', 'rel_h')) -> list:
+        """把百分比坐标转换为字典列表，键名由调用方的导出格式决定。"""
+        return [dict(zip(keys, row)) for row in self.relative_rects.tolist()]
+
+    def iter_hotspots(self, keys=('rel_x', 'rel_y', 'rel_w', 'rel_h')):
+        """逐个产生 (序号, 数据, 是否椭圆, 百分比坐标字典)。"""
+        return zip(range(len(self.data)), self.data, self.is_ellipse.tolist(), self.relative_rect_dicts(keys))
+
+
+def collect_page_hotspot_geometry(session) -> PageHotspotGeometry:
+    """
+    提取会话中所有热区的几何数据。
+
+    对于尚未创建场景的会话 (按需加载且从未访问过的页面)，直接从 pending 热区数据中
+    批量计算，不会为了导出而创建场景和热区项。计算结果与场景中热区项的
+    sceneBoundingRect() 一致 (包含边框笔宽的一半)。
+    """
+    if session.has_scene():
+        items = [item for item in session.scene.items()
+                 if isinstance(item, AbstractResizableItem) and item.data(0)]
+        rects = [item.sceneBoundingRect().getRect() for item in items]
+        return PageHotspotGeometry(
+            [item.data(0) for item in items],
+            [isinstance(item, ResizableEllipseItem) for item in items],
+            rects, session.image_width, session.image_height
+        )
+
+    # 场景中后添加的项排在 scene.items() 的前面，这里保持相同的顺序
+    hotspots = session.pending_hotspots_data[::-1]
+    values = np.array(
+        [(h['pos']['x'], h['pos']['y'], h['rect']['w'], h['rect']['h']) for h in hotspots],
+        dtype=np.float64
+    ).reshape(-1, 4)
+    pen = session.main_window.get_hotspot_pen()
+    half_pen_width = pen.widthF() / 2 if pen.style() != Qt.NoPen else 0.0
+    scene_rects = values + np.array([-half_pen_width, -half_pen_width, 2 * half_pen_width, 2 * half_pen_width])
+    return PageHotspotGeometry(
+        [h.get('data') or create_default_data() for h in hotspots],
+        [h['type'] == 'ellipse' for h in hotspots],
+        scene_rects, session.image_width, session.image_height
+    )
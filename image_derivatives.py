@@ -0,0 +1,127 @@
+# FILE: image_derivatives.py
+#
+# 功能: 导出时为每页图片生成多种宽度的压缩版本 (默认 WebP)，
+#       导出的网页通过 srcset / <picture> 让浏览器按屏幕大小选择合适的图片，
+#       手机不必再下载按导入 DPI 渲染的原始 PNG。
+#       多页时使用进程池并行编码 (与 pdf_processor 的渲染进程池相同的模式)。
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+from PySide6.QtCore import QSettings, Qt
+from PySide6.QtGui import QImage, QImageWriter, QPainter
+
+from pdf_processor import resolve_worker_count
+
+# 生成的宽度 (像素)。原图更窄时只生成不超过原图宽度的版本
+DERIVATIVE_WIDTHS = (480, 960, 1600)
+DEFAULT_FORMAT = "webp"
+DEFAULT_QUALITY = 80
+# 页数少于此值时，启动进程池的开销大于收益，直接串行编码
+PARALLEL_MIN_PAGES = 4
+
+# 格式键 -> (Qt 写入器名称, MIME 类型, 扩展名)
+IMAGE_FORMATS = {
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "avif": ("AVIF", "image/avif", ".avif"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+}
+
+
+def is_format_available(fmt: str) -> bool:
+    """当前 Qt 是否带有该格式的写入插件 (AVIF 需要额外的 kimageformats 插件)。"""
+    if fmt not in IMAGE_FORMATS:
+        return False
+    writer_name = IMAGE_FORMATS[fmt][0].lower().encode()
+    return writer_name in [bytes(f).lower() for f in QImageWriter.supportedImageFormats()]
+
+
+def resolve_format(fmt: str) -> str:
+    """返回实际可用的格式: 所选格式不可用时依次退回到 WebP、JPEG。"""
+    for candidate in (fmt, DEFAULT_FORMAT, "jpeg"):
+        if is_format_available(candidate):
+            return candidate
+    return "jpeg"
+
+
+def target_widths(source_width: int) -> List[int]:
+    """计算某张原图需要生成的宽度，不会放大图片。"""
+    widths = [w for w in DERIVATIVE_WIDTHS if w < source_width]
+    # 原图不比最大宽度大时，再生成一张与原图同宽的压缩版本，作为最清晰的候选
+    if source_width <= DERIVATIVE_WIDTHS[-1]:
+        widths.append(source_width)
+    return widths
+
+
+def load_derivative_settings() -> Tuple[bool, str, int, int]:
+    """读取设置: (是否生成, 格式, 质量, 进程数)。"""
+    settings = QSettings("MyCompany", "HotspotEditor")
+    enabled = settings.value("export/image_derivatives", True, type=bool)
+    fmt = resolve_format(settings.value("export/image_format", DEFAULT_FORMAT))
+    quality = settings.value("export/image_quality", DEFAULT_QUALITY, type=int)
+    workers = settings.value("pdf/render_workers", 0, type=int)
+    return enabled, fmt, quality, workers
+
+
+def _encode_page(source_path: str, stem: str, output_dir: str, fmt: str, quality: int) -> List[Tuple[str, int]]:
+    """
+    进程池的工作函数: 把一张原图缩放并编码为 target_widths() 中的各个宽度。
+
+    该函数必须定义在模块顶层，以便能被 pickle 传递给子进程。
+
+    :return: [(输出文件名, 宽度), ...]，按宽度从小到大排列。原图无法读取时返回空列表。
+    """
+    image = QImage(source_path)
+    if image.isNull():
+        return []
+    writer_name, _, extension = IMAGE_FORMATS[fmt]
+    if fmt == "jpeg" and image.hasAlphaChannel():
+        # JPEG 不支持透明通道，透明区域铺白色
+        flattened = QImage(image.size(), QImage.Format_RGB32)
+        flattened.fill(Qt.white)
+        painter = QPainter(flattened)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        image = flattened
+
+    variants = []
+    for width in target_widths(image.width()):
+        scaled = image if width == image.width() else image.scaledToWidth(width, Qt.SmoothTransformation)
+        filename = f"{stem}-{width}w{extension}"
+        output_path = os.path.join(output_dir, filename)
+        if os.path.exists(output_path):
+            # 旧文件可能是上次导出时创建的硬链接，先删除，避免改写其他目录中的同一文件
+            os.remove(output_path)
+        if scaled.save(output_path, writer_name, quality):
+            variants.append((filename, width))
+    return variants
+
+
+def generate_derivatives(jobs: Dict[int, Tuple[str, str]], output_dir: str, fmt: str,
+                         quality: int = DEFAULT_QUALITY, workers: int = 0) -> Dict[int, List[Tuple[str, int]]]:
+    """
+    为多张图片生成压缩版本。
+
+    Args:
+        jobs (dict): 页码 -> (原图路径, 输出文件名前缀)。
+        output_dir (str): 输出目录。
+        fmt (str): IMAGE_FORMATS 中的格式键。
+        workers (int): 编码进程数，0 表示使用全部 CPU 核心。
+
+    Returns:
+        dict: 页码 -> [(输出文件名, 宽度), ...]
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    page_nums = list(jobs)
+    worker_count = min(resolve_worker_count(workers), len(page_nums))
+    if worker_count > 1 and len(page_nums) >= PARALLEL_MIN_PAGES:
+        try:
+            with ProcessPoolExecutor(max_workers=worker_count) as executor:
+                futures = [executor.submit(_encode_page, *jobs[n], output_dir, fmt, quality) for n in page_nums]
+                return {n: future.result() for n, future in zip(page_nums, futures)}
+        except (BrokenProcessPool, OSError) as e:
+            # 某些受限环境下无法创建子进程，回退到串行模式
+            print(f"多进程图片编码不可用，回退到串行模式: {e}")
+    return {n: _encode_page(*jobs[n], output_dir, fmt, quality) for n in page_nums}
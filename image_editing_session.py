@@ -1,14 +1,27 @@
 # FILE: image_editing_session.py (Corrected)
 from PySide6.QtWidgets import QGraphicsScene, QGraphicsPixmapItem, QMessageBox
-from PySide6.QtGui import QPixmap, QUndoStack
-from PySide6.QtCore import QObject
+from PySide6.QtGui import QPixmap, QUndoStack, QImageReader
+from PySide6.QtCore import QObject, QPointF, QSettings, Signal
+
+from graphics_items import AbstractResizableItem, ResizableRectItem, ResizableEllipseItem
+from tiled_pixmap_item import TiledPixmapItem
+from utils import create_default_data
 
 
 class ImageEditingSession(QObject):
     """
     管理单个页面（图片）的所有状态，包括场景、撤销栈和元数据。
     继承自 QObject 以便能参与Qt的父子对象生命周期管理。
+
+    会话支持“按需加载”：页面元数据和热区数据可以先于场景存在。
+    - scene 在首次访问时才被创建，并根据 pending 热区数据生成热区项；
+    - 图片像素 (QPixmap) 只在 load_image() 时才被解码。
+    对于从PDF导入的页面，默认使用 TiledPixmapItem 从源PDF按缩放级别分块渲染，
+    页面PNG只用来确定场景尺寸。
+    这样打开大型项目时，未访问过的页面不会占用图片内存。
     """
+    # 已解码图片占用的内存发生变化 (分块渲染项新增或淘汰了图块)
+    pixmap_cost_changed = Signal()
 
     def __init__(self, image_path, main_window, next_hotspot_id_start=0,
                  source_pdf_path=None, original_multipage_pdf_path=None, source_page_index=0, parent=None):
@@ -27,13 +40,57 @@ class ImageEditingSession(QObject):
         self.original_multipage_pdf_path = original_multipage_pdf_path
         self.source_page_index = source_page_index
 
-        self.scene = QGraphicsScene()
+        self._scene = None
         self.undo_stack = QUndoStack(self)  # 将 self 作为 QUndoStack 的父对象
         self.pixmap_item = None
         self.viewer = None
         self.image_width = 0
         self.image_height = 0
         self._next_hotspot_id = next_hotspot_id_start
+        # 尚未生成热区项的热区数据 (与项目文件中的格式相同)，场景创建后即被清空
+        self.pending_hotspots_data = []
+
+    @property
+    def scene(self) -> QGraphicsScene:
+        """页面的场景。首次访问时创建，并生成所有待加载的热区项。"""
+        if self._scene is None:
+            self._build_scene()
+        return self._scene
+
+    def has_scene(self) -> bool:
+        """场景是否已经创建 (未创建时，热区数据仍保存在 pending_hotspots_data 中)。"""
+        return self._scene is not None
+
+    def is_image_loaded(self) -> bool:
+        return self.pixmap_item is not None
+
+    def is_pixmap_resident(self) -> bool:
+        """图片像素当前是否驻留在内存中 (可能已被 PixmapCache 释放)。"""
+        if isinstance(self.pixmap_item, TiledPixmapItem):
+            return self.pixmap_item.is_resident()
+        return self.pixmap_item is not None and not self.pixmap_item.pixmap().isNull()
+
+    def pixmap_cost_bytes(self) -> int:
+        if not self.is_pixmap_resident():
+            return 0
+        if isinstance(self.pixmap_item, TiledPixmapItem):
+            return self.pixmap_item.memory_cost_bytes()
+        pixmap = self.pixmap_item.pixmap()
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def release_pixmap(self):
+        """
+        释放已解码的图片以节省内存。
+
+        图片项和场景尺寸都被保留，热区和视图不受影响；
+        下次调用 load_image() 时会重新从磁盘读取。
+        """
+        if not self.is_pixmap_resident():
+            return
+        if isinstance(self.pixmap_item, TiledPixmapItem):
+            self.pixmap_item.release()
+        else:
+            self.pixmap_item.setPixmap(QPixmap())
 
     def get_next_hotspot_id(self) -> int:
         """
@@ -43,11 +100,28 @@ class ImageEditingSession(QObject):
         self._next_hotspot_id += 1
         return current_id
 
+    def read_image_size(self) -> bool:
+        """
+        只读取图片文件头来获得尺寸，不解码像素。
+        返回 True 表示成功，False 表示文件无法识别。
+        """
+        size = QImageReader(self.image_path).size()
+        if not size.isValid() or size.isEmpty():
+            return False
+        self.image_width = size.width()
+        self.image_height = size.height()
+        return True
+
     def load_image(self) -> bool:
         """
         从 self.image_path 加载图片并将其添加到场景中。
         返回 True 表示成功，False 表示失败。
         """
+        if isinstance(self.pixmap_item, TiledPixmapItem):
+            return self.pixmap_item.load()
+        if self.pixmap_item is None and self._use_tiled_rendering() and self._load_tiled_item():
+            return True
+
         try:
             # 使用 with open 读取可以更好地处理文件句柄
             with open(self.image_path, 'rb') as f:
@@ -67,14 +141,76 @@ class ImageEditingSession(QObject):
         self.image_width = pixmap.width()
         self.image_height = pixmap.height()
 
-        # 如果场景中已有旧图片，先移除
+        # 如果场景中已有图片项 (例如图片曾被缓存释放)，直接替换其内容
         if self.pixmap_item:
-            self.scene.removeItem(self.pixmap_item)
-
-        self.pixmap_item = QGraphicsPixmapItem(pixmap)
-        self.pixmap_item.setFlag(QGraphicsPixmapItem.ItemIsSelectable, False)  # 图片本身不可选中
-        self.scene.addItem(self.pixmap_item)
+            self.pixmap_item.setPixmap(pixmap)
+        else:
+            self.pixmap_item = QGraphicsPixmapItem(pixmap)
+            self.pixmap_item.setFlag(QGraphicsPixmapItem.ItemIsSelectable, False)  # 图片本身不可选中
+            # 场景可能先于图片创建 (热区项已经存在)，把图片放在最底层
+            self.pixmap_item.setZValue(-1)
+            self.scene.addItem(self.pixmap_item)
 
         # 设置场景的边界矩形与图片大小一致
         self.scene.setSceneRect(self.pixmap_item.boundingRect())
-        return True
\ No newline at end of file
+        return True
+
+    def _use_tiled_rendering(self) -> bool:
+        if not self.original_multipage_pdf_path:
+            return False
+        settings = QSettings("MyCompany", "HotspotEditor")
+        return settings.value("editor/tiled_rendering", True, type=bool)
+
+    def _load_tiled_item(self) -> bool:
+        """
+        尝试用分块渲染图形项显示页面。失败时返回 False，调用方应退回到整页图片。
+        场景尺寸仍取自页面PNG，以保证热区坐标不变。
+        """
+        if not TiledPixmapItem.can_render(self.original_multipage_pdf_path, self.source_page_index):
+            return False
+        if not self.read_image_size():
+            return False
+        try:
+            item = TiledPixmapItem(self.original_multipage_pdf_path, self.source_page_index,
+                                   self.image_width, self.image_height, preview_image_path=self.image_path)
+        except Exception as e:
+            print(f"无法创建分块渲染项，改用整页图片: {e}")
+            return False
+        if not item.load():
+            return False
+
+        self.pixmap_item = item
+        self.pixmap_item.memory_changed.connect(self.pixmap_cost_changed)
+        self.pixmap_item.setZValue(-1)
+        self.scene.addItem(self.pixmap_item)
+        self.scene.setSceneRect(self.pixmap_item.boundingRect())
+        return True
+
+    def attach_viewer(self, viewer):
+        """关联视图，并让已存在的热区项使用该视图计算控制点大小。"""
+        self.viewer = viewer
+        for item in self.scene.items():
+            if isinstance(item, AbstractResizableItem):
+                item.viewer = viewer
+
+    def _build_scene(self):
+        self._scene = QGraphicsScene()
+        self._scene.setSceneRect(0, 0, self.image_width, self.image_height)
+        self._scene.selectionChanged.connect(self.main_window.update_hotspot_info)
+
+        hotspots_data, self.pending_hotspots_data = self.pending_hotspots_data, []
+        if not hotspots_data:
+            return
+
+        pen = self.main_window.get_hotspot_pen()
+        brush = self.main_window.get_hotspot_brush()
+        bounds = self._scene.sceneRect()
+        for hotspot in hotspots_data:
+            shape_class = ResizableEllipseItem if hotspot['type'] == 'ellipse' else ResizableRectItem
+            rect_data, pos_data = hotspot['rect'], hotspot['pos']
+            item = shape_class(0, 0, rect_data['w'], rect_data['h'], bounds=bounds, viewer=self.viewer)
+            item.setPos(QPointF(pos_data['x'], pos_data['y']))
+            item.setData(0, hotspot.get('data') or create_default_data())
+            item.setPen(pen)
+            item.setBrush(brush)
+            self._scene.addItem(item)
@@ -1,6 +1,7 @@
 # D:\projects\singlepage\hotspot_editor\main.py (最终版 - 保持原有运行方式)
 
 import sys
+import multiprocessing
 from PySide6.QtWidgets import QApplication, QMessageBox
 from main_window import HotspotEditor
 import nltk
@@ -28,6 +29,8 @@ def setup_nltk():
 
 
 if __name__ == "__main__":
+    # PDF 渲染使用进程池；打包 (frozen) 后的程序需要此调用才能正确启动子进程
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
 
     try:
@@ -47,6 +47,8 @@ from main_window_parts._mixin_process_and_load_source_for_page import ProcessAnd
 # --- F. 页面与会话管理 ---
 from main_window_parts._mixin_open_image import OpenImageMixin
 from main_window_parts._mixin_load_image_path import LoadImagePathMixin
+from main_window_parts._mixin_background_pdf_import import BackgroundPdfImportMixin
+from main_window_parts._mixin_materialize_session import MaterializeSessionMixin
 from main_window_parts._mixin_active_session_property import ActiveSessionPropertyMixin
 from main_window_parts._mixin_set_active_session import SetActiveSessionMixin
 from main_window_parts._mixin_set_active_session_by_viewer import SetActiveSessionByViewerMixin
@@ -111,6 +113,7 @@ class HotspotEditor(
     # --- *** 核心修改: 将新的 AutoIconHandlerMixin 添加到继承列表中 *** ---
     AutoIconHandlerMixin,
     # --- *** 修复结束 *** ---
+    BackgroundPdfImportMixin,
     BatchImportHotspotsMixin,
     ClearProjectMixin,
     CloseEventMixin,
@@ -146,6 +149,7 @@ class HotspotEditor(
     HandleViewerPressMixin,
     LoadImagePathMixin,
     LoadLastProjectMixin,
+    MaterializeSessionMixin,
     NewProjectMixin,
     NextPageMixin,
     OnGeometryFieldCommittedMixin,
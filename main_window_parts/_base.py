@@ -13,11 +13,12 @@ from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QSplitter
 )
 from PySide6.QtGui import QUndoStack
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QSettings
 
 # --- Project-specific Imports (核心修复：将相对导入改为绝对导入) ---
 from preview_server import PreviewServer
 from pdf_processor import PdfProcessor
+from pixmap_cache import PixmapCache, DEFAULT_BUDGET_MB
 from project_manager import ProjectManager
 from outline_editor_widget import OutlineEditorWidget
 
@@ -41,6 +42,10 @@ class HotspotEditorBase(QMainWindow):
 
         self.pdf_processor = PdfProcessor()
         self.project_manager = ProjectManager()
+        settings = QSettings("MyCompany", "HotspotEditor")
+        self.pixmap_cache = PixmapCache(
+            settings.value("editor/pixmap_cache_mb", DEFAULT_BUDGET_MB, type=int), self
+        )
 
         # --- 主窗口布局初始化 ---
         self.central_widget = QWidget()
@@ -75,6 +80,12 @@ class HotspotEditorBase(QMainWindow):
         # UI 内部状态
         self._is_scrolling_programmatically = False
 
+        # 后台页面导入 (PdfImportWorker)，未在导入时为 None
+        self.pdf_import_worker = None
+        self._import_base_insertion_index = -1
+        self._import_added_count = 0
+        self._import_lazy = False
+
         # UI 控件的占位符 (这些将在 setup_ui mixin 中被实际创建和赋值)
         self.scroll_area = None
         self.scroll_area_widget_contents = None
@@ -98,6 +109,9 @@ class HotspotEditorBase(QMainWindow):
         self.btn_export_current_page_data = None
         self.btn_pdf_toolbox = None
         self.btn_batch_scale = None
+        self.import_progress_bar = None
+        self.btn_cancel_import = None
+        self.pixmap_cache_label = None
         self.txt_id = None
         self.txt_description = None
         self.txt_x = None
@@ -0,0 +1,132 @@
+# D:\projects\singlepage\hotspot_editor\main_window_parts\_mixin_background_pdf_import.py
+#
+# 功能: 管理后台页面导入线程 (PdfImportWorker)：启动、接收逐页结果、显示进度和取消。
+
+# --- Project-specific Imports ---
+from pdf_import_worker import PdfImportWorker
+
+
+class BackgroundPdfImportMixin:
+    """
+    一个 Mixin 类，负责在后台线程中导入页面，并把完成的页面逐个插入到项目中。
+    """
+
+    def _start_background_import(self, jobs: list, base_insertion_index: int):
+        """
+        启动后台导入线程。
+
+        Args:
+            jobs (list): PdfImportWorker 的任务列表，顺序即页面插入顺序。
+            base_insertion_index (int): 第一个新页面的插入位置，-1 表示追加到末尾。
+        """
+        self._import_base_insertion_index = base_insertion_index
+        self._import_added_count = 0
+        self._import_lazy = self._is_lazy_page_loading_enabled()
+
+        worker = PdfImportWorker(jobs, self)
+        worker.page_ready.connect(self._on_import_page_ready)
+        worker.progress_updated.connect(self._on_import_progress)
+        worker.status_updated.connect(self._on_import_status)
+        worker.file_failed.connect(self._on_import_file_failed)
+        worker.finished.connect(self._on_import_finished)
+        self.pdf_import_worker = worker
+
+        self.import_progress_bar.setRange(0, 0)  # 在第一条进度到达之前显示为忙碌状态
+        self.import_progress_bar.show()
+        self.btn_cancel_import.setEnabled(True)
+        self.btn_cancel_import.show()
+        worker.start()
+
+    def is_background_import_running(self) -> bool:
+        return self.pdf_import_worker is not None
+
+    def cancel_background_import(self, wait: bool = False):
+        """
+        取消正在进行的后台导入。已经插入的页面会被保留。
+
+        Args:
+            wait (bool): 是否阻塞等待线程结束。在清空项目或关闭窗口前必须为 True，
+                         以免线程在页面列表被清空后继续发送结果。
+        """
+        worker = self.pdf_import_worker
+        if worker is None:
+            return
+        worker.cancel()
+        self.btn_cancel_import.setEnabled(False)
+        self.statusBar().showMessage("正在取消导入...")
+        if wait:
+            worker.wait()
+            self._on_import_finished()
+
+    def _is_current_import_signal(self) -> bool:
+        # 已取消或已结束的线程可能仍有排队中的信号，这些信号必须被忽略
+        sender = self.sender()
+        return sender is not None and sender is self.pdf_import_worker
+
+    def _on_import_page_ready(self, page_info: dict):
+        """每当后台线程完成一个页面时被调用，将该页面插入项目。"""
+        if not self._is_current_import_signal():
+            return
+
+        base_index = self._import_base_insertion_index
+        insertion_index = -1
+        if base_index != -1:
+            # 导入期间用户可能删除了页面，插入位置不能超过当前页数
+            insertion_index = min(base_index + self._import_added_count, len(self.sessions))
+
+        count_before = len(self.sessions)
+        self._load_image_path(
+            page_info['file_path'],
+            insertion_index=insertion_index,
+            source_pdf_path=page_info.get('source_pdf_path'),
+            original_multipage_pdf_path=page_info.get('original_multipage_pdf_path'),
+            source_page_index=page_info.get('source_page_index', 0),
+            lazy=self._import_lazy
+        )
+        if len(self.sessions) == count_before:
+            return
+        self._import_added_count += 1
+
+        if self._import_added_count == 1:
+            # 第一个页面到达后立即切换过去，用户可以在其余页面渲染期间开始编辑
+            self.update_viewers_layout()
+            self.set_active_session(base_index if base_index != -1 else 0)
+            self.set_dirty(True)
+            return
+
+        # QStackedWidget 在当前页之前插入时会保持当前控件不变，这里同步修正索引
+        if insertion_index != -1 and insertion_index <= self.active_session_index:
+            self.active_session_index += 1
+        self.update_ui_for_active_session()
+
+    def _on_import_progress(self, current_page: int, total_pages: int):
+        if not self._is_current_import_signal():
+            return
+        self.import_progress_bar.setRange(0, total_pages)
+        self.import_progress_bar.setValue(current_page)
+
+    def _on_import_status(self, message: str):
+        if not self._is_current_import_signal():
+            return
+        self.statusBar().showMessage(message)
+
+    def _on_import_file_failed(self, file_path: str, message: str):
+        if not self._is_current_import_signal():
+            return
+        print(f"导入文件失败: {file_path}: {message}")
+        self.statusBar().showMessage(f"导入失败: {file_path}", 5000)
+
+    def _on_import_finished(self):
+        worker = self.pdf_import_worker
+        sender = self.sender()
+        if worker is None or (isinstance(sender, PdfImportWorker) and sender is not worker):
+            return
+        self.pdf_import_worker = None
+        self.import_progress_bar.hide()
+        self.btn_cancel_import.hide()
+
+        if worker.is_cancelled():
+            self.statusBar().showMessage(f"导入已取消，已添加 {self._import_added_count} 页。", 3000)
+        else:
+            self.statusBar().showMessage("文件添加完成！", 2000)
+        worker.deleteLater()
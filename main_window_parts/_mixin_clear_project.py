@@ -2,6 +2,9 @@
 #
 # 功能: 提供 clear_project 方法，用于重置和清空当前工作区。
 
+from pdf_document_pool import pdf_document_pool
+
+
 class ClearProjectMixin:
     """
     一个 Mixin 类，包含用于清空当前项目工作区的 clear_project 方法。
@@ -11,6 +14,9 @@ class ClearProjectMixin:
         """
         重置应用程序状态，清空所有项目相关的数据。
         """
+        # 0. 先停止后台导入，避免线程在页面列表被清空后继续插入页面
+        self.cancel_background_import(wait=True)
+
         # --- *** 核心修改: 更新 UI 重置逻辑 *** ---
         # 1. 遍历 QStackedWidget 中的所有页面
         if self.page_stack:
@@ -37,6 +43,10 @@ class ClearProjectMixin:
         self.outline_widget.populate_tree([])
         self.project_undo_stack.clear()
 
+        # 释放共享文档池中的文件句柄，避免旧项目的PDF在 Windows 下保持被占用
+        pdf_document_pool.clear()
+        self.pixmap_cache.clear()
+
         # --- 4. 更新整个 UI 的状态以反映已清空 (这部分保持不变) ---
         self.update_ui_for_active_session()
         self.set_dirty(False)
\ No newline at end of file
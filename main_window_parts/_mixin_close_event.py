@@ -50,4 +50,8 @@ class CloseEventMixin:
                 event.ignore()
         else:
             # 如果没有未保存的更改，直接接受关闭事件
-            event.accept()
\ No newline at end of file
+            event.accept()
+
+        # 窗口确定关闭时，停止后台导入线程
+        if event.isAccepted():
+            self.cancel_background_import(wait=True)
\ No newline at end of file
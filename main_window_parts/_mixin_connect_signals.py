@@ -29,6 +29,8 @@ class ConnectSignalsMixin:
         self.outline_widget.item_clicked.connect(self.go_to_page)
         self.outline_widget.outline_changed.connect(self._on_outline_changed)
         self.pdf_processor.progress_updated.connect(self._update_pdf_conversion_progress)
+        self.btn_cancel_import.clicked.connect(lambda: self.cancel_background_import())
+        self.pixmap_cache.stats_changed.connect(self._update_pixmap_cache_status)
 
         # --- 属性面板 ---
         for editor in [self.txt_x, self.txt_y, self.txt_width, self.txt_height]:
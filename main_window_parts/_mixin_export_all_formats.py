@@ -11,6 +11,7 @@ from PySide6.QtCore import Qt
 # --- Project-specific Imports ---
 from exporter import HtmlExporter
 from exporter_flip import export_as_modular_flipbook
+from export_model import ExportCancelled, ExportModel
 
 class ExportAllFormatsMixin:
     """
@@ -22,15 +23,18 @@ class ExportAllFormatsMixin:
 
         此方法会依次调用三种不同格式的导出函数，并使用一个
         `QProgressDialog` 来向用户显示长时间操作的进度。
+        三种格式共享同一个 ExportModel：热区只收集一次，媒体只复制一次，
+        页面图片在各格式目录之间尽量使用硬链接。
 
         流程：
         1. 检查项目是否已保存且有内容可供导出。
         2. 创建并显示一个进度对话框。
-        3. 按顺序执行三种导出：
+        3. 构建共享的导出中间模型，然后按顺序执行三种导出：
            - 双页画册 (export_as_modular_flipbook)
            - 单页画册 (HtmlExporter.export_as_single_page_flipbook)
            - 动态网页 (HtmlExporter.export_as_dynamic_page)
-        4. 在每个步骤之间更新进度对话框，并检查用户是否点击了“取消”。
+        4. 每导出完一页就更新进度对话框，并检查用户是否点击了“取消”
+           (各格式内部的页面在线程池中并行渲染，取消在页与页之间生效)。
         5. 所有导出完成后，显示成功信息并启用预览按钮。
         6. 捕获任何异常或用户的取消操作，并给出相应提示。
         """
@@ -47,40 +51,54 @@ class ExportAllFormatsMixin:
             QMessageBox.critical(self, "错误", "无法确定项目输出目录。")
             return
 
-        # 2. 创建并显示进度对话框
-        progress = QProgressDialog("正在一键导出所有格式...", "取消", 0, 3, self)
+        # 2. 创建并显示进度对话框 (进度按页计算: 三种格式 × 页数)
+        page_count = len(self.sessions)
+        progress = QProgressDialog("正在一键导出所有格式...", "取消", 0, 3 * page_count, self)
         progress.setWindowModality(Qt.WindowModal)
         progress.setWindowTitle("批量导出")
         progress.show()
 
         try:
-            # --- 步骤 1: 导出双页画册 ---
+            # --- 步骤 0: 一次性收集所有页面的热区和媒体 ---
             QApplication.processEvents() # 确保对话框能立即显示
+            progress.setLabelText("正在收集页面数据...")
+            export_model = ExportModel.build(self, output_dir)
+
+            # 各格式逐页报告进度 (在 GUI 线程中调用)
+            format_order = ["双页画册", "单页画册", "动态网页"]
+
+            def on_page_done(format_label, done, total):
+                progress.setLabelText(f"正在导出为{format_label}... ({done}/{total})")
+                progress.setValue(format_order.index(format_label) * page_count + done)
+                QApplication.processEvents()
+
+            export_model.progress_callback = on_page_done
+            export_model.cancel_check = progress.wasCanceled
+
+            # --- 步骤 1: 导出双页画册 ---
+            QApplication.processEvents()
             progress.setLabelText("正在导出为双页画册...")
-            export_as_modular_flipbook(self, output_dir)
-            progress.setValue(1)
+            export_as_modular_flipbook(self, output_dir, export_model)
 
             # --- 步骤 2: 导出单页画册 ---
             QApplication.processEvents() # 刷新UI
             if progress.wasCanceled(): 
-                raise InterruptedError("用户取消") # 自定义一个错误以便捕获
+                raise ExportCancelled()
             progress.setLabelText("正在导出为单页画册...")
-            HtmlExporter.export_as_single_page_flipbook(self, output_dir)
-            progress.setValue(2)
+            HtmlExporter.export_as_single_page_flipbook(self, output_dir, export_model)
 
             # --- 步骤 3: 导出动态网页 ---
             QApplication.processEvents() # 刷新UI
             if progress.wasCanceled(): 
-                raise InterruptedError("用户取消")
+                raise ExportCancelled()
             progress.setLabelText("正在导出为动态网页...")
-            HtmlExporter.export_as_dynamic_page(self, output_dir)
-            progress.setValue(3)
+            HtmlExporter.export_as_dynamic_page(self, output_dir, export_model)
 
             # 5. 成功完成
             self.btn_preview.setEnabled(True)
             self.statusBar().showMessage("一键导出成功！所有格式已导出到项目输出目录。", 5000)
 
-        except InterruptedError:
+        except ExportCancelled:
             self.statusBar().showMessage("导出操作被用户取消。", 3000)
         except Exception as e:
             # 6. 捕获其他异常
@@ -88,7 +106,3 @@ class ExportAllFormatsMixin:
         finally:
             # 确保进度对话框总是被关闭
             progress.close()
-
-# 为了在 try...except 中使用，我们可以在模块级别定义这个简单的异常
-class InterruptedError(Exception):
-    pass
\ No newline at end of file
@@ -5,13 +5,10 @@
 import os
 
 # --- Qt Imports ---
-from PySide6.QtCore import QPointF
-from PySide6.QtWidgets import QSizePolicy
+from PySide6.QtWidgets import QWidget
 
 # --- Project-specific Imports ---
 from image_editing_session import ImageEditingSession
-from photo_viewer import PhotoViewer
-from graphics_items import ResizableRectItem, ResizableEllipseItem
 from utils import create_default_data
 
 
@@ -23,10 +20,14 @@ class LoadImagePathMixin:
     def _load_image_path(self, file_path: str, hotspots_data: list = None,
                          next_hotspot_id_start: int = 0, insertion_index: int = -1,
                          source_pdf_path: str = None, original_multipage_pdf_path: str = None,
-                         source_page_index: int = 0):
+                         source_page_index: int = 0, lazy: bool = False):
         """
         加载指定的图像文件，为其创建一个新的 ImageEditingSession 和 PhotoViewer，
         并将其添加到主窗口的布局和数据结构中。
+
+        当 lazy 为 True 时，只读取图片尺寸并保存热区数据，页面在 page_stack 中
+        暂时由一个空白占位控件代替；图片、热区项和 PhotoViewer 要等到
+        set_active_session 首次访问该页时才会创建 (见 MaterializeSessionMixin)。
         """
         if not file_path or not os.path.exists(file_path):
             print(f"警告: _load_image_path 接收到无效的文件路径: {file_path}，已跳过。")
@@ -40,14 +41,29 @@ class LoadImagePathMixin:
             parent=self
         )
 
-        if not session.load_image():
+        if lazy and not session.read_image_size():
+            print(f"警告: 无法识别图片文件: {file_path}，已跳过。")
             return
 
-        viewer = PhotoViewer(session.scene, self)
-        session.viewer = viewer
-        # --- *** 核心修改 1/2: 调整 SizePolicy *** ---
-        # 允许 viewer 在 QStackedWidget 中自由缩放
-        viewer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # 热区项在场景首次创建时才生成，这里先补全缺失的ID并保存数据
+        pending_hotspots = []
+        for hotspot in hotspots_data or []:
+            data = hotspot.get('data') or create_default_data()
+            if not data.get('id'):
+                hotspot_id = session.get_next_hotspot_id()
+                temp_page_id = len(self.sessions)
+                data['id'] = f"{self.project_id}_p{temp_page_id}_h{hotspot_id}"
+            pending_hotspots.append(dict(hotspot, data=data))
+        session.pending_hotspots_data = pending_hotspots
+
+        if lazy:
+            viewer = None
+            page_widget = QWidget()  # 占位控件，页面被访问时替换为 PhotoViewer
+        else:
+            viewer = self._create_viewer_for_session(session)
+            if viewer is None:
+                return
+            page_widget = viewer
 
         # --- 连接信号 (这部分代码与上次修复后保持一致) ---
         session.undo_stack.cleanChanged.connect(
@@ -55,43 +71,16 @@ class LoadImagePathMixin:
         )
         session.undo_stack.canUndoChanged.connect(self.update_ui_for_active_session, self)
         session.undo_stack.canRedoChanged.connect(self.update_ui_for_active_session, self)
-        viewer.deleteRequested.connect(self.delete_selected_hotspot)
-        viewer.copyRequested.connect(self.copy_selected_hotspots)
-        viewer.pasteRequested.connect(self.paste_hotspots)
-        session.scene.selectionChanged.connect(self.update_hotspot_info)
-
-        if hotspots_data:
-            pen = self.get_hotspot_pen()
-            brush = self.get_hotspot_brush()
-            for hotspot in hotspots_data:
-                shape_class = ResizableEllipseItem if hotspot['type'] == 'ellipse' else ResizableRectItem
-                rect_data, pos_data = hotspot['rect'], hotspot['pos']
-                item = shape_class(0, 0, rect_data['w'], rect_data['h'], bounds=session.scene.sceneRect(),
-                                   viewer=viewer)
-                item.setPos(QPointF(pos_data['x'], pos_data['y']))
-
-                data = hotspot.get('data') or create_default_data()
-                if not data.get('id'):
-                    hotspot_id = session.get_next_hotspot_id()
-                    temp_page_id = len(self.sessions)
-                    data['id'] = f"{self.project_id}_p{temp_page_id}_h{hotspot_id}"
-
-                item.setData(0, data)
-                item.setPen(pen)
-                item.setBrush(brush)
-                session.scene.addItem(item)
 
         # --- *** 核心修改 2/2: 修改页面添加逻辑 *** ---
         # 将新创建的会话和视图插入到正确的位置
         if insertion_index != -1 and 0 <= insertion_index <= len(self.sessions):
             # 使用 QStackedWidget.insertWidget
-            self.page_stack.insertWidget(insertion_index, viewer)
+            self.page_stack.insertWidget(insertion_index, page_widget)
             self.sessions.insert(insertion_index, session)
             self.viewer_widgets.insert(insertion_index, viewer)
         else:
             # 使用 QStackedWidget.addWidget
-            self.page_stack.addWidget(viewer)
+            self.page_stack.addWidget(page_widget)
             self.sessions.append(session)
             self.viewer_widgets.append(viewer)
-
-        viewer.mousePressEvent = lambda event, v=viewer: self.handle_viewer_press(event, v)
\ No newline at end of file
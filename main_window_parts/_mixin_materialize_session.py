@@ -0,0 +1,92 @@
+# D:\projects\singlepage\hotspot_editor\main_window_parts\_mixin_materialize_session.py
+#
+# 功能: 提供按需加载页面的方法。以延迟模式加载的页面在首次被访问时，
+#       才解码图片、生成热区项并创建 PhotoViewer。
+
+# --- Qt Imports ---
+from PySide6.QtCore import QSettings
+from PySide6.QtWidgets import QSizePolicy
+
+# --- Project-specific Imports ---
+from photo_viewer import PhotoViewer
+
+# 激活某一页后，预先加载其前后各多少页
+PREFETCH_NEIGHBOUR_PAGES = 1
+
+
+class MaterializeSessionMixin:
+    """
+    一个 Mixin 类，负责把“仅有元数据”的页面转换为可编辑的完整页面。
+    """
+
+    def _is_lazy_page_loading_enabled(self) -> bool:
+        settings = QSettings("MyCompany", "HotspotEditor")
+        return settings.value("editor/lazy_page_loading", True, type=bool)
+
+    def _create_viewer_for_session(self, session) -> PhotoViewer | None:
+        """
+        为会话解码图片 (通过图片缓存) 并创建 PhotoViewer。图片加载失败时返回 None。
+        """
+        if not self.pixmap_cache.acquire(session):
+            return None
+        # 分块渲染的页面在显示过程中不断增加图块，内存开销需要随之更新
+        session.pixmap_cost_changed.connect(lambda: self.pixmap_cache.update_cost(session))
+
+        viewer = PhotoViewer(session.scene, self)
+        # --- *** 核心修改 1/2: 调整 SizePolicy *** ---
+        # 允许 viewer 在 QStackedWidget 中自由缩放
+        viewer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        session.attach_viewer(viewer)
+
+        viewer.deleteRequested.connect(self.delete_selected_hotspot)
+        viewer.copyRequested.connect(self.copy_selected_hotspots)
+        viewer.pasteRequested.connect(self.paste_hotspots)
+        viewer.mousePressEvent = lambda event, v=viewer: self.handle_viewer_press(event, v)
+        return viewer
+
+    def _ensure_session_materialized(self, index: int) -> bool:
+        """
+        确保指定索引的页面已经拥有 PhotoViewer，且其图片驻留在内存中。
+
+        对于延迟加载的页面，创建 viewer 并替换 page_stack 中的占位控件；
+        对于图片已被缓存淘汰的页面，从磁盘重新加载图片。
+
+        Returns:
+            bool: 页面已可用返回 True；图片无法加载时返回 False。
+        """
+        if not (0 <= index < len(self.sessions)):
+            return False
+        if self.viewer_widgets[index] is not None:
+            return self.pixmap_cache.acquire(self.sessions[index])
+
+        viewer = self._create_viewer_for_session(self.sessions[index])
+        if viewer is None:
+            return False
+
+        # 先插入再移除，QStackedWidget 会保持当前显示的控件不变
+        placeholder = self.page_stack.widget(index)
+        self.page_stack.insertWidget(index, viewer)
+        if placeholder is not None:
+            self.page_stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+        self.viewer_widgets[index] = viewer
+        return True
+
+    def _prefetch_neighbour_sessions(self):
+        """在空闲时预先加载当前页前后的页面，使翻页时无需等待图片解码。"""
+        center = self.active_session_index
+        if center < 0:
+            return
+        for offset in range(1, PREFETCH_NEIGHBOUR_PAGES + 1):
+            for index in (center + offset, center - offset):
+                if 0 <= index < len(self.sessions) and (
+                        self.viewer_widgets[index] is None or not self.sessions[index].is_pixmap_resident()):
+                    self._ensure_session_materialized(index)
+
+    def _update_pixmap_cache_status(self):
+        """在状态栏中显示图片缓存的当前统计数据。"""
+        cache = self.pixmap_cache
+        self.pixmap_cache_label.setText(
+            f"图片缓存: {len(cache)} 页 / {cache.used_bytes / (1024 * 1024):.0f} MB  "
+            f"命中 {cache.hits}  未命中 {cache.misses}  淘汰 {cache.evictions}"
+        )
@@ -2,9 +2,13 @@
 #
 # 功能: 提供 _on_settings_applied 槽函数，用于在首选项更改后更新UI。
 
+# --- Qt Imports ---
+from PySide6.QtCore import QSettings
+
 # --- Project-specific Imports ---
 # 导入 AbstractResizableItem 用于类型检查
 from graphics_items import AbstractResizableItem
+from pixmap_cache import DEFAULT_BUDGET_MB
 
 
 class OnSettingsAppliedMixin:
@@ -19,12 +23,19 @@ class OnSettingsAppliedMixin:
         此方法会重新获取最新的画笔和画刷设置，并遍历当前所有会话
         中的所有热区项，将新的样式应用给它们，最后刷新视图。
         """
+        # 应用新的图片缓存预算 (超出部分会立即被淘汰)
+        settings = QSettings("MyCompany", "HotspotEditor")
+        self.pixmap_cache.set_budget_mb(settings.value("editor/pixmap_cache_mb", DEFAULT_BUDGET_MB, type=int))
+
         # 从 QSettings 中获取更新后的画笔和画刷
         new_pen = self.get_hotspot_pen()
         new_brush = self.get_hotspot_brush()
 
         # 遍历所有已加载的会话 (pages)
         for session in self.sessions:
+            # 尚未创建场景的延迟加载页面，会在创建热区项时直接使用新样式
+            if not session.has_scene():
+                continue
             # 遍历当前会话场景中的所有图形项
             for item in session.scene.items():
                 # 检查该项是否是我们的自定义热区项
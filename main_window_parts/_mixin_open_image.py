@@ -3,7 +3,6 @@
 # 功能: 提供 open_image 方法，用于向当前项目添加新的页面（图片或PDF）。
 
 import os
-import shutil
 
 # --- Qt Imports ---
 from PySide6.QtWidgets import QMessageBox, QFileDialog
@@ -19,10 +18,13 @@ class OpenImageMixin:
         """
         处理“添加页面到项目...”的完整流程。
         """
-        # 1. 前置检查：必须有已保存的项目
+        # 1. 前置检查：必须有已保存的项目，且没有正在进行的导入
         if not self.project_path:
             QMessageBox.warning(self, "无打开的项目", "请先新建或打开一个项目，再添加图片。")
             return
+        if self.is_background_import_running():
+            QMessageBox.information(self, "正在导入", "上一次添加的页面仍在后台导入中，请等待完成或取消后再试。")
+            return
 
         # --- *** 关键修复：恢复被错误省略的代码 *** ---
         # 2. 弹出文件选择对话框，并在这里定义 file_paths
@@ -55,62 +57,26 @@ class OpenImageMixin:
             else:  # after_btn
                 base_insertion_index = self.active_session_index + 1
 
-        target_session_index_after_add = base_insertion_index if base_insertion_index != -1 else 0
-
-        initial_count = len(self.sessions)
-        added_count = 0
-
-        # 4. 遍历并处理所有选中的文件
-        try:
-            for path in file_paths:
-                current_insertion_index = base_insertion_index + added_count if base_insertion_index != -1 else -1
-
-                if os.path.splitext(path)[1].lower() == '.pdf':
-                    # --- 处理 PDF 文件 ---
-                    workspace_path = self._get_workspace_path()
-                    sources_dir = os.path.join(workspace_path, "sources")
-                    os.makedirs(sources_dir, exist_ok=True)
-
-                    source_filename = os.path.basename(path)
-                    source_copy_path = os.path.join(sources_dir, source_filename)
-                    if not os.path.exists(source_copy_path):
-                        shutil.copy2(path, source_copy_path)
-
-                    asset_dir = self._get_project_asset_dir_path(source_copy_path)
-
-                    settings = QSettings("MyCompany", "HotspotEditor")
-                    dpi = settings.value("pdf/resolution_dpi", 150, type=int)
-
-                    processed_result = self.pdf_processor.process(source_copy_path, asset_dir, resolution_dpi=dpi)
-
-                    if processed_result:
-                        png_paths, single_pdf_paths = processed_result
-
-                        for page_index, (img_path, pdf_path) in enumerate(zip(png_paths, single_pdf_paths)):
-                            current_insertion_index_for_page = base_insertion_index + added_count if base_insertion_index != -1 else -1
-                            self._load_image_path(
-                                img_path,
-                                insertion_index=current_insertion_index_for_page,
-                                source_pdf_path=pdf_path,
-                                original_multipage_pdf_path=source_copy_path,
-                                source_page_index=page_index
-                            )
-                            added_count += 1
-
-                else:
-                    # --- 处理单个图片文件 ---
-                    self._load_image_path(
-                        path,
-                        insertion_index=current_insertion_index,
-                        source_page_index=0
-                    )
-                    added_count += 1
-
-        finally:
-            self.statusBar().showMessage("文件添加完成！", 2000)
-
-        # 5. 如果成功添加了任何页面，则更新UI
-        if len(self.sessions) > initial_count:
-            self.update_viewers_layout()
-            self.set_active_session(target_session_index_after_add)
-            self.set_dirty(True)
\ No newline at end of file
+        # 4. 为所有选中的文件构建导入任务 (文件顺序即页面插入顺序)
+        workspace_path = self._get_workspace_path()
+        sources_dir = os.path.join(workspace_path, "sources")
+        settings = QSettings("MyCompany", "HotspotEditor")
+        dpi = settings.value("pdf/resolution_dpi", 150, type=int)
+        workers = settings.value("pdf/render_workers", 0, type=int)
+
+        jobs = []
+        for path in file_paths:
+            if os.path.splitext(path)[1].lower() == '.pdf':
+                source_copy_path = os.path.join(sources_dir, os.path.basename(path))
+                jobs.append({
+                    'path': path,
+                    'source_copy_path': source_copy_path,
+                    'asset_dir': self._get_project_asset_dir_path(source_copy_path),
+                    'dpi': dpi,
+                    'workers': workers,
+                })
+            else:
+                jobs.append({'path': path})
+
+        # 5. 在后台线程中复制和渲染，页面完成后逐个插入项目 (见 BackgroundPdfImportMixin)
+        self._start_background_import(jobs, base_insertion_index)
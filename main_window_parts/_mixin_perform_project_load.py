@@ -26,8 +26,9 @@ class PerformProjectLoadMixin:
         2. 调用 project_manager 加载并预处理项目数据。
         3. 设置 project_id 和提纲。
         4. 遍历项目数据中的每个页面定义。
-        5. 检查页面的缓存资源是否存在，如果存在则直接加载。
-        6. 如果缓存不存在，则调用 _process_and_load_source_for_page 重新生成。
+        5. 检查页面的缓存资源是否存在且有效，如果是则直接加载
+           (启用“按需加载页面”时只登记页面，图片在首次访问时才解码)。
+        6. 如果缓存缺失或过期，则调用 _process_and_load_source_for_page 只重新生成该页。
         7. 加载完成后，更新UI布局和状态，并将路径存入 QSettings。
 
         Args:
@@ -50,6 +51,10 @@ class PerformProjectLoadMixin:
 
             all_pages_data = project_data.get('pages', [])
 
+            # 延迟加载模式下只读取页面元数据和热区数据，图片和 viewer 在首次访问时创建，
+            # 因此打开项目所需的时间基本与页数无关
+            lazy = self._is_lazy_page_loading_enabled()
+
             # 4. 遍历并加载每个页面
             for page_data in all_pages_data:
                 # 获取工作区内资源的绝对路径 (由 project_manager.load_project 生成)
@@ -63,8 +68,8 @@ class PerformProjectLoadMixin:
                 # 获取原始PDF的路径 (可能是工作区内的副本，也可能是旧版的绝对路径)
                 original_pdf_path = page_data.get('workspace_source_abs') or page_data.get('source_pdf_path_abs')
 
-                # 5. 检查缓存是否存在
-                if os.path.exists(expected_png_path):
+                # 5. 检查缓存是否存在且未过期 (源PDF被替换后，清单中记录的哈希将不再匹配)
+                if self.pdf_processor.is_page_cached(workspace_assets_abs, original_pdf_path, page_index):
                     print(f"  [LOAD] 发现缓存素材，直接加载 page #{page_index + 1}")
                     # 直接加载缓存的PNG图片
                     self._load_image_path(
@@ -73,12 +78,13 @@ class PerformProjectLoadMixin:
                         next_hotspot_id_start=page_data.get('next_hotspot_id', 0),
                         source_pdf_path=expected_spdf_path,
                         original_multipage_pdf_path=original_pdf_path,
-                        source_page_index=page_index
+                        source_page_index=page_index,
+                        lazy=lazy
                     )
                 else:
                     # 6. 如果缓存不存在，则需要重新从源PDF生成
                     print(f"  [LOAD] 未找到 page #{page_index + 1} 的缓存，将重新处理源: {original_pdf_path}")
-                    self._process_and_load_source_for_page(page_data)
+                    self._process_and_load_source_for_page(page_data, lazy=lazy)
 
             # 7. 加载完成后的清理和UI更新
             self.statusBar().showMessage("项目加载完成！", 2000)
@@ -16,7 +16,7 @@ class ProcessAndLoadSourceForPageMixin:
     单个缺失页面的功能。
     """
 
-    def _process_and_load_source_for_page(self, page_data: dict):
+    def _process_and_load_source_for_page(self, page_data: dict, lazy: bool = False):
         """
         为一个在加载时发现缓存丢失的页面，重新处理其原始PDF源文件并加载它。
 
@@ -26,6 +26,7 @@ class ProcessAndLoadSourceForPageMixin:
         Args:
             page_data (dict): 从项目文件中读取的、关于这单个页面的数据字典。
                               它必须包含源PDF的路径和页面在源中的索引。
+            lazy (bool): 是否以延迟模式加载重新生成的页面。
         """
         # 1. 确定原始多页PDF的绝对路径
         source_pdf_abs = page_data.get('workspace_source_abs') or page_data.get('source_pdf_path_abs')
@@ -44,12 +45,20 @@ class ProcessAndLoadSourceForPageMixin:
             return
 
         # --- *** 核心修改 2/2: 读取设置并传递给 process 方法 *** ---
-        # 1. 从 QSettings 读取用户保存的分辨率，默认为 150
+        page_index = page_data.get('page_index_in_source', 0)
+
+        # 1. 优先沿用该页当初生成时记录的分辨率，保证热区坐标与图片一致；
+        #    没有记录时才从 QSettings 读取用户保存的分辨率，默认为 150
         settings = QSettings("MyCompany", "HotspotEditor")
-        dpi = settings.value("pdf/resolution_dpi", 150, type=int)
+        dpi = self.pdf_processor.get_recorded_dpi(asset_dir, page_index) or \
+            settings.value("pdf/resolution_dpi", 150, type=int)
+        workers = settings.value("pdf/render_workers", 0, type=int)
 
-        # 2. 调用 PdfProcessor 来处理整个PDF文件，并传入 dpi 参数
-        processed_result = self.pdf_processor.process(source_pdf_abs, asset_dir, resolution_dpi=dpi)
+        # 2. 调用 PdfProcessor 增量处理源PDF：只重新生成当前缺失的这一页，
+        #    其余页面的缓存保持不动
+        processed_result = self.pdf_processor.process(
+            source_pdf_abs, asset_dir, resolution_dpi=dpi, workers=workers, page_indices=[page_index]
+        )
 
         if not processed_result:
             QMessageBox.warning(self, "处理失败", f"无法处理源PDF文件:\n{source_pdf_abs}")
@@ -58,8 +67,6 @@ class ProcessAndLoadSourceForPageMixin:
         png_paths, single_pdf_paths = processed_result
 
         # 4. 从处理结果中，只挑选出我们当前需要的那个页面
-        page_index = page_data.get('page_index_in_source', 0)
-
         if page_index < len(png_paths):
             # 5. 调用 _load_image_path 来加载新生成的页面资源
             self._load_image_path(
@@ -68,7 +75,8 @@ class ProcessAndLoadSourceForPageMixin:
                 next_hotspot_id_start=page_data.get('next_hotspot_id', 0),
                 source_pdf_path=single_pdf_paths[page_index],
                 original_multipage_pdf_path=source_pdf_abs,
-                source_page_index=page_index
+                source_page_index=page_index,
+                lazy=lazy
             )
         else:
             QMessageBox.warning(
@@ -2,7 +2,7 @@
 #
 # 功能: 提供 set_active_session 方法，用于切换当前的活动页面/会话。
 
-# 移除了 QApplication 和 QTimer 的导入，因为不再需要复杂的滚动逻辑
+from PySide6.QtCore import QTimer
 
 class SetActiveSessionMixin:
     """
@@ -27,6 +27,10 @@ class SetActiveSessionMixin:
                 self.update_ui_for_active_session()
             return
 
+        # 0. 延迟加载的页面在首次访问时才创建图片和 viewer
+        if not self._ensure_session_materialized(index):
+            return
+
         # --- *** 核心修改: 切换页面和滚动条 *** ---
 
         # 1. 取消上一个活动 viewer 的高亮状态 (逻辑保持不变)
@@ -65,4 +69,7 @@ class SetActiveSessionMixin:
         self.outline_widget.set_current_page_for_new_items(index + 1)
 
         # 7. 全面刷新UI (逻辑保持不变)
-        self.update_ui_for_active_session()
\ No newline at end of file
+        self.update_ui_for_active_session()
+
+        # 8. 在事件循环空闲时预加载相邻页面
+        QTimer.singleShot(0, self._prefetch_neighbour_sessions)
\ No newline at end of file
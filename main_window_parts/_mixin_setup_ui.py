@@ -6,7 +6,7 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
     QComboBox, QGroupBox, QFrame, QScrollArea, QCheckBox,
     # --- *** 核心修改 1/4: 导入新控件 *** ---
-    QStackedWidget, QScrollBar
+    QStackedWidget, QScrollBar, QProgressBar
 )
 from PySide6.QtCore import Qt
 
@@ -128,4 +128,18 @@ class SetupUiMixin:
         # --- *** 核心修改 3/4 & 4/4: 移除旧代码，调整 Splitter 尺寸 *** ---
         # 原有的 QScrollArea 相关代码已全部移除
         self.main_splitter.setSizes([250, 800, 350])
-        self.main_splitter.setStretchFactor(1, 1)
\ No newline at end of file
+        self.main_splitter.setStretchFactor(1, 1)
+
+        # --- 4. 状态栏: 后台导入进度与取消按钮 (仅在导入期间显示) ---
+        self.import_progress_bar = QProgressBar()
+        self.import_progress_bar.setMaximumWidth(200)
+        self.import_progress_bar.hide()
+        self.btn_cancel_import = QPushButton("取消导入")
+        self.btn_cancel_import.hide()
+        self.statusBar().addPermanentWidget(self.import_progress_bar)
+        self.statusBar().addPermanentWidget(self.btn_cancel_import)
+
+        # --- 5. 状态栏: 页面图片缓存统计 ---
+        self.pixmap_cache_label = QLabel()
+        self.pixmap_cache_label.setToolTip("页面图片缓存: 驻留页数 / 占用内存，以及命中、未命中和淘汰次数。")
+        self.statusBar().addPermanentWidget(self.pixmap_cache_label)
\ No newline at end of file
@@ -0,0 +1,149 @@
+# FILE: pdf_document_pool.py
+#
+# 功能: 提供一个进程内共享的 fitz.Document 池。
+#       PDF 工具箱中的各个工具和 PdfProcessor 都从这里“借用”已打开的文档，
+#       连续对多页运行工具时不必每次都重新打开文件、重新解析 xref 表。
+#       每个线程使用各自打开的文档，后台渲染不会阻塞界面线程对同一文件的访问。
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import fitz  # PyMuPDF
+
+
+class PdfDocumentPool:
+    """
+    一个小型的 LRU 文档池。
+
+    - 文档以 (线程, 绝对路径, 修改时间, 文件大小) 为键缓存。文件被替换后键随之改变，
+      旧句柄会在下次访问时被关闭并重新打开。
+    - fitz 文档不是线程安全的，因此每个线程借用的是它自己打开的文档:
+      后台线程 (导入、分块渲染) 使用文档期间，界面线程的借用不必等待。
+    - 池的锁只保护内部的字典和 LRU 记录，打开文件和调用 fitz 都在锁外进行。
+    - 页面尺寸 (page.rect) 按文件单独缓存 (各线程共享)，计算缩放比例时无需加载页面对象。
+    """
+
+    def __init__(self, capacity: int = 4):
+        self.capacity = capacity
+        self._lock = threading.RLock()
+        self._documents = OrderedDict()  # (线程, 路径, 修改时间, 大小) -> fitz.Document
+        self._page_rects = {}  # (路径, 修改时间, 大小) -> {page_index: fitz.Rect}
+        self._borrow_counts = {}  # key -> 当前借用次数 (借用中的文档不会被淘汰)
+
+    @staticmethod
+    def _make_file_key(pdf_path: str) -> tuple:
+        abs_path = os.path.abspath(pdf_path)
+        stat = os.stat(abs_path)
+        return abs_path, stat.st_mtime_ns, stat.st_size
+
+    @contextmanager
+    def borrow(self, pdf_path: str):
+        """
+        借用一个已打开的文档 (属于当前线程)。用法::
+
+            with pdf_document_pool.borrow(path) as doc:
+                page = doc[page_index]
+
+        借用期间不得调用 doc.close()，文档的生命周期由文档池管理。
+        借用的文档只能在当前线程中使用。
+
+        Raises:
+            FileNotFoundError / RuntimeError: 文件不存在或无法被 fitz 打开。
+        """
+        key = (threading.get_ident(), *self._make_file_key(pdf_path))
+        doc = self._acquire(key)
+        try:
+            yield doc
+        finally:
+            with self._lock:
+                self._borrow_counts[key] -= 1
+                if not self._borrow_counts[key]:
+                    del self._borrow_counts[key]
+                stale = self._collect_over_capacity()
+            self._close_documents(stale)
+
+    def get_page_rect(self, pdf_path: str, page_index: int) -> fitz.Rect:
+        """
+        返回指定页面的尺寸 (单位: 点)，结果会被缓存。
+
+        Raises:
+            IndexError: 页码超出范围。
+        """
+        file_key = self._make_file_key(pdf_path)
+        with self._lock:
+            rect = self._page_rects.get(file_key, {}).get(page_index)
+        if rect is None:
+            with self.borrow(pdf_path) as doc:
+                if not 0 <= page_index < len(doc):
+                    raise IndexError(f"页码 {page_index + 1} 超出范围")
+                rect = fitz.Rect(doc[page_index].rect)
+            with self._lock:
+                self._page_rects.setdefault(file_key, {})[page_index] = rect
+        return fitz.Rect(rect)
+
+    def page_count(self, pdf_path: str) -> int:
+        with self.borrow(pdf_path) as doc:
+            return len(doc)
+
+    def invalidate(self, pdf_path: str):
+        """关闭并移除某个文件的所有缓存句柄 (例如在文件即将被覆盖或删除前)。"""
+        abs_path = os.path.abspath(pdf_path)
+        with self._lock:
+            stale = self._pop_documents(lambda key: key[1] == abs_path)
+            for file_key in [k for k in self._page_rects if k[0] == abs_path]:
+                del self._page_rects[file_key]
+        self._close_documents(stale)
+
+    def clear(self):
+        """关闭所有未被借用的文档。在关闭项目时调用，以释放文件句柄。"""
+        with self._lock:
+            stale = self._pop_documents(lambda key: True)
+            self._page_rects.clear()
+        self._close_documents(stale)
+
+    def _acquire(self, key: tuple):
+        """取出 (或打开) 当前线程的文档并记录一次借用。fitz.open 在锁外执行。"""
+        with self._lock:
+            doc = self._documents.get(key)
+            if doc is not None:
+                self._documents.move_to_end(key)
+                self._borrow_counts[key] = self._borrow_counts.get(key, 0) + 1
+                return doc
+            # 同一路径的旧版本 (文件已被修改) 不会再被命中，直接关闭
+            stale = self._pop_documents(lambda k: k[1] == key[1] and k[2:] != key[2:])
+            for file_key in [k for k in self._page_rects if k[0] == key[1] and k != key[1:]]:
+                del self._page_rects[file_key]
+
+        self._close_documents(stale)
+        # 键中包含线程，同一个键不会被其他线程同时打开
+        doc = fitz.open(key[1])
+        with self._lock:
+            self._documents[key] = doc
+            self._borrow_counts[key] = self._borrow_counts.get(key, 0) + 1
+        return doc
+
+    def _pop_documents(self, predicate) -> list:
+        """(持有锁时调用) 移除满足条件且未被借用的文档，返回它们以便在锁外关闭。"""
+        keys = [k for k in self._documents if predicate(k) and k not in self._borrow_counts]
+        return [self._documents.pop(key) for key in keys]
+
+    def _collect_over_capacity(self) -> list:
+        """(持有锁时调用) 按 LRU 顺序移除超出容量的空闲文档。"""
+        stale = []
+        for key in list(self._documents):
+            if len(self._documents) <= self.capacity:
+                break
+            if key not in self._borrow_counts:
+                stale.append(self._documents.pop(key))
+        return stale
+
+    @staticmethod
+    def _close_documents(documents: list):
+        for doc in documents:
+            doc.close()
+
+
+# 创建一个全局实例供其他模块使用
+pdf_document_pool = PdfDocumentPool()
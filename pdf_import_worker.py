@@ -0,0 +1,96 @@
+# FILE: pdf_import_worker.py
+#
+# 功能: 在后台线程中执行“添加页面到项目”的文件处理 (复制源PDF、渲染页面)，
+#       并把完成的页面逐个发回 GUI 线程，使编辑器在导入大型PDF时保持响应。
+
+import os
+import shutil
+
+from PySide6.QtCore import QThread, Signal, Qt
+
+from pdf_processor import PdfProcessor
+
+
+class PdfImportWorker(QThread):
+    """
+    按顺序处理一组导入任务的后台线程。
+
+    每个任务是一个字典:
+        - 图片: {'path': 图片路径}
+        - PDF:  {'path': 用户选择的PDF, 'source_copy_path': 工作区中的副本路径,
+                 'asset_dir': 资产目录, 'dpi': 分辨率, 'workers': 渲染进程数}
+
+    页面按任务顺序、页码顺序通过 page_ready 发出。页面对象 (ImageEditingSession、
+    PhotoViewer) 必须在 GUI 线程中创建，所以这里只传递路径信息。
+    """
+    # 一个可以直接传给 _load_image_path 的页面描述字典
+    page_ready = Signal(dict)
+    # 当前文件的渲染进度 (已完成页数, 需要渲染的总页数)
+    progress_updated = Signal(int, int)
+    status_updated = Signal(str)
+    # (文件路径, 错误信息)
+    file_failed = Signal(str, str)
+
+    def __init__(self, jobs: list, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs
+        self._cancelled = False
+        self.processor = None
+
+    def cancel(self):
+        """请求取消。当前页面渲染完成后线程即会退出。"""
+        self._cancelled = True
+        if self.processor:
+            self.processor.cancel()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        # 工作线程拥有独立的处理器实例 (在本线程中创建)，取消它不会影响主窗口的处理器
+        self.processor = PdfProcessor()
+        self.processor.progress_updated.connect(self.progress_updated, Qt.DirectConnection)
+        if self._cancelled:
+            self.processor.cancel()
+
+        total_jobs = len(self.jobs)
+        for job_index, job in enumerate(self.jobs, start=1):
+            if self._cancelled:
+                break
+            file_name = os.path.basename(job['path'])
+            self.status_updated.emit(f"正在导入 ({job_index}/{total_jobs}): {file_name}")
+
+            if 'source_copy_path' not in job:
+                self.page_ready.emit({'file_path': job['path'], 'source_page_index': 0})
+                continue
+
+            try:
+                self._process_pdf_job(job)
+            except Exception as e:
+                self.file_failed.emit(job['path'], str(e))
+
+    def _process_pdf_job(self, job: dict):
+        source_copy_path = job['source_copy_path']
+        os.makedirs(os.path.dirname(source_copy_path), exist_ok=True)
+        if not os.path.exists(source_copy_path):
+            shutil.copy2(job['path'], source_copy_path)
+
+        def emit_page(page_index, png_path, single_pdf_path):
+            self.page_ready.emit({
+                'file_path': png_path,
+                'source_pdf_path': single_pdf_path,
+                'original_multipage_pdf_path': source_copy_path,
+                'source_page_index': page_index,
+            })
+
+        # 处理器在本线程中发出信号，直接转发即可
+        self.processor.page_ready.connect(emit_page, Qt.DirectConnection)
+        try:
+            result = self.processor.process(
+                source_copy_path, job['asset_dir'], resolution_dpi=job['dpi'], workers=job['workers']
+            )
+        finally:
+            self.processor.page_ready.disconnect(emit_page)
+
+        if result is None and not self._cancelled:
+            self.file_failed.emit(job['path'], "PDF处理失败，详情请查看控制台输出。")
@@ -1,74 +1,455 @@
 # FILE: pdf_processor.py (已优化)
 import os
-import shutil
+import json
+import struct
+import hashlib
+import threading
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Optional, Tuple
 from PySide6.QtCore import QObject, Signal
 
+from pdf_document_pool import pdf_document_pool
+
+# 页数少于此值时，启动进程池的开销大于收益，直接串行渲染
+PARALLEL_MIN_PAGES = 8
+# 每个工作进程一次领取的最大页数。分块越小，进度回报越平滑
+MAX_PAGES_PER_CHUNK = 8
+
+# 渲染器版本。修改了渲染输出 (文件命名、像素格式等) 时递增，旧缓存会被视为过期
+RENDERER_VERSION = 1
+# 保存在资产目录中的逐页缓存清单
+MANIFEST_FILENAME = "manifest.json"
+
+
+def resolve_worker_count(workers: int) -> int:
+    """
+    将用户设置的进程数解析为实际使用的进程数。
+
+    :param workers: 设置值。0 (或负数) 表示“自动”，即使用全部 CPU 核心。
+    :return: 至少为 1 的工作进程数。
+    """
+    if workers is None or workers <= 0:
+        return max(1, os.cpu_count() or 1)
+    return workers
+
+
+def _render_single_page(doc, page_num: int, image_storage_path: str, resolution_dpi: int) -> str:
+    """
+    渲染单个页面为PNG。
+
+    :return: PNG图片绝对路径
+    """
+    page = doc.load_page(page_num)
+
+    # 1. 计算缩放因子。PyMuPDF的默认DPI是72。
+    #    例如，如果期望150 DPI，缩放因子 zoom = 150 / 72 ≈ 2.08
+    zoom = resolution_dpi / 72.0
+
+    # 2. 使用动态计算的缩放因子创建变换矩阵
+    mat = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=mat)
+    image_filepath = os.path.join(image_storage_path, f"page-{page_num + 1}.png")
+    pix.save(image_filepath)
+    return os.path.abspath(image_filepath)
+
+
+def _render_page_list(pdf_path: str, page_numbers: List[int], image_storage_path: str,
+                      resolution_dpi: int) -> List[str]:
+    """
+    进程池的工作函数: 在子进程中独立打开 PDF，并渲染 page_numbers 中的页面。
+
+    fitz.Document 不能跨进程传递，所以每个工作进程都必须自己打开文档。
+    该函数必须定义在模块顶层，以便能被 pickle 传递给子进程。
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        return [_render_single_page(doc, page_num, image_storage_path, resolution_dpi) for page_num in page_numbers]
+    finally:
+        doc.close()
+
+
+def _file_sha256(path: str) -> str:
+    """分块计算文件的 SHA-256，避免将大型 PDF 一次性读入内存。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_png_width(path: str) -> Optional[int]:
+    """只读取PNG文件头 (IHDR) 中的宽度，不解码整张图片。"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+        if len(header) == 24 and header[:8] == b"\x89PNG\r\n\x1a\n":
+            return struct.unpack(">I", header[16:20])[0]
+    except OSError:
+        pass
+    return None
+
+
+def _page_output_paths(target_asset_dir: str, page_num: int) -> Tuple[str, str]:
+    """返回某一页的 (PNG绝对路径, 单页PDF缓存绝对路径)。"""
+    return (
+        os.path.abspath(os.path.join(target_asset_dir, "images", f"page-{page_num + 1}.png")),
+        os.path.abspath(os.path.join(target_asset_dir, "single_pdfs", f"page-{page_num + 1}.pdf")),
+    )
+
 
 class PdfProcessor(QObject):
     progress_updated = Signal(int, int)
+    # 某一页的PNG已可用 (页码, PNG路径, 单页PDF缓存路径)。按页码顺序发出，
+    # 使调用方可以在整本书渲染完成之前就开始加载前面的页面。
+    page_ready = Signal(int, str, str)
 
     def __init__(self, base_temp_dir: str = None):
         super().__init__()
         self.base_temp_dir = base_temp_dir
+        # 取消标志可能由其他线程设置 (例如后台导入线程中的处理器被 GUI 线程取消)
+        self._cancel_event = threading.Event()
+        self._stream_order = []
+        self._stream_pos = 0
+        self._stream_ready = set()
+        self._stream_asset_dir = None
+        # 资产目录 -> ((清单文件的修改时间, 大小), 清单)。打开项目时逐页检查缓存，同一份清单只解析一次
+        self._manifest_cache = {}
+        self._manifest_cache_lock = threading.Lock()
+
+    def cancel(self):
+        """
+        请求中止正在进行的 process()。
+
+        已渲染完成的页面会照常写入清单，下次导入时可以直接复用。
+        取消后此实例后续的 process() 调用都会立即返回 None。
+        """
+        self._cancel_event.set()
 
-    # --- *** 核心修改 1/2: 更新 process 方法的签名 *** ---
-    def process(self, pdf_path: str, target_asset_dir: str, resolution_dpi: int = 150) -> Optional[
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def process(self, pdf_path: str, target_asset_dir: str, resolution_dpi: int = 150,
+                workers: int = 1, page_indices: Optional[List[int]] = None) -> Optional[
         Tuple[List[str], List[str]]]:
         """
-        将指定的PDF文件转换为PNG和单页PDF，并保存到指定的资产目录中。
+        将指定的PDF文件转换为PNG，并保存到指定的资产目录中。
+
+        单页PDF不再预先生成：返回的单页PDF路径只是按需生成时的缓存位置，
+        需要真实文件的调用方应使用 ensure_single_page_pdf()。
+        PDF 工具箱中的工具直接从原始多页PDF + 页码读取页面，无需单页文件。
+
+        资产目录中维护一份逐页清单 (manifest.json)，记录每页生成时所用的
+        源PDF哈希、页码、DPI 和渲染器版本。只有缺失或过期的页面才会被重新渲染，
+        其余页面直接复用磁盘上的缓存。
 
         :param pdf_path: 输入的PDF文件路径。
         :param target_asset_dir: 保存处理后素材的目标目录。
         :param resolution_dpi: 用于生成PNG图片的分辨率 (DPI)。
-        :return: 一个元组，包含(PNG图片绝对路径列表, 单页PDF绝对路径列表)，如果失败则返回 None。
+        :param workers: 渲染进程数。1 表示在当前进程中串行渲染，0 表示自动 (使用全部 CPU 核心)。
+        :param page_indices: 只检查并按需重新生成这些页面 (0-based)。为 None 时检查所有页面。
+        :return: 一个元组，包含(PNG图片绝对路径列表, 单页PDF缓存路径列表)，如果失败则返回 None。
+                 列表总是覆盖整个PDF的所有页面。
         """
+        if self.is_cancelled():
+            return None
         try:
             image_storage_path = os.path.join(target_asset_dir, "images")
-            pdf_storage_path = os.path.join(target_asset_dir, "single_pdfs")
-
-            if os.path.exists(target_asset_dir):
-                shutil.rmtree(target_asset_dir)
-            os.makedirs(image_storage_path)
-            os.makedirs(pdf_storage_path)
-
-            doc = fitz.open(pdf_path)
-            total_pages = len(doc)
-            png_paths_list = []
-            single_pdf_paths_list = []
-
-            for page_num in range(total_pages):
-                self.progress_updated.emit(page_num + 1, total_pages)
-                page = doc.load_page(page_num)
-
-                # --- *** 核心修改 2/2: 使用传入的DPI计算缩放因子 *** ---
-                # 1. 计算缩放因子。PyMuPDF的默认DPI是72。
-                #    例如，如果期望150 DPI，缩放因子 zoom = 150 / 72 ≈ 2.08
-                zoom = resolution_dpi / 72.0
-
-                # 2. 使用动态计算的缩放因子创建变换矩阵
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                image_filename = f"page-{page_num + 1}.png"
-                image_filepath = os.path.join(image_storage_path, image_filename)
-                pix.save(image_filepath)
-                png_paths_list.append(os.path.abspath(image_filepath))
-
-                # 保存为单页PDF (这部分不受分辨率影响)
-                single_pdf_doc = fitz.open()
-                single_pdf_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-                pdf_filename_out = f"page-{page_num + 1}.pdf"
-                pdf_filepath = os.path.join(pdf_storage_path, pdf_filename_out)
-                single_pdf_doc.save(pdf_filepath)
-                single_pdf_doc.close()
-                single_pdf_paths_list.append(os.path.abspath(pdf_filepath))
+            os.makedirs(image_storage_path, exist_ok=True)
+
+            manifest = self.read_manifest(target_asset_dir)
+            source_hash = self._get_source_hash(pdf_path, manifest)
+
+            # 页数和页面尺寸都从共享文档池读取，与工具箱共用同一个已打开的文档
+            total_pages = pdf_document_pool.page_count(pdf_path)
+
+            # 1. 清理源PDF变短后遗留的多余页面
+            self._prune_pages_beyond(manifest, target_asset_dir, total_pages)
 
-            doc.close()
+            # 2. 找出需要重新渲染的页面
+            candidates = range(total_pages) if page_indices is None else \
+                sorted(set(i for i in page_indices if 0 <= i < total_pages))
+            if not manifest["pages"]:
+                # 旧版资产目录没有清单：先认领那些尺寸与目标 DPI 相符的现有文件
+                self._adopt_legacy_pages(pdf_path, manifest, target_asset_dir, candidates, source_hash, resolution_dpi)
+            stale_pages = [
+                page_num for page_num in candidates
+                if not self._is_entry_current(manifest, target_asset_dir, page_num, source_hash, resolution_dpi)
+            ]
+
+            # 已缓存的页面立即按顺序通知调用方，其余页面在渲染完成后陆续通知
+            self._begin_page_stream(target_asset_dir, candidates, set(candidates) - set(stale_pages))
+
+            # 3. 只渲染过期页面
+            if stale_pages:
+                print(f"PdfProcessor: {len(stale_pages)} / {total_pages} 页需要重新生成。")
+                worker_count = min(resolve_worker_count(workers), len(stale_pages))
+                if worker_count > 1 and len(stale_pages) >= PARALLEL_MIN_PAGES:
+                    try:
+                        self._render_parallel(pdf_path, stale_pages, image_storage_path,
+                                              resolution_dpi, worker_count, manifest, source_hash)
+                    except (BrokenProcessPool, OSError) as e:
+                        # 某些受限环境下无法创建子进程，回退到串行模式
+                        print(f"多进程渲染不可用，回退到串行模式: {e}")
+                        self._render_serial(pdf_path, stale_pages, image_storage_path,
+                                            resolution_dpi, manifest, source_hash)
+                else:
+                    self._render_serial(pdf_path, stale_pages, image_storage_path,
+                                        resolution_dpi, manifest, source_hash)
+
+            self._write_manifest(target_asset_dir, manifest)
+
+            if self.is_cancelled():
+                print("PdfProcessor: 处理已被取消，已完成的页面已保留在缓存中。")
+                return None
+
+            output_paths = [_page_output_paths(target_asset_dir, page_num) for page_num in range(total_pages)]
+            png_paths_list = [png_path for png_path, _ in output_paths]
+            single_pdf_paths_list = [single_pdf_path for _, single_pdf_path in output_paths]
             return png_paths_list, single_pdf_paths_list
 
         except Exception as e:
             print(f"处理 PDF 时出错: {e}")
             import traceback
             traceback.print_exc()
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def ensure_single_page_pdf(original_pdf_path: str, page_index: int, single_pdf_path: str) -> Optional[str]:
+        """
+        按需生成 (并缓存) 某一页的单页PDF。
+
+        文件已存在且不比源PDF旧时直接返回；否则从原始多页PDF中抽取该页写入缓存位置。
+
+        :return: 单页PDF的绝对路径；源文件不存在或抽取失败时返回 None。
+        """
+        if os.path.exists(single_pdf_path) and (
+                not original_pdf_path or not os.path.exists(original_pdf_path)
+                or os.path.getmtime(single_pdf_path) >= os.path.getmtime(original_pdf_path)):
+            return os.path.abspath(single_pdf_path)
+        if not original_pdf_path or not os.path.exists(original_pdf_path):
+            return None
+        try:
+            os.makedirs(os.path.dirname(single_pdf_path), exist_ok=True)
+            with pdf_document_pool.borrow(original_pdf_path) as doc:
+                if not 0 <= page_index < len(doc):
+                    return None
+                single_pdf_doc = fitz.open()
+                single_pdf_doc.insert_pdf(doc, from_page=page_index, to_page=page_index)
+                single_pdf_doc.save(single_pdf_path)
+                single_pdf_doc.close()
+            return os.path.abspath(single_pdf_path)
+        except Exception as e:
+            print(f"生成单页PDF时出错: {e}")
+            return None
+
+    def is_page_cached(self, target_asset_dir: str, pdf_path: str, page_index: int) -> bool:
+        """
+        判断某一页的缓存PNG是否存在且仍然有效 (源PDF未被替换、渲染器版本一致)。
+
+        这里不比较 DPI: 项目打开时应沿用页面当初生成时的分辨率，
+        否则热区的像素坐标会与图片错位。
+
+        对于没有清单的旧版资产目录，只要PNG存在就视为有效，以保持向后兼容。
+        """
+        png_path = os.path.join(target_asset_dir, "images", f"page-{page_index + 1}.png")
+        if not os.path.exists(png_path):
+            return False
+        manifest = self._cached_manifest(target_asset_dir)
+        if not manifest["pages"]:
+            return True
+        entry = manifest["pages"].get(str(page_index))
+        if not entry or entry.get("renderer_version") != RENDERER_VERSION:
+            return False
+        if not pdf_path or not os.path.exists(pdf_path):
+            return True
+        try:
+            return entry.get("source_hash") == self._get_source_hash(pdf_path, manifest)
+        except OSError:
+            return True
+
+    def get_recorded_dpi(self, target_asset_dir: str, page_index: int) -> Optional[int]:
+        """返回清单中记录的某页生成时所用的 DPI；没有记录时返回 None。"""
+        entry = self._cached_manifest(target_asset_dir)["pages"].get(str(page_index))
+        return entry.get("dpi") if entry else None
+
+    def _cached_manifest(self, target_asset_dir: str) -> dict:
+        """
+        只读用途的清单: 按清单文件的修改时间和大小缓存解析结果，文件被改写后自动重新读取。
+
+        返回的字典在多次调用之间共享，调用方不应修改其中的页面记录
+        (_get_source_hash 写入的源文件哈希除外，它正好让同一次加载不必重复计算哈希)。
+        """
+        manifest_path = os.path.join(target_asset_dir, MANIFEST_FILENAME)
+        try:
+            stat = os.stat(manifest_path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        with self._manifest_cache_lock:
+            cached = self._manifest_cache.get(target_asset_dir)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        manifest = self.read_manifest(target_asset_dir)
+        with self._manifest_cache_lock:
+            self._manifest_cache[target_asset_dir] = (stamp, manifest)
+        return manifest
+
+    @staticmethod
+    def read_manifest(target_asset_dir: str) -> dict:
+        """读取资产目录中的清单文件。文件不存在或已损坏时返回一个空清单。"""
+        manifest_path = os.path.join(target_asset_dir, MANIFEST_FILENAME)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if isinstance(manifest, dict) and isinstance(manifest.get("pages"), dict):
+                manifest.setdefault("source", {})
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {"source": {}, "pages": {}}
+
+    @staticmethod
+    def _write_manifest(target_asset_dir: str, manifest: dict):
+        """先写入临时文件再替换，避免中途崩溃留下半截清单。"""
+        manifest_path = os.path.join(target_asset_dir, MANIFEST_FILENAME)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, manifest_path)
+
+    @staticmethod
+    def _get_source_hash(pdf_path: str, manifest: dict) -> str:
+        """
+        获取源PDF的内容哈希。
+
+        如果文件的大小和修改时间与清单中记录的一致，则直接复用记录的哈希，
+        避免每次打开项目都完整读取一遍大型PDF。
+        """
+        stat = os.stat(pdf_path)
+        source_info = manifest["source"]
+        if source_info.get("size") == stat.st_size and source_info.get("mtime_ns") == stat.st_mtime_ns \
+                and source_info.get("sha256"):
+            return source_info["sha256"]
+        source_hash = _file_sha256(pdf_path)
+        manifest["source"] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": source_hash}
+        return source_hash
+
+    @staticmethod
+    def _is_entry_current(manifest: dict, target_asset_dir: str, page_num: int, source_hash: str,
+                          resolution_dpi: int) -> bool:
+        entry = manifest["pages"].get(str(page_num))
+        if not entry:
+            return False
+        if entry.get("source_hash") != source_hash or entry.get("dpi") != resolution_dpi \
+                or entry.get("renderer_version") != RENDERER_VERSION:
+            return False
+        return os.path.exists(os.path.join(target_asset_dir, entry["png"]))
+
+    @staticmethod
+    def _record_page(manifest: dict, page_num: int, source_hash: str, resolution_dpi: int):
+        manifest["pages"][str(page_num)] = {
+            "source_hash": source_hash,
+            "page_index": page_num,
+            "dpi": resolution_dpi,
+            "renderer_version": RENDERER_VERSION,
+            "png": f"images/page-{page_num + 1}.png",
+        }
+
+    def _adopt_legacy_pages(self, pdf_path: str, manifest: dict, target_asset_dir: str, page_numbers, source_hash: str,
+                            resolution_dpi: int):
+        """
+        为没有清单的旧版资产目录补录清单条目。
+
+        只有当PNG存在、且其像素宽度与按目标 DPI 渲染的宽度一致时，
+        才认为该页是有效缓存，这样升级后的首次打开不必重新渲染整本书。
+        """
+        zoom = resolution_dpi / 72.0
+        for page_num in page_numbers:
+            png_path = os.path.join(target_asset_dir, "images", f"page-{page_num + 1}.png")
+            if not os.path.exists(png_path):
+                continue
+            png_width = _read_png_width(png_path)
+            expected_width = pdf_document_pool.get_page_rect(pdf_path, page_num).width * zoom
+            if png_width is not None and abs(png_width - expected_width) <= 1:
+                self._record_page(manifest, page_num, source_hash, resolution_dpi)
+
+    @staticmethod
+    def _prune_pages_beyond(manifest: dict, target_asset_dir: str, total_pages: int):
+        for key in [k for k in manifest["pages"] if int(k) >= total_pages]:
+            entry = manifest["pages"].pop(key)
+            # 同时清理可能已按需生成的单页PDF
+            lazy_single_pdf = f"single_pdfs/page-{int(key) + 1}.pdf"
+            for rel_path in (entry.get("png"), lazy_single_pdf):
+                if rel_path and os.path.exists(os.path.join(target_asset_dir, rel_path)):
+                    os.remove(os.path.join(target_asset_dir, rel_path))
+
+    def _render_serial(self, pdf_path: str, page_numbers: List[int], image_storage_path: str,
+                       resolution_dpi: int, manifest: dict, source_hash: str):
+        """
+        在当前进程中逐页渲染 (原有行为)。
+
+        每页单独借用一次共享文档，渲染间隙中工具箱仍可访问同一文档。
+        """
+        total = len(page_numbers)
+        for done, page_num in enumerate(page_numbers, start=1):
+            if self.is_cancelled():
+                break
+            self.progress_updated.emit(done, total)
+            with pdf_document_pool.borrow(pdf_path) as doc:
+                _render_single_page(doc, page_num, image_storage_path, resolution_dpi)
+            self._record_page(manifest, page_num, source_hash, resolution_dpi)
+            self._mark_page_ready(page_num)
+
+    def _render_parallel(self, pdf_path: str, page_numbers: List[int], image_storage_path: str,
+                         resolution_dpi: int, worker_count: int,
+                         manifest: dict, source_hash: str):
+        """
+        使用进程池并行渲染。
+
+        待渲染的页面被切分为若干分块，每个分块交给一个工作进程处理。
+        结果按提交顺序收集，因此 progress_updated 信号仍然按页码顺序发出。
+        """
+        total = len(page_numbers)
+        # 让每个进程大约领取 4 个分块，以便负载均衡
+        chunk_size = max(1, min(MAX_PAGES_PER_CHUNK, -(-total // (worker_count * 4))))
+        chunks = [page_numbers[start:start + chunk_size] for start in range(0, total, chunk_size)]
+
+        done = 0
+        with ProcessPoolExecutor(max_workers=worker_count) as executor:
+            futures = [
+                executor.submit(_render_page_list, pdf_path, chunk, image_storage_path, resolution_dpi)
+                for chunk in chunks
+            ]
+            for chunk, future in zip(chunks, futures):
+                if self.is_cancelled():
+                    # 丢弃尚未开始的分块，只等待正在运行的分块结束
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                future.result()
+                for page_num in chunk:
+                    self._record_page(manifest, page_num, source_hash, resolution_dpi)
+                    self._mark_page_ready(page_num)
+                    done += 1
+                    self.progress_updated.emit(done, total)
+
+    def _begin_page_stream(self, target_asset_dir: str, page_numbers, ready_pages: set):
+        self._stream_asset_dir = target_asset_dir
+        self._stream_order = list(page_numbers)
+        self._stream_pos = 0
+        self._stream_ready = set(ready_pages)
+        self._flush_ready_pages()
+
+    def _mark_page_ready(self, page_num: int):
+        self._stream_ready.add(page_num)
+        self._flush_ready_pages()
+
+    def _flush_ready_pages(self):
+        """按页码顺序发出 page_ready，遇到第一个尚未就绪的页面即停止。"""
+        while self._stream_pos < len(self._stream_order) and \
+                self._stream_order[self._stream_pos] in self._stream_ready:
+            page_num = self._stream_order[self._stream_pos]
+            self._stream_pos += 1
+            png_path, single_pdf_path = _page_output_paths(self._stream_asset_dir, page_num)
+            self.page_ready.emit(page_num, png_path, single_pdf_path)
@@ -1,14 +1,21 @@
 # D:\projects\singlepage\hotspot_editor\pdf_toolbox_dialog.py (新版本 - 支持动态选项)
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QListWidget, QLabel,
+    QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QLabel,
     QSplitter, QListWidgetItem, QAbstractItemView,
-    QDialogButtonBox, QWidget, QFrame
+    QDialogButtonBox, QWidget, QFrame, QComboBox, QSpinBox
 )
 from PySide6.QtCore import Qt
 
 from pdf_tools import load_tools
+from text_layer_index import text_layer_index
 import os
 
+# 处理范围选项
+SCOPE_CURRENT_PAGE = "current"
+SCOPE_ALL_PAGES = "all"
+SCOPE_PAGE_RANGE = "range"
+
+
 class PdfToolboxDialog(QDialog):
     def __init__(self, main_window):
         super().__init__(main_window)
@@ -37,6 +44,30 @@ class PdfToolboxDialog(QDialog):
         right_layout.addWidget(QFrame(frameShape=QFrame.HLine, frameShadow=QFrame.Sunken))
         right_layout.addWidget(self.tool_options_widget)
         right_layout.addStretch()
+
+        # --- 处理范围: 当前页面 / 所有PDF页面 / 页码范围 (仅支持批量处理的工具可选) ---
+        page_count = max(1, len(self.main_window.sessions))
+        self.scope_widget = QWidget()
+        scope_layout = QHBoxLayout(self.scope_widget)
+        scope_layout.setContentsMargins(0, 0, 0, 0)
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItem("当前页面", SCOPE_CURRENT_PAGE)
+        self.scope_combo.addItem("所有PDF页面", SCOPE_ALL_PAGES)
+        self.scope_combo.addItem("页码范围", SCOPE_PAGE_RANGE)
+        self.range_start_spin = QSpinBox()
+        self.range_start_spin.setRange(1, page_count)
+        self.range_end_spin = QSpinBox()
+        self.range_end_spin.setRange(1, page_count)
+        self.range_end_spin.setValue(page_count)
+        scope_layout.addWidget(QLabel("处理范围:"))
+        scope_layout.addWidget(self.scope_combo)
+        scope_layout.addWidget(self.range_start_spin)
+        scope_layout.addWidget(QLabel("至"))
+        scope_layout.addWidget(self.range_end_spin)
+        scope_layout.addStretch()
+        right_layout.addWidget(self.scope_widget)
+        self.scope_combo.currentIndexChanged.connect(self.update_scope_controls_state)
+        self.update_scope_controls_state()
         self.splitter.addWidget(self.tool_list)
         self.splitter.addWidget(right_panel)
         self.splitter.setSizes([200, 400])
@@ -89,6 +120,25 @@ class PdfToolboxDialog(QDialog):
 
             self.button_box.button(QDialogButtonBox.Ok).setEnabled(True)
 
+        self.update_scope_controls_state()
+
+    def update_scope_controls_state(self):
+        current_item = self.tool_list.currentItem()
+        tool = current_item.data(Qt.UserRole) if current_item else None
+        supports_batch = bool(tool and tool.supports_batch)
+        self.scope_combo.setEnabled(supports_batch)
+        use_range = supports_batch and self.scope_combo.currentData() == SCOPE_PAGE_RANGE
+        self.range_start_spin.setEnabled(use_range)
+        self.range_end_spin.setEnabled(use_range)
+
+    def _selected_sessions(self) -> list:
+        """按“处理范围”返回要处理的页面。"""
+        sessions = self.main_window.sessions
+        if self.scope_combo.currentData() == SCOPE_PAGE_RANGE:
+            start, end = sorted((self.range_start_spin.value(), self.range_end_spin.value()))
+            return sessions[start - 1:end]
+        return list(sessions)
+
     def run_selected_tool(self, current_item=None):
         # ... (此方法保持不变) ...
         # (修正：run_selected_tool 并不需要 current_item 参数，它是从 self.tool_list.currentItem() 获取的)
@@ -105,5 +155,10 @@ class PdfToolboxDialog(QDialog):
                         options_widget = item.widget()
                         if options_widget and hasattr(options_widget, 'get_values'):
                             tool.set_options(options_widget.get_values())
-            tool.run(self.main_window)
+            if tool.supports_batch and self.scope_combo.currentData() != SCOPE_CURRENT_PAGE:
+                tool.run_batch(self.main_window, self._selected_sessions())
+            else:
+                tool.run(self.main_window)
+            # 工具运行期间新提取的文本层页面在后台写入索引文件
+            text_layer_index.save_pending()
             self.accept()
\ No newline at end of file
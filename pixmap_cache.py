@@ -0,0 +1,116 @@
+# FILE: pixmap_cache.py
+#
+# 功能: 为页面图片 (QGraphicsPixmapItem 中的 QPixmap) 提供一个有内存预算的 LRU 缓存。
+#       超出预算时，最久未访问、且当前不可见的页面会释放其像素数据；
+#       这些页面再次被激活时，会从磁盘上的PNG透明地重新加载。
+
+import weakref
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, Signal
+
+# 默认内存预算 (MB)
+DEFAULT_BUDGET_MB = 1024
+
+
+class PixmapCache(QObject):
+    """
+    跟踪每个会话已解码图片所占用的内存，并按 LRU 顺序淘汰。
+
+    缓存本身不持有 QPixmap，像素数据仍保存在各个会话的 pixmap_item 中；
+    缓存只负责记录访问顺序和占用大小，并在需要时调用 session.release_pixmap()。
+    会话以弱引用保存，已被销毁的会话会被自动忽略。
+    """
+    # 命中/未命中/淘汰计数或占用发生变化
+    stats_changed = Signal()
+
+    def __init__(self, budget_mb: int = DEFAULT_BUDGET_MB, parent=None):
+        super().__init__(parent)
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self._entries = OrderedDict()  # id(session) -> (weakref(session), 占用字节数)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(cost for _, cost in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set_budget_mb(self, budget_mb: int):
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self._evict_over_budget()
+        self.stats_changed.emit()
+
+    def acquire(self, session) -> bool:
+        """
+        确保会话的图片已解码并驻留在内存中，同时将其标记为最近使用。
+
+        Returns:
+            bool: 图片可用返回 True；需要重新加载但加载失败时返回 False。
+        """
+        key = id(session)
+        if session.is_pixmap_resident():
+            self.hits += 1
+            if key not in self._entries:
+                self._entries[key] = (weakref.ref(session), session.pixmap_cost_bytes())
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            if not session.load_image():
+                self._entries.pop(key, None)
+                self.stats_changed.emit()
+                return False
+            self._entries[key] = (weakref.ref(session), session.pixmap_cost_bytes())
+            self._entries.move_to_end(key)
+            self._evict_over_budget(keep_key=key)
+        self.stats_changed.emit()
+        return True
+
+    def update_cost(self, session):
+        """
+        会话的图片内存发生变化后 (例如分块渲染项新增或淘汰了图块) 重新计算其开销，
+        必要时淘汰其他页面。未被跟踪的会话 (已被淘汰或从未加载) 会被忽略。
+        """
+        key = id(session)
+        entry = self._entries.get(key)
+        if entry is None or entry[0]() is not session:
+            return
+        self._entries[key] = (entry[0], session.pixmap_cost_bytes())
+        self._evict_over_budget(keep_key=key)
+        self.stats_changed.emit()
+
+    def forget(self, session):
+        """停止跟踪某个会话 (不会释放它的图片)。"""
+        if self._entries.pop(id(session), None) is not None:
+            self.stats_changed.emit()
+
+    def clear(self):
+        """清空所有记录和计数 (例如在关闭项目时)。"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+        self.stats_changed.emit()
+
+    def _evict_over_budget(self, keep_key=None):
+        used = self.used_bytes
+        for key in list(self._entries):
+            if used <= self.budget_bytes:
+                break
+            if key == keep_key:
+                # 刚刚加载的页面即将被显示，不能立即淘汰
+                continue
+            session_ref, cost = self._entries[key]
+            session = session_ref()
+            if session is None:
+                del self._entries[key]
+                used -= cost
+                continue
+            # 正在显示的页面永远不会被淘汰 (预算过小时允许暂时超出)
+            if session.viewer is not None and session.viewer.isVisible():
+                continue
+            session.release_pixmap()
+            del self._entries[key]
+            used -= cost
+            self.evictions += 1
@@ -86,22 +86,22 @@ class ProjectManager:
             }
 
             # 热区保存逻辑保持不变
-            for item in session.scene.items():
-                if isinstance(item, AbstractResizableItem):
-                    item_custom_data = item.data(0).copy() if item.data(0) else {}
-                    if item_custom_data.get('hotspot_type') == 'file':
-                        file_data = item_custom_data.get('file_data', {}).copy()
-                        source_path = file_data.get('source_path')
-                        if source_path: file_data['source_path'] = self._get_safe_relative_path(source_path,
-                                                                                                project_dir)
-                        item_custom_data['file_data'] = file_data
-                    hotspot_data = {
-                        'pos': {'x': item.pos().x(), 'y': item.pos().y()},
-                        'rect': {'w': item.rect().width(), 'h': item.rect().height()},
-                        'type': 'ellipse' if isinstance(item, ResizableEllipseItem) else 'rectangle',
-                        'data': item_custom_data
-                    }
-                    page_data['hotspots'].append(hotspot_data)
+            if not session.has_scene():
+                # 延迟加载且从未访问过的页面：热区数据仍是加载时的格式，直接保存，无需创建场景
+                for hotspot in session.pending_hotspots_data:
+                    page_data['hotspots'].append(dict(
+                        hotspot, data=self._serialize_hotspot_data(hotspot.get('data') or {}, project_dir)
+                    ))
+            else:
+                for item in session.scene.items():
+                    if isinstance(item, AbstractResizableItem):
+                        hotspot_data = {
+                            'pos': {'x': item.pos().x(), 'y': item.pos().y()},
+                            'rect': {'w': item.rect().width(), 'h': item.rect().height()},
+                            'type': 'ellipse' if isinstance(item, ResizableEllipseItem) else 'rectangle',
+                            'data': self._serialize_hotspot_data(item.data(0) or {}, project_dir)
+                        }
+                        page_data['hotspots'].append(hotspot_data)
 
             project_data['pages'].append(page_data)
 
@@ -109,6 +109,17 @@ class ProjectManager:
         with open(project_path, 'w', encoding='utf-8') as f:
             json.dump(project_data, f, ensure_ascii=False, indent=4)
 
+    def _serialize_hotspot_data(self, custom_data: dict, project_dir: str) -> dict:
+        """复制热区的自定义数据，并把其中的文件路径转换为相对于项目目录的路径。"""
+        item_custom_data = custom_data.copy()
+        if item_custom_data.get('hotspot_type') == 'file':
+            file_data = item_custom_data.get('file_data', {}).copy()
+            source_path = file_data.get('source_path')
+            if source_path: file_data['source_path'] = self._get_safe_relative_path(source_path,
+                                                                                    project_dir)
+            item_custom_data['file_data'] = file_data
+        return item_custom_data
+
     # 新增一个辅助方法
     def _get_workspace_dir(self, project_path):
         return os.path.join(
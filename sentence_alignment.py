@@ -0,0 +1,130 @@
+# FILE: sentence_alignment.py
+#
+# 功能: 把句子分割器 (如 nltk.sent_tokenize) 输出的句子映射回 PDF 中的单词。
+#       单词按顺序拼接为一段文本，同时记录每个单词在文本中的起始位置 (累计字符偏移数组)；
+#       每个句子只需在文本中定位一次，再用二分查找换算为单词下标范围，整页的对齐是线性的。
+#       拼接时合并行末连字符断开的单词，并把连字 (如 "ﬁ") 展开为普通字母，
+#       句子分割器和生成的热区描述看到的都是正常的英文文本。
+
+import numpy as np
+
+# 常见的拉丁文连字 -> 展开后的字母
+LIGATURES = str.maketrans({
+    "ﬀ": "ff", "ﬁ": "fi", "ﬂ": "fl", "ﬃ": "ffi",
+    "ﬄ": "ffl", "ﬅ": "ft", "ﬆ": "st",
+})
+SOFT_HYPHEN = "\u00ad"
+
+
+def _is_same_line(word, next_word) -> bool:
+    """两个单词是否在同一行 (get_text("words") 元组中的块号和行号相同)。"""
+    return len(word) > 6 and len(next_word) > 6 and word[5:7] == next_word[5:7]
+
+
+def _joins_next_word(text: str, word, next_word) -> bool:
+    """单词是否在行末被连字符断开，应与下一行的第一个单词直接相连。"""
+    if text.endswith(SOFT_HYPHEN):
+        return True
+    next_text = next_word[4]
+    return (len(text) > 1 and text.endswith("-") and text[-2].isalpha()
+            and next_text[:1].islower() and not _is_same_line(word, next_word))
+
+
+class SentenceAlignment:
+    """
+    单词序列与其拼接文本之间的对应关系。
+
+    用法::
+
+        alignment = SentenceAlignment(words)
+        sentences = nltk.sent_tokenize(alignment.text)
+        for sentence, first, end in alignment.align(sentences):
+            sentence_words = words[first:end]
+
+    Attributes:
+        text (str): 拼接后的文本，交给句子分割器。
+        word_starts (np.ndarray): 每个单词在 text 中的起始位置 (单调递增)。
+    """
+
+    def __init__(self, words):
+        """
+        Args:
+            words (list): 已按阅读顺序排列的单词，元组格式与 page.get_text("words") 相同
+                          (只使用文本，以及用于判断换行的块号、行号)。
+        """
+        pieces = []
+        starts = []
+        offset = 0
+        for i, word in enumerate(words):
+            text = word[4].translate(LIGATURES)
+            separator = " "
+            if i + 1 < len(words) and _joins_next_word(text, word, words[i + 1]):
+                text = text[:-1]
+                separator = ""
+            elif i + 1 == len(words):
+                separator = ""
+            starts.append(offset)
+            pieces.append(text + separator)
+            offset += len(text) + len(separator)
+        self.text = "".join(pieces)
+        self.word_starts = np.asarray(starts, dtype=np.int64)
+
+    def _locate(self, sentence: str, cursor: int) -> int:
+        """
+        返回句子在 text 中 (从 cursor 开始) 的起始位置。
+
+        句子分割器通常原样返回文本片段，直接查找即可；
+        若分割器改动了空白，则逐字符比较非空白字符。找不到时返回 -1。
+        """
+        position = self.text.find(sentence, cursor)
+        if position != -1:
+            return position
+        target = "".join(sentence.split())
+        if not target:
+            return -1
+        start = cursor
+        while start < len(self.text) and self.text[start].isspace():
+            start += 1
+        matched, i = 0, start
+        while i < len(self.text) and matched < len(target):
+            char = self.text[i]
+            if not char.isspace():
+                if char != target[matched]:
+                    return -1
+                matched += 1
+            i += 1
+        return start if matched == len(target) else -1
+
+    def align(self, sentences) -> list:
+        """
+        把句子映射为单词下标范围。
+
+        每个句子的范围从它的起始位置延伸到下一个句子的起始位置，所以每个单词都属于某个句子，
+        不会因为个别句子无法精确匹配而被跳过。句子在单词中间断开时，该单词同时属于前后两个句子。
+
+        Returns:
+            list: [(句子文本, 第一个单词的下标, 最后一个单词的下标 + 1), ...]，不包含没有任何单词的句子。
+        """
+        if not len(self.word_starts):
+            return []
+        located = []  # [(句子, 起始位置), ...]
+        cursor = 0
+        for sentence in sentences:
+            position = self._locate(sentence, cursor)
+            if position == -1:
+                # 无法定位 (分割器大幅改写了文本): 接在上一个句子之后，不丢弃它的单词
+                position = cursor
+                while position < len(self.text) and self.text[position].isspace():
+                    position += 1
+            located.append((sentence, position))
+            cursor = max(cursor, position + len(sentence.strip()))
+        if not located:
+            return []
+
+        span_starts = np.array([position for _, position in located], dtype=np.int64)
+        span_starts[0] = 0  # 第一个句子之前的内容 (通常没有) 归入第一个句子
+        span_ends = np.append(span_starts[1:], len(self.text) + 1)
+        firsts = np.maximum(np.searchsorted(self.word_starts, span_starts, side='right') - 1, 0)
+        ends = np.searchsorted(self.word_starts, span_ends, side='left')
+        return [(sentence, first, end) for (sentence, _), first, end in
+                zip(located, firsts.tolist(), ends.tolist()) if end > first]
@@ -9,6 +9,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Signal
 
+from image_derivatives import is_format_available
+
 
 class SettingsDialogBase(QDialog):
     """
@@ -31,6 +33,11 @@ class SettingsDialogBase(QDialog):
         self.pdf_dpi_combo.addItem("高清 (300 DPI)", 300)
         self.pdf_dpi_combo.addItem("超清 (600 DPI)", 600)
         pdf_layout.addRow("图片导出分辨率:", self.pdf_dpi_combo)
+        self.pdf_workers_spin = QSpinBox()
+        self.pdf_workers_spin.setRange(0, 64)
+        self.pdf_workers_spin.setSpecialValueText("自动")
+        self.pdf_workers_spin.setToolTip("导入PDF时并行渲染页面的进程数。\n“自动”使用全部CPU核心，1 表示不使用多进程。")
+        pdf_layout.addRow("渲染进程数:", self.pdf_workers_spin)
 
         # --- 2. 编辑器热区样式 ---
         editor_group = QGroupBox("编辑器热区样式")
@@ -43,6 +50,18 @@ class SettingsDialogBase(QDialog):
         editor_layout.addRow("填充颜色:", self.editor_fill_color_btn)
         editor_layout.addRow("边框颜色:", self.editor_border_color_btn)
         editor_layout.addRow("填充不透明度:", self.editor_opacity_spin)
+        self.editor_lazy_load_check = QCheckBox("按需加载页面")
+        self.editor_lazy_load_check.setToolTip("打开项目时只读取页面信息，页面图片和热区在首次访问时才加载。\n可显著加快大型项目的打开速度并减少内存占用。")
+        editor_layout.addRow(self.editor_lazy_load_check)
+        self.editor_tiled_rendering_check = QCheckBox("分块渲染PDF页面")
+        self.editor_tiled_rendering_check.setToolTip("从源PDF按当前缩放级别只渲染可见区域，而不是解码整张页面图片。\n放大时更清晰，缩小时占用更少内存。仅对PDF导入的页面生效，重新打开页面后生效。")
+        editor_layout.addRow(self.editor_tiled_rendering_check)
+        self.editor_pixmap_cache_spin = QSpinBox()
+        self.editor_pixmap_cache_spin.setRange(128, 16384)
+        self.editor_pixmap_cache_spin.setSingleStep(128)
+        self.editor_pixmap_cache_spin.setSuffix(" MB")
+        self.editor_pixmap_cache_spin.setToolTip("已解码页面图片可占用的最大内存。\n超出后，最久未访问的页面会释放图片，再次访问时自动重新加载。")
+        editor_layout.addRow("页面图片缓存:", self.editor_pixmap_cache_spin)
 
         # --- 3. 导出网页热区样式 ---
         export_group = QGroupBox("导出网页热区样式")
@@ -68,6 +87,31 @@ class SettingsDialogBase(QDialog):
         export_layout.addRow("边框宽度:", self.export_border_width_spin)
         export_layout.addRow("控件图标大小:", self.export_control_icon_size_spin)
 
+        # 导出网页的页面加载方式
+        export_loading_group = QGroupBox("导出网页加载")
+        export_loading_layout = QFormLayout(export_loading_group)
+        self.export_page_window_spin = QSpinBox()
+        self.export_page_window_spin.setRange(0, 20)
+        self.export_page_window_spin.setPrefix("± ")
+        self.export_page_window_spin.setSuffix(" 页")
+        self.export_page_window_spin.setSpecialValueText("一次性加载全部页面")
+        self.export_page_window_spin.setToolTip("单页画册只加载当前页前后这么多页的内容，其余页面在翻到附近时才加载。\n设为 0 时恢复为打开时加载全部页面。")
+        export_loading_layout.addRow("单页画册加载范围:", self.export_page_window_spin)
+        self.export_image_derivatives_check = QCheckBox("生成多尺寸压缩图片")
+        self.export_image_derivatives_check.setToolTip("导出时为每页生成几种宽度的压缩图片，浏览器按屏幕大小选择，\n手机不必下载原始的大尺寸 PNG。原图仍会保留。")
+        self.export_image_format_combo = QComboBox()
+        for fmt, label in (("webp", "WebP"), ("avif", "AVIF"), ("jpeg", "JPEG")):
+            if is_format_available(fmt):
+                self.export_image_format_combo.addItem(label, fmt)
+        self.export_image_quality_spin = QSpinBox()
+        self.export_image_quality_spin.setRange(30, 100)
+        export_loading_layout.addRow(self.export_image_derivatives_check)
+        export_loading_layout.addRow("压缩图片格式:", self.export_image_format_combo)
+        export_loading_layout.addRow("压缩质量:", self.export_image_quality_spin)
+        self.export_bundle_assets_check = QCheckBox("合并压缩网页脚本和样式")
+        self.export_bundle_assets_check.setToolTip("把每种画册的脚本和样式表各合并为一个压缩文件，文件名带内容摘要，\n减少打开画册时的请求数，并便于服务器设置长期缓存。")
+        export_loading_layout.addRow(self.export_bundle_assets_check)
+
         # --- *** 核心修改: 4. 提纲/目录设置 *** ---
         outline_group = QGroupBox("提纲/目录设置")
         outline_layout = QFormLayout(outline_group)
@@ -111,6 +155,7 @@ class SettingsDialogBase(QDialog):
         main_layout.addWidget(pdf_group)
         main_layout.addWidget(editor_group)
         main_layout.addWidget(export_group)
+        main_layout.addWidget(export_loading_group)
         main_layout.addWidget(outline_group)  # 添加新组到主布局
         main_layout.addWidget(self.button_box)
 
@@ -118,6 +163,8 @@ class SettingsDialogBase(QDialog):
         self.button_box.rejected.connect(self.reject)
         self.button_box.button(QDialogButtonBox.Apply).clicked.connect(self.apply_settings)
         self.export_border_check.stateChanged.connect(self.update_border_controls_state)
+        self.export_image_derivatives_check.stateChanged.connect(self.update_image_derivative_controls_state)
 
         self.load_settings()
-        self.update_border_controls_state()
\ No newline at end of file
+        self.update_border_controls_state()
+        self.update_image_derivative_controls_state()
\ No newline at end of file
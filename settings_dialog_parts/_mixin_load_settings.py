@@ -5,6 +5,10 @@
 from PySide6.QtGui import QColor
 from PySide6.QtCore import QSettings, Qt
 
+from pixmap_cache import DEFAULT_BUDGET_MB
+from export_model import DEFAULT_PAGE_WINDOW
+from image_derivatives import DEFAULT_FORMAT, DEFAULT_QUALITY, resolve_format
+
 
 class LoadSettingsMixin:
     """
@@ -24,11 +28,15 @@ class LoadSettingsMixin:
             self.pdf_dpi_combo.setCurrentIndex(index_to_set)
         else:
             self.pdf_dpi_combo.setCurrentIndex(0)
+        self.pdf_workers_spin.setValue(settings.value("pdf/render_workers", 0, type=int))
 
         # --- 2. 加载编辑器设置 ---
         self.editor_fill_color_btn.setColor(settings.value("editor/fill_color", QColor(Qt.blue)))
         self.editor_border_color_btn.setColor(settings.value("editor/border_color", QColor(Qt.blue)))
         self.editor_opacity_spin.setValue(settings.value("editor/opacity_percent", 15, type=int))
+        self.editor_lazy_load_check.setChecked(settings.value("editor/lazy_page_loading", True, type=bool))
+        self.editor_tiled_rendering_check.setChecked(settings.value("editor/tiled_rendering", True, type=bool))
+        self.editor_pixmap_cache_spin.setValue(settings.value("editor/pixmap_cache_mb", DEFAULT_BUDGET_MB, type=int))
 
         # --- 3. 加载导出设置 ---
         self.export_fill_color_btn.setColor(settings.value("export/fill_color", QColor(64, 158, 255)))
@@ -37,6 +45,13 @@ class LoadSettingsMixin:
         self.export_border_color_btn.setColor(settings.value("export/border_color", QColor(64, 158, 255)))
         self.export_border_width_spin.setValue(settings.value("export/border_width", 1, type=int))
         self.export_control_icon_size_spin.setValue(settings.value("export/control_icon_size", 24, type=int))
+        self.export_page_window_spin.setValue(settings.value("export/page_window", DEFAULT_PAGE_WINDOW, type=int))
+        self.export_image_derivatives_check.setChecked(settings.value("export/image_derivatives", True, type=bool))
+        format_index = self.export_image_format_combo.findData(
+            resolve_format(settings.value("export/image_format", DEFAULT_FORMAT)))
+        self.export_image_format_combo.setCurrentIndex(max(format_index, 0))
+        self.export_image_quality_spin.setValue(settings.value("export/image_quality", DEFAULT_QUALITY, type=int))
+        self.export_bundle_assets_check.setChecked(settings.value("export/bundle_assets", True, type=bool))
 
         # --- *** 核心修改: 4. 加载提纲/目录设置 *** ---
 
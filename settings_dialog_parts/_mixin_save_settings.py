@@ -18,11 +18,15 @@ class SaveSettingsMixin:
         # --- 1. 保存 PDF 设置 ---
         selected_dpi = self.pdf_dpi_combo.currentData()
         settings.setValue("pdf/resolution_dpi", selected_dpi)
+        settings.setValue("pdf/render_workers", self.pdf_workers_spin.value())
 
         # --- 2. 保存编辑器设置 ---
         settings.setValue("editor/fill_color", self.editor_fill_color_btn.color())
         settings.setValue("editor/border_color", self.editor_border_color_btn.color())
         settings.setValue("editor/opacity_percent", self.editor_opacity_spin.value())
+        settings.setValue("editor/lazy_page_loading", self.editor_lazy_load_check.isChecked())
+        settings.setValue("editor/tiled_rendering", self.editor_tiled_rendering_check.isChecked())
+        settings.setValue("editor/pixmap_cache_mb", self.editor_pixmap_cache_spin.value())
 
         # --- 3. 保存导出设置 ---
         settings.setValue("export/fill_color", self.export_fill_color_btn.color())
@@ -31,6 +35,11 @@ class SaveSettingsMixin:
         settings.setValue("export/border_color", self.export_border_color_btn.color())
         settings.setValue("export/border_width", self.export_border_width_spin.value())
         settings.setValue("export/control_icon_size", self.export_control_icon_size_spin.value())
+        settings.setValue("export/page_window", self.export_page_window_spin.value())
+        settings.setValue("export/image_derivatives", self.export_image_derivatives_check.isChecked())
+        settings.setValue("export/image_format", self.export_image_format_combo.currentData())
+        settings.setValue("export/image_quality", self.export_image_quality_spin.value())
+        settings.setValue("export/bundle_assets", self.export_bundle_assets_check.isChecked())
 
         # --- *** 核心修改: 4. 保存提纲/目录设置 *** ---
         settings.setValue("outline/position", self.outline_position_combo.currentData())
@@ -16,4 +16,12 @@ class UpdateUiStateMixin:
         # 和 self.export_border_width_spin 都在 _base 中创建。
         enabled = self.export_border_check.isChecked()
         self.export_border_color_btn.setEnabled(enabled)
-        self.export_border_width_spin.setEnabled(enabled)
\ No newline at end of file
+        self.export_border_width_spin.setEnabled(enabled)
+
+    def update_image_derivative_controls_state(self):
+        """
+        根据“生成多尺寸压缩图片”复选框的状态，启用或禁用格式和质量控件。
+        """
+        enabled = self.export_image_derivatives_check.isChecked()
+        self.export_image_format_combo.setEnabled(enabled)
+        self.export_image_quality_spin.setEnabled(enabled)
@@ -0,0 +1,97 @@
+# FILE: spatial_index.py
+#
+# 功能: 基于 NumPy 的矩形几何查询。
+#       - tolerance_groups: 把排好序的坐标按容差分组 (例如把热区按 x0 分成若干栏，或把单元格按 y 分成行)；
+#       - neighbours_in_groups: 在每个分组内部按某个坐标排序，找出每个元素的相邻元素；
+#       - RectIndex: 按 y 坐标排序的区间索引，批量查询“哪些单词与这个矩形相交”，
+#         代替逐个矩形调用 page.get_textbox()。
+#       PDF 工具箱中的工具用它处理单词和热区，几千个矩形的页面也只需要几次数组运算。
+
+import numpy as np
+
+
+def tolerance_groups(sorted_values, tolerance: float) -> np.ndarray:
+    """
+    把升序排列的数值按容差分组，返回每个元素所属分组的编号 (从 0 开始)。
+
+    每个分组以它的第一个元素为基准，与基准相差小于 tolerance 的后续元素都归入该分组，
+    第一个超出容差的元素开始新的分组 (与逐个比较“当前分组第一个元素”的写法结果相同)。
+    每个分组只需一次二分查找，而不是逐个元素比较。
+    """
+    values = np.asarray(sorted_values, dtype=np.float64)
+    labels = np.empty(len(values), dtype=np.int64)
+    start, group = 0, 0
+    while start < len(values):
+        end = max(int(np.searchsorted(values, values[start] + tolerance, side='left')), start + 1)
+        labels[start:end] = group
+        start, group = end, group + 1
+    return labels
+
+
+def neighbours_in_groups(labels, keys, descending: bool = False) -> np.ndarray:
+    """
+    在每个分组内部按 keys 排序 (稳定排序)，返回每个元素在排序后的下一个元素的下标，
+    没有下一个元素 (分组中的最后一个) 时为 -1。
+
+    Args:
+        labels (array-like): 每个元素所属的分组编号，例如 tolerance_groups() 的结果。
+        keys (array-like): 组内排序依据，例如热区的 y0。
+        descending (bool): 是否按 keys 从大到小排序 (例如从页面底部向上查找)。
+    """
+    labels = np.asarray(labels)
+    keys = np.asarray(keys, dtype=np.float64)
+    order = np.lexsort((-keys if descending else keys, labels))
+    following = np.full(len(labels), -1, dtype=np.int64)
+    if len(order) > 1:
+        same_group = labels[order[1:]] == labels[order[:-1]]
+        following[order[:-1][same_group]] = order[1:][same_group]
+    return following
+
+
+class RectIndex:
+    """
+    一组矩形 (通常是页面上的单词框) 的区间索引，用于查询与给定矩形相交的元素。
+
+    矩形按 y0 排序并记录最大高度: 与查询矩形在 y 方向相交的元素，其 y0 一定位于
+    (查询的 y0 - 最大高度, 查询的 y1) 之间，先用二分查找取出这一段候选，再批量比较其余坐标，
+    查询的开销只与查询矩形附近的元素数量有关。
+
+    用法::
+
+        index = RectIndex(word_boxes)
+        for indices in index.query_many(hotspot_rects):
+            text = " ".join(words[i][4] for i in indices)
+    """
+
+    def __init__(self, boxes):
+        """
+        Args:
+            boxes (array-like): (n, 4) 矩形 x0, y0, x1, y1。
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self._order = np.argsort(boxes[:, 1], kind='stable')
+        self._sorted_boxes = boxes[self._order]
+        self._max_height = float(np.max(boxes[:, 3] - boxes[:, 1])) if len(boxes) else 0.0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def query_many(self, rects) -> list:
+        """
+        对每个矩形返回与其相交 (面积大于零) 的元素下标数组。下标按原始顺序 (升序) 排列，
+        对单词来说即阅读顺序，与 page.get_textbox() 返回文字的顺序一致。
+        """
+        rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        sorted_y0 = self._sorted_boxes[:, 1]
+        lows = np.searchsorted(sorted_y0, rects[:, 1] - self._max_height, side='right')
+        highs = np.searchsorted(sorted_y0, rects[:, 3], side='left')
+        results = []
+        for (x0, y0, x1, _), low, high in zip(rects.tolist(), lows.tolist(), highs.tolist()):
+            candidates = self._sorted_boxes[low:high]
+            hit = (candidates[:, 3] > y0) & (candidates[:, 0] < x1) & (candidates[:, 2] > x0)
+            results.append(np.sort(self._order[low:high][hit]))
+        return results
+
+    def query(self, rect) -> np.ndarray:
+        """单个矩形的查询，见 query_many()。"""
+        return self.query_many([rect])[0]
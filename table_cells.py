@@ -0,0 +1,136 @@
+# FILE: table_cells.py
+#
+# 功能: 表格单元格的合并引擎。
+#       一个页面上所有表格的单元格保存为 NumPy 数组 (x, y, 宽, 高) 和文字列表，
+#       按列 / 按行的容差分组、分块合并 (最小 / 最大值) 都是数组运算，
+#       单元格文字由一次“单词 -> 单元格”的分配得到，而不是对每个单元格调用 page.get_textbox()。
+#       引擎不依赖界面，“从表格自动创建热区”工具的单页和批量处理都通过它完成。
+
+import numpy as np
+
+from spatial_index import tolerance_groups
+
+# 单词分配时每批处理的单词数 (单词 x 单元格的布尔矩阵不会过大)
+_ASSIGN_BATCH_SIZE = 4096
+
+
+class TableCellSet:
+    """
+    一组表格单元格。
+
+    Attributes:
+        rects (np.ndarray): (n, 4) 数组，每行为 x, y, 宽, 高 (单位: 点)。
+        texts (list[str]): 每个单元格的文字。
+    """
+
+    def __init__(self, rects, texts: list):
+        self.rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        self.texts = list(texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def from_bboxes(cls, bboxes, words=()) -> 'TableCellSet':
+        """
+        由单元格边框 (x0, y0, x1, y1) 创建，并把单词分配到单元格中得到文字。
+
+        Args:
+            words (list): 页面的单词，格式与 page.get_text("words") 相同，已按阅读顺序排列。
+        """
+        boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        rects = np.column_stack([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]])
+        return cls(rects, cell_texts(boxes, words))
+
+    @classmethod
+    def from_dicts(cls, cells: list) -> 'TableCellSet':
+        return cls([(c['x'], c['y'], c['width'], c['height']) for c in cells], [c.get('text', '') for c in cells])
+
+    def to_dicts(self) -> list:
+        return [{"x": x, "y": y, "width": w, "height": h, "text": text}
+                for (x, y, w, h), text in zip(self.rects.tolist(), self.texts)]
+
+    def merge(self, v_merge_count: int, h_merge_count: int, x_tolerance: float, y_tolerance: float) -> 'TableCellSet':
+        """
+        按列 (纵向合并优先) 或按行把相邻的单元格每 N 个合并为一个。
+
+        纵向合并: 单元格按 x 坐标以 x_tolerance 分为若干列，每列从上到下每 v_merge_count 个合并；
+        横向合并: 单元格按 y 坐标以 y_tolerance 分为若干行，每行从左到右每 h_merge_count 个合并。
+        合并后的矩形为各单元格的外接矩形，文字以空格连接 (忽略空文字)。两个数量都不大于 0 时原样返回。
+        """
+        if v_merge_count > 0:
+            return self._merge_chunks(axis=0, count=v_merge_count, tolerance=x_tolerance)
+        if h_merge_count > 0:
+            return self._merge_chunks(axis=1, count=h_merge_count, tolerance=y_tolerance)
+        return self
+
+    def _merge_chunks(self, axis: int, count: int, tolerance: float) -> 'TableCellSet':
+        """
+        axis=0 时按列分组、组内按 y 排序；axis=1 时按行分组、组内按 x 排序。
+        排序都是稳定的，与先按 (分组坐标, 组内坐标) 排序、再分组、再组内排序的结果相同。
+        """
+        if not len(self):
+            return TableCellSet([], [])
+        group_coord, inner_coord = self.rects[:, axis], self.rects[:, 1 - axis]
+        order = np.lexsort((inner_coord, group_coord))
+        groups = tolerance_groups(group_coord[order], tolerance)
+        order = order[np.lexsort((inner_coord[order], groups))]
+        groups = np.sort(groups)
+
+        # 每组从第一个单元格开始，每 count 个为一块
+        positions = np.arange(len(order))
+        group_starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        rank_in_group = positions - np.repeat(group_starts, np.diff(np.r_[group_starts, len(order)]))
+        chunk_starts = np.flatnonzero(rank_in_group % count == 0)
+
+        rects = self.rects[order]
+        x0 = np.minimum.reduceat(rects[:, 0], chunk_starts)
+        y0 = np.minimum.reduceat(rects[:, 1], chunk_starts)
+        x1 = np.maximum.reduceat(rects[:, 0] + rects[:, 2], chunk_starts)
+        y1 = np.maximum.reduceat(rects[:, 1] + rects[:, 3], chunk_starts)
+
+        ordered_texts = [self.texts[i] for i in order.tolist()]
+        chunk_ends = np.r_[chunk_starts[1:], len(order)]
+        texts = [" ".join(t for t in ordered_texts[start:end] if t)
+                 for start, end in zip(chunk_starts.tolist(), chunk_ends.tolist())]
+        return TableCellSet(np.column_stack([x0, y0, x1 - x0, y1 - y0]), texts)
+
+
+def cell_texts(boxes, words) -> list:
+    """
+    把每个单词分配给中心点所在的单元格 (多个单元格重叠时取第一个)，返回每个单元格的文字。
+
+    同一单元格内的单词保持阅读顺序，同一文本行的单词以空格连接，不同行以换行连接。
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if not len(boxes) or not len(words):
+        return ["" for _ in range(len(boxes))]
+
+    word_boxes = np.array([w[:4] for w in words], dtype=np.float64)
+    centers_x = (word_boxes[:, 0] + word_boxes[:, 2]) / 2
+    centers_y = (word_boxes[:, 1] + word_boxes[:, 3]) / 2
+    # 只有位于所有单元格外接矩形内的单词才可能被分配
+    candidates = np.flatnonzero((centers_x >= boxes[:, 0].min()) & (centers_x <= boxes[:, 2].max())
+                                & (centers_y >= boxes[:, 1].min()) & (centers_y <= boxes[:, 3].max()))
+    assigned_words, assigned_cells = [], []
+    for start in range(0, len(candidates), _ASSIGN_BATCH_SIZE):
+        batch = candidates[start:start + _ASSIGN_BATCH_SIZE]
+        cx, cy = centers_x[batch, None], centers_y[batch, None]
+        inside = ((cx >= boxes[:, 0]) & (cx <= boxes[:, 2]) & (cy >= boxes[:, 1]) & (cy <= boxes[:, 3]))
+        hit = inside.any(axis=1)
+        assigned_words.append(batch[hit])
+        assigned_cells.append(inside[hit].argmax(axis=1))
+    if not assigned_words:
+        return ["" for _ in range(len(boxes))]
+
+    texts = [[] for _ in range(len(boxes))]
+    previous_line = {}
+    for word_index, cell_index in zip(np.concatenate(assigned_words).tolist(),
+                                      np.concatenate(assigned_cells).tolist()):
+        word = words[word_index]
+        line_key = tuple(word[5:7])
+        if texts[cell_index]:
+            texts[cell_index].append(" " if previous_line[cell_index] == line_key else "\n")
+        texts[cell_index].append(word[4])
+        previous_line[cell_index] = line_key
+    return ["".join(parts) for parts in texts]
@@ -3,7 +3,18 @@
 
 import os
 import sys
-from jinja2 import Environment, FileSystemLoader
+import tempfile
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+# 编译后的模板字节码缓存目录。程序重启后无需重新编译未修改的模板
+BYTECODE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "HotspotEditor", "jinja_bytecode")
+# 这些目录下的模板 (双页画册) 历史上以不转义的方式渲染，保持原有输出不变
+_RAW_TEMPLATE_PREFIXES = ("flipbook_modular/",)
+
+
+def _autoescape_for(template_name) -> bool:
+    """按模板名决定是否自动转义 HTML。"""
+    return not (template_name or "").startswith(_RAW_TEMPLATE_PREFIXES)
 
 
 class TemplateManager:
@@ -61,13 +72,34 @@ class TemplateManager:
             self.env = None
         else:
             print("TemplateManager: Template directory found. Initializing Jinja2 Environment.")
+            # --- *** 核心修改: 全局唯一的模板环境 *** ---
+            # 已编译的模板保存在内存中，模板文件的修改时间变化时才重新加载 (auto_reload)；
+            # 字节码同时缓存到磁盘，重新启动程序后也不必重新编译。
+            try:
+                os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(BYTECODE_CACHE_DIR)
+            except OSError as e:
+                print(f"TemplateManager: Bytecode cache disabled ({e}).")
+                bytecode_cache = None
             self.env = Environment(
                 loader=FileSystemLoader(template_path),
-                autoescape=True
+                autoescape=_autoescape_for,
+                auto_reload=True,
+                bytecode_cache=bytecode_cache
             )
 
         self.initialized = True
 
+    def get_template(self, template_name: str):
+        """
+        获取已编译的模板对象 (出错时抛出异常，由调用方处理)。
+        需要在多个线程中反复渲染同一模板时使用。
+        """
+        if not self.env:
+            raise RuntimeError(
+                f"Template engine could not be initialized. Check if the '{os.path.join(self._get_application_path(), 'templates')}' directory exists.")
+        return self.env.get_template(template_name)
+
     def render(self, template_name: str, **context) -> str:
         """
         渲染指定的模板。
@@ -6,7 +6,7 @@
 
 // --- 0. 从全局配置对象获取数据 ---
 // outlineBehavior: 'auto_hide' (默认) 或 'fixed'
-const { projectTitle, pagesToLoad, jsPopups, outlineBehavior } = window.APP_CONFIG || {};
+const { projectTitle, jsPopups, outlineBehavior } = window.APP_CONFIG || {};
 const behavior = outlineBehavior || 'auto_hide';
 
 // --- 1. DOM元素获取 ---
@@ -120,22 +120,86 @@ if (backToTopBtn) {
 }
 
 // --- 5. 页面动态加载逻辑 ---
-async function loadPages() {
-    if (!pagesToLoad || !contentContainer) {
-        console.error("Pages to load or content container not found.");
-        return;
-    }
+// 导出器为每页输出了一个 .page-slot 占位元素 (已知宽高比)。
+// 只有接近可视区域的页面才会加载片段；远离可视区域的页面会被清空以释放图片内存。
+
+// 开始加载的距离 / 释放内容的距离 (相对于滚动容器高度)
+const LOAD_MARGIN = '150% 0px';
+const UNLOAD_MARGIN = '400% 0px';
+
+function fillSlot(slot, htmlFragment) {
+    // 片段的根元素与占位元素对应 (同样的 id 和 class)，只取其中的内容
+    const template = document.createElement('template');
+    template.innerHTML = htmlFragment;
+    const section = template.content.querySelector('.image-section');
+    slot.replaceChildren(...(section ? section.childNodes : template.content.childNodes));
+}
 
-    for (const pageUrl of pagesToLoad) {
-        try {
-            const response = await fetch(pageUrl);
+function loadSlot(slot) {
+    if (slot.dataset.state === 'loading' || slot.dataset.state === 'loaded') return;
+    slot.dataset.state = 'loading';
+    slot.classList.remove('load-failed');
+    const pageUrl = slot.dataset.url;
+    fetch(pageUrl)
+        .then(response => {
             if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
-            const htmlFragment = await response.text();
-            contentContainer.insertAdjacentHTML('beforeend', htmlFragment);
-        } catch (error) {
+            return response.text();
+        })
+        .then(htmlFragment => {
+            // 加载期间页面可能已经被滚出范围并释放
+            if (slot.dataset.state !== 'loading') return;
+            fillSlot(slot, htmlFragment);
+            slot.dataset.state = 'loaded';
+        })
+        .catch(error => {
             console.error('Failed to load page:', pageUrl, error);
-            contentContainer.insertAdjacentHTML('beforeend', `<p style="color:red;text-align:center;">内容加载失败: ${pageUrl}</p>`);
-        }
+            if (slot.dataset.state !== 'loading') return;
+            slot.dataset.state = 'failed';
+            slot.classList.add('load-failed');
+            slot.textContent = `内容加载失败: ${pageUrl}`;
+        });
+}
+
+function unloadSlot(slot) {
+    if (!slot.dataset.state) return;
+    delete slot.dataset.state;
+    slot.classList.remove('load-failed');
+    slot.replaceChildren();
+}
+
+function loadPagesVirtualized(slots) {
+    // 与"返回顶部"按钮相同: 移动端滚动的是 window，桌面端滚动的是内容容器
+    const root = window.matchMedia("(max-width: 768px)").matches ? null : contentContainer;
+
+    const loadObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => { if (entry.isIntersecting) loadSlot(entry.target); });
+    }, { root, rootMargin: LOAD_MARGIN });
+
+    const unloadObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => { if (!entry.isIntersecting) unloadSlot(entry.target); });
+    }, { root, rootMargin: UNLOAD_MARGIN });
+
+    slots.forEach(slot => {
+        loadObserver.observe(slot);
+        unloadObserver.observe(slot);
+    });
+}
+
+function loadPages() {
+    if (!contentContainer) {
+        console.error("Content container not found.");
+        return;
+    }
+    const slots = Array.from(contentContainer.querySelectorAll('.page-slot'));
+    if (slots.length === 0) {
+        console.error("No pages to load.");
+        return;
+    }
+    if ('IntersectionObserver' in window) {
+        loadPagesVirtualized(slots);
+    } else {
+        // 旧浏览器: 并行加载全部页面
+        slots.forEach(loadSlot);
     }
 }
 
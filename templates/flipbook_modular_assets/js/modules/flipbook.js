@@ -82,11 +82,30 @@ export function initFlipbook(totalPages, hotspotManager) {
     }
 
 
-    // --- 启动逻辑 (保持不变) ---
-    // 首先尝试加载第一张有效页面（通常是第2页）以获取图片宽高比，
-    // 这是确保翻书组件比例正确的关键。
-    if (totalPages > 1) {
-        // 尝试加载页面以获取宽高比
+    /**
+     * 预加载首屏 (封面和第一个对开页) 的图片。
+     * @param {Array} pages - manifest 中的页面条目。
+     */
+    function preloadFirstSpread(pages) {
+        pages.filter(page => page.page <= 3 && page.image).forEach(page => {
+            const img = new Image();
+            if (page.variants) {
+                // 与页面中 <picture> 相同的候选和 sizes，浏览器会选中同一个文件
+                img.sizes = '50vw';
+                img.srcset = page.variants.map(v => `${v.url} ${v.width}w`).join(', ');
+            }
+            img.src = page.image;
+        });
+    }
+
+    /**
+     * 旧的启动方式: 加载第2页的片段和图片来获取宽高比 (manifest 不可用时使用)。
+     */
+    function probeAspectRatioFromPage() {
+        if (totalPages <= 1) {
+            createTurnJsInstance(1.414); // 只有一页或没有页面
+            return;
+        }
         $.get(`pages/page-2.html`).done(htmlContent => {
             // 使用更健壮的方式从HTML字符串中找到img
             const imgSrc = $(htmlContent).find('img').attr('src');
@@ -97,14 +116,29 @@ export function initFlipbook(totalPages, hotspotManager) {
                     createTurnJsInstance(realAspectRatio);
                 };
                 // 如果图片加载失败，使用一个默认的A4纸比例
-                img.onerror = () => createTurnJsInstance(1.414); 
+                img.onerror = () => createTurnJsInstance(1.414);
                 // 路径需要修正，因为$.get的路径是相对于index.html的
-                img.src = imgSrc.replace('../', ''); 
+                img.src = imgSrc.replace('../', '');
             } else {
                  createTurnJsInstance(1.414); // 页面内容中没有img标签
             }
         }).fail(() => createTurnJsInstance(1.414)); // 页面加载失败
-    } else {
-         createTurnJsInstance(1.414); // 只有一页或没有页面
     }
-}
\ No newline at end of file
+
+
+    // --- 启动逻辑 ---
+    // 首先读取导出器生成的 manifest.json，直接得到每页的尺寸，
+    // 只需一次请求即可创建比例正确的翻书组件。
+    // 优先使用第2页 (第一个对开页) 的比例，与之前的行为一致。
+    $.getJSON('manifest.json').done(manifest => {
+        const pages = (manifest && manifest.pages) || [];
+        const sized = pages.filter(page => page.width > 0 && page.height > 0);
+        const reference = sized.find(page => page.page === 2) || sized[0];
+        if (!reference) {
+            probeAspectRatioFromPage();
+            return;
+        }
+        preloadFirstSpread(pages);
+        createTurnJsInstance(reference.height / reference.width);
+    }).fail(probeAspectRatioFromPage); // 例如旧的导出目录，或浏览器禁止读取本地文件
+}
@@ -77,8 +77,10 @@ function calculateBookSize() {
 /**
  * 创建 turn.js 实例并绑定事件。
  * @param {object} size - 包含 width 和 height 的对象。
+ * @param {object} [extraOptions] - 额外的 turn.js 选项 (窗口化加载时传入 pages 和 missing)。
  */
-function createTurnJsInstance(size) {
+function createTurnJsInstance(size, extraOptions = {}) {
+    const { when: extraWhen = {}, ...otherOptions } = extraOptions;
     $flipbook.turn({
         width: size.width,
         height: size.height,
@@ -88,16 +90,126 @@ function createTurnJsInstance(size) {
         acceleration: true,
         gradients: Modernizr.cssgradients,
         turnCorners: 'bl,br',
+        ...otherOptions,
         when: {
+            ...extraWhen,
             turned: function(event, page, view) {
+                if (extraWhen.turned) extraWhen.turned(event, page, view);
                 setTimeout(updateHotspots, 10); // 翻页后更新热区
             }
         }
     });
 }
 
+// 页面的典型显示宽度 (CSS 像素)，与导出器中 SINGLE_PAGE_CSS_WIDTH 一致
+const PAGE_CSS_WIDTH = 960;
+
+/**
+ * 选择页面背景图的地址: 有多尺寸版本时，按屏幕像素密度选择与页面片段中
+ * image-set 相同的版本 (1x 或 2x)，否则使用原图。
+ * @param {object} pageData - manifest 中的页面条目。
+ * @returns {string|undefined}
+ */
+function pageImageUrl(pageData) {
+    const variants = pageData.variants;
+    if (!variants || variants.length === 0) return pageData.image;
+    const minWidth = PAGE_CSS_WIDTH * ((window.devicePixelRatio || 1) > 1 ? 2 : 1);
+    const wideEnough = variants.filter(v => v.width >= minWidth);
+    if (wideEnough.length > 0) return wideEnough.reduce((a, b) => (b.width < a.width ? b : a)).url;
+    return variants.reduce((a, b) => (b.width > a.width ? b : a)).url;
+}
+
+// --- 窗口化加载: 只加载当前页前后 pageWindow 页 ---
+
+// 页码 -> 片段 HTML 的 Promise，只保留窗口内的页面
+const fragmentCache = new Map();
+// 已经开始预加载的图片地址
+const warmedImages = new Set();
+
+const failedPageHtml = '<div class="error-content"><p>页面加载失败</p></div>';
+
+function fetchFragment(pageNum) {
+    if (!fragmentCache.has(pageNum)) {
+        const pageData = APP_CONFIG.pagesData[pageNum - 1];
+        const request = fetch(pageData.url)
+            .then(response => response.ok ? response.text() : Promise.reject(new Error(`HTTP ${response.status}`)))
+            .catch(error => {
+                fragmentCache.delete(pageNum); // 允许下次重试
+                throw error;
+            });
+        fragmentCache.set(pageNum, request);
+    }
+    return fragmentCache.get(pageNum);
+}
+
+/**
+ * 预加载当前页前后 pageWindow 页的片段和图片，并丢弃窗口外的片段缓存。
+ * @param {number} pageNumber - 当前页码 (从 1 开始)。
+ */
+function prefetchAround(pageNumber) {
+    const { pagesData, pageWindow } = APP_CONFIG;
+    const first = Math.max(1, pageNumber - pageWindow);
+    const last = Math.min(pagesData.length, pageNumber + pageWindow);
+
+    for (let n = first; n <= last; n++) {
+        fetchFragment(n).catch(() => {});
+        const imageUrl = pageImageUrl(pagesData[n - 1]);
+        if (imageUrl && !warmedImages.has(imageUrl)) {
+            warmedImages.add(imageUrl);
+            new Image().src = imageUrl;
+        }
+    }
+    for (const n of fragmentCache.keys()) {
+        if (n < first || n > last) fragmentCache.delete(n);
+    }
+}
+
+/**
+ * turn.js 的 missing 回调: 先同步插入一个带背景图的页面，再异步填入热区内容。
+ * 页面尺寸来自导出器提供的 pagesData，无需等待图片加载。
+ * @param {number} pageNum - 页码 (从 1 开始)。
+ */
+function addWindowedPage(pageNum) {
+    const pageData = APP_CONFIG.pagesData[pageNum - 1];
+    if (!pageData) return;
+    const $page = $('<div>', { 'class': 'turn-page', 'page_num': pageNum });
+    const imageUrl = pageImageUrl(pageData);
+    if (imageUrl) $page.css('background-image', `url(${imageUrl})`);
+    $flipbook.turn('addPage', $page, pageNum);
+
+    fetchFragment(pageNum).then(html => {
+        // 片段的根元素本身就是 .turn-page，只取其中的内容
+        const $fragment = $($.parseHTML(html)).filter('.turn-page');
+        $page.empty().append($fragment.children());
+        setTimeout(updateHotspots, 0);
+    }).catch(() => {
+        $page.addClass('missing-page').html(failedPageHtml);
+    });
+}
+
+/**
+ * 窗口化初始化: 立即按导出器提供的尺寸创建翻书组件，页面在翻到附近时才加载。
+ */
+function initWindowed() {
+    prefetchAround(1);
+    const initialSize = calculateBookSize();
+    $flipbook.width(initialSize.width).height(initialSize.height);
+    createTurnJsInstance(initialSize, {
+        pages: APP_CONFIG.pagesData.length,
+        when: {
+            missing: function(event, pages) {
+                for (const pageNum of pages) addWindowedPage(pageNum);
+            },
+            turned: function(event, page) {
+                prefetchAround(page);
+            }
+        }
+    });
+}
+
 /**
  * 异步加载所有页面片段并初始化翻书组件。
+ * pageWindow 大于 0 时改为窗口化加载。
  */
 async function loadPagesAndInit() {
     const { pagesData } = APP_CONFIG;
@@ -105,6 +217,15 @@ async function loadPagesAndInit() {
          $container.html('<p style="text-align:center;">没有可显示的页面。</p>');
          return;
     }
+    if (APP_CONFIG.pageWindow > 0) {
+        try {
+            initWindowed();
+        } catch (error) {
+            console.error('初始化翻书组件时发生严重错误:', error);
+            $container.html('<p style="text-align:center; color:red;">初始化失败，请检查浏览器控制台。</p>');
+        }
+        return;
+    }
     try {
         const fetchPromises = pagesData.map(pageData =>
             fetch(pageData.url).then(response => {
@@ -112,25 +233,20 @@ async function loadPagesAndInit() {
                 return response.text();
             }).catch(error => `<div class="turn-page missing-page"><div class="error-content"><p>网络错误</p></div></div>`)
         );
+        // 图片地址直接来自 manifest (pagesData)，无需解析 CSS background-image，
+        // 可以与页面片段同时开始加载
+        const imageLoadPromises = pagesData
+            .map(pageImageUrl)
+            .filter(imageUrl => imageUrl)
+            .map(imageUrl => new Promise((resolve) => {
+                const img = new Image();
+                img.onload = resolve;
+                img.onerror = resolve;
+                img.src = imageUrl;
+            }));
         const htmlFragments = await Promise.all(fetchPromises);
         $flipbook.html(htmlFragments.join(''));
 
-        const imageLoadPromises = [];
-        $flipbook.find('.turn-page:not(.missing-page)').each(function() {
-            const bgImage = $(this).css('background-image');
-            if (bgImage && bgImage !== 'none') {
-                const match = bgImage.match(/url\((['"]?)(.*?)\1\)/);
-                const imgUrl = match ? match[2] : null;
-                if (imgUrl) {
-                    imageLoadPromises.push(new Promise((resolve) => {
-                        const img = new Image();
-                        img.onload = resolve;
-                        img.onerror = resolve;
-                        img.src = imgUrl;
-                    }));
-                }
-            }
-        });
         await Promise.all(imageLoadPromises);
 
         const initialSize = calculateBookSize();
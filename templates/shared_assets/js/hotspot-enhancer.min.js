@@ -0,0 +1,3 @@
+/* hotspot-enhancer.js 的预编译版本，请勿手动修改。修改源文件后运行 build_frontend.py。
+   source-sha1: b818fb14409cbd7f3cfd1b640ef183739f968473 */
+(function(){function _typeof(o){"@babel/helpers - typeof";return _typeof="function"==typeof Symbol&&"symbol"==typeof Symbol.iterator?function(o){return typeof o}:function(o){return o&&"function"==typeof Symbol&&o.constructor===Symbol&&o!==Symbol.prototype?"symbol":typeof o},_typeof(o)}function _slicedToArray(r,e){return _arrayWithHoles(r)||_iterableToArrayLimit(r,e)||_unsupportedIterableToArray(r,e)||_nonIterableRest()}function _nonIterableRest(){throw new TypeError("Invalid attempt to destructure non-iterable instance.\nIn order to be iterable, non-array objects must have a [Symbol.iterator]() method.")}function _unsupportedIterableToArray(r,a){if(r){if("string"==typeof r)return _arrayLikeToArray(r,a);var t={}.toString.call(r).slice(8,-1);return"Object"===t&&r.constructor&&(t=r.constructor.name),"Map"===t||"Set"===t?Array.from(r):"Arguments"===t||/^(?:Ui|I)nt(?:8|16|32)(?:Clamped)?Array$/.test(t)?_arrayLikeToArray(r,a):void 0}}function _arrayLikeToArray(r,a){(null==a||a>r.length)&&(a=r.length);for(var e=0,n=Array(a);e<a;e++)n[e]=r[e];return n}function _iterableToArrayLimit(r,l){var t=null==r?null:"undefined"!=typeof Symbol&&r[Symbol.iterator]||r["@@iterator"];if(null!=t){var e,n,i,u,a=[],f=!0,o=!1;try{if(i=(t=t.call(r)).next,0===l){if(Object(t)!==t)return;f=!1}else for(;!(f=(e=i.call(t)).done)&&(a.push(e.value),a.length!==l);f=!0);}catch(r){o=!0,n=r}finally{try{if(!f&&null!=t["return"]&&(u=t["return"](),Object(u)!==u))return}finally{if(o)throw n}}return a}}function _arrayWithHoles(r){if(Array.isArray(r))return r}function ownKeys(e,r){var t=Object.keys(e);if(Object.getOwnPropertySymbols){var o=Object.getOwnPropertySymbols(e);r&&(o=o.filter(function(r){return Object.getOwnPropertyDescriptor(e,r).enumerable})),t.push.apply(t,o)}return t}function _objectSpread(e){for(var r=1;r<arguments.length;r++){var t=null!=arguments[r]?arguments[r]:{};r%2?ownKeys(Object(t),!0).forEach(function(r){_defineProperty(e,r,t[r])}):Object.getOwnPropertyDescriptors?Object.defineProperties(e,Object.getOwnPropertyDescriptors(t)):ownKeys(Object(t)).forEach(function(r){Object.defineProperty(e,r,Object.getOwnPropertyDescriptor(t,r))})}return e}function _defineProperty(e,r,t){return(r=_toPropertyKey(r))in e?Object.defineProperty(e,r,{value:t,enumerable:!0,configurable:!0,writable:!0}):e[r]=t,e}function _toPropertyKey(t){var i=_toPrimitive(t,"string");return"symbol"==_typeof(i)?i:i+""}function _toPrimitive(t,r){if("object"!=_typeof(t)||!t)return t;var e=t[Symbol.toPrimitive];if(void 0!==e){var i=e.call(t,r||"default");if("object"!=_typeof(i))return i;throw new TypeError("@@toPrimitive must return a primitive value.")}return("string"===r?String:Number)(t)}(function(_window$APP_CONFIG){"use strict";if(typeof React==="undefined"||typeof ReactDOM==="undefined"){console.error("Hotspot Enhancer Error: React or ReactDOM is not loaded.");return}var controlIconSize=((_window$APP_CONFIG=window.APP_CONFIG)===null||_window$APP_CONFIG===void 0?void 0:_window$APP_CONFIG.controlIconSize)||24;var iconSizeStyle={width:"".concat(controlIconSize,"px"),height:"".concat(controlIconSize,"px")};var closeIconStyle=_objectSpread(_objectSpread({},iconSizeStyle),{},{color:"white"});var _React=React,useState=_React.useState,useRef=_React.useRef,useEffect=_React.useEffect,useCallback=_React.useCallback,memo=_React.memo;var PlayIcon=memo(function(_ref){var style=_ref.style;return React.createElement("svg",{xmlns:"http://www.w3.org/2000/svg",viewBox:"0 0 24 24",fill:"currentColor",style:style},React.createElement("path",{fillRule:"evenodd",d:"M4.5 5.653c0-1.426 1.529-2.33 2.779-1.643l11.54 6.647c1.295.742 1.295 2.545 0 3.286L7.279 20.99c-1.25.717-2.779-.217-2.779-1.643V5.653z",clipRule:"evenodd"}))});var PauseIcon=memo(function(_ref2){var style=_ref2.style;return React.createElement("svg",{xmlns:"http://www.w3.org/2000/svg",viewBox:"0 0 24 24",fill:"currentColor",style:style},React.createElement("path",{fillRule:"evenodd",d:"M6.75 5.25a.75.75 0 01.75.75v12a.75.75 0 01-1.5 0V6a.75.75 0 01.75-.75zM16.5 5.25a.75.75 0 01.75.75v12a.75.75 0 01-1.5 0V6a.75.75 0 01.75-.75z",clipRule:"evenodd"}))});var CloseIcon=memo(function(_ref3){var style=_ref3.style;return React.createElement("svg",{xmlns:"http://www.w3.org/2000/svg",viewBox:"0 0 24 24",fill:"currentColor",style:style},React.createElement("path",{fillRule:"evenodd",d:"M5.47 5.47a.75.75 0 011.06 0L12 10.94l5.47-5.47a.75.75 0 111.06 1.06L13.06 12l5.47 5.47a.75.75 0 11-1.06 1.06L12 13.06l-5.47 5.47a.75.75 0 01-1.06-1.06L10.94 12 5.47 6.53a.75.75 0 010-1.06z",clipRule:"evenodd"}))});var VolumeHighIcon=memo(function(_ref4){var style=_ref4.style;return React.createElement("svg",{xmlns:"http://www.w3.org/2000/svg",viewBox:"0 0 24 24",fill:"currentColor",style:style},React.createElement("path",{d:"M13.5 4.06c0-1.336-1.616-2.005-2.56-1.06l-4.5 4.5H4.508c-1.141 0-2.318.664-2.66 1.905A9.76 9.76 0 001.5 12c0 .898.121 1.768.35 2.595.341 1.24 1.518 1.905 2.66 1.905H6.44l4.5 4.5c.944.945 2.56.276 2.56-1.06V4.06zM18.584 14.828a.75.75 0 001.06-1.06l-1.5-1.5a.75.75 0 00-1.06 1.06l1.5 1.5zm-2.25-2.25a.75.75 0 001.06-1.06l-1.5-1.5a.75.75 0 00-1.06 1.06l1.5 1.5z"}))});var VolumeLowIcon=memo(function(_ref5){var style=_ref5.style;return React.createElement("svg",{xmlns:"http://www.w3.org/2000/svg",viewBox:"0 0 24 24",fill:"currentColor",style:style},React.createElement("path",{d:"M13.5 4.06c0-1.336-1.616-2.005-2.56-1.06l-4.5 4.5H4.508c-1.141 0-2.318.664-2.66 1.905A9.76 9.76 0 001.5 12c0 .898.121 1.768.35 2.595.341 1.24 1.518 1.905 2.66 1.905H6.44l4.5 4.5c.944.945 2.56.276 2.56-1.06V4.06z"}))});var MaximizeIcon=memo(function(_ref6){var style=_ref6.style;return React.createElement("svg",{xmlns:"http://www.w3.org/2000/svg",fill:"none",viewBox:"0 0 24 24",strokeWidth:1.5,stroke:"currentColor",style:style},React.createElement("path",{strokeLinecap:"round",strokeLinejoin:"round",d:"M3.75 3.75v4.5m0-4.5h4.5m-4.5 0L9 9M20.25 20.25v-4.5m0 4.5h-4.5m4.5 0L15 15m-6 0l-3.75 3.75m0 0v-4.5m0 4.5h4.5m0-4.5l-3.75-3.75M20.25 3.75h-4.5m4.5 0v4.5m0-4.5L15 9"}))});var MinimizeIcon=memo(function(_ref7){var style=_ref7.style;return React.createElement("svg",{xmlns:"http://www.w3.org/2000/svg",fill:"none",viewBox:"0 0 24 24",strokeWidth:1.5,stroke:"currentColor",style:style},React.createElement("path",{strokeLinecap:"round",strokeLinejoin:"round",d:"M9 9V4.5M9 9H4.5M9 9L3.75 3.75M9 15v4.5M9 15H4.5M9 15l-5.25 5.25M15 9V4.5M15 9h4.5M15 9l5.25-5.25M15 15v4.5M15 15h4.5M15 15l5.25 5.25"}))});var formatTime=function formatTime(timeInSeconds){if(isNaN(timeInSeconds)||timeInSeconds<0)return"0:00";var minutes=Math.floor(timeInSeconds/60);var seconds=Math.floor(timeInSeconds%60);return"".concat(minutes,":").concat(seconds.toString().padStart(2,"0"))};var ModalPlayer=function ModalPlayer(_ref8){var item=_ref8.item,isVisible=_ref8.isVisible,onClose=_ref8.onClose;if(!item)return null;var url=item.url,origin=item.origin,mediaType=item.mediaType,description=item.description,aspectRatio=item.aspectRatio;var isVideo=mediaType==="video"||mediaType==="video_url";var getPlayerStyle=function getPlayerStyle(){var maxWidth=item.popupWidth?parseInt(item.popupWidth,10):window.innerWidth*0.8;var maxHeight=item.popupHeight?parseInt(item.popupHeight,10):window.innerHeight*0.8;if(aspectRatio&&aspectRatio!=="free"){var _aspectRatio$split$ma=aspectRatio.split(":").map(Number),_aspectRatio$split$ma2=_slicedToArray(_aspectRatio$split$ma,2),ratioW=_aspectRatio$split$ma2[0],ratioH=_aspectRatio$split$ma2[1];var width=maxWidth;var height=width*(ratioH/ratioW);if(height>maxHeight){height=maxHeight;width=height*(ratioW/ratioH)}return{width:"".concat(width,"px"),height:"".concat(height,"px")}}return{width:"".concat(maxWidth,"px"),height:"".concat(maxHeight,"px")}};var _useState=useState(false),_useState2=_slicedToArray(_useState,2),isMaximized=_useState2[0],setIsMaximized=_useState2[1];var size=getPlayerStyle();var playerContainerStyle=isMaximized?{width:"100%",height:"100%",borderRadius:"0"}:_objectSpread(_objectSpread({},size),{},{borderRadius:"0.5rem"});var aspectRatioClass=aspectRatio&&aspectRatio!=="free"?"aspect-ratio-".concat(aspectRatio.replace(":","-")):"";var videoRef=useRef(null);var controlsTimeoutRef=useRef(null);var speedControlRef=useRef(null);var _useState3=useState(true),_useState4=_slicedToArray(_useState3,2),isPlaying=_useState4[0],setIsPlaying=_useState4[1];var _useState5=useState(0),_useState6=_slicedToArray(_useState5,2),progress=_useState6[0],setProgress=_useState6[1];var _useState7=useState(0),_useState8=_slicedToArray(_useState7,2),duration=_useState8[0],setDuration=_useState8[1];var _useState9=useState(1),_useState0=_slicedToArray(_useState9,2),volume=_useState0[0],setVolume=_useState0[1];var _useState1=useState(1),_useState10=_slicedToArray(_useState1,2),playbackRate=_useState10[0],setPlaybackRate=_useState10[1];var _useState11=useState(true),_useState12=_slicedToArray(_useState11,2),showControls=_useState12[0],setShowControls=_useState12[1];var _useState13=useState(false),_useState14=_slicedToArray(_useState13,2),showSpeedOptions=_useState14[0],setShowSpeedOptions=_useState14[1];var _useState15=useState(false),_useState16=_slicedToArray(_useState15,2),isClosing=_useState16[0],setIsClosing=_useState16[1];var handleClose=useCallback(function(){setIsClosing(true);setTimeout(onClose,500)},[onClose]);var animationContainerStyle={transformOrigin:"".concat(origin.x,"px ").concat(origin.y,"px"),clipPath:isVisible&&!isClosing?"circle(142vmax at ".concat(origin.x,"px ").concat(origin.y,"px)"):"circle(0px at ".concat(origin.x,"px ").concat(origin.y,"px)"),opacity:isVisible&&!isClosing?1:0};var handleTogglePlay=function handleTogglePlay(){if(videoRef.current){videoRef.current.paused?videoRef.current.play():videoRef.current.pause();setIsPlaying(!videoRef.current.paused)}};var handleProgressChange=function handleProgressChange(e){var newTime=e.target.value*duration;if(videoRef.current)videoRef.current.currentTime=newTime;setProgress(e.target.value)};var handleVolumeChange=function handleVolumeChange(e){var newVolume=parseFloat(e.target.value);if(videoRef.current)videoRef.current.volume=newVolume;setVolume(newVolume)};var handlePlaybackRateChange=function handlePlaybackRateChange(rate){if(videoRef.current)videoRef.current.playbackRate=rate;setPlaybackRate(rate);setShowSpeedOptions(false)};var hideControls=function hideControls(){if(isPlaying)setShowControls(false)};var handleMouseMove=function handleMouseMove(){setShowControls(true);clearTimeout(controlsTimeoutRef.current);controlsTimeoutRef.current=setTimeout(hideControls,3000)};useEffect(function(){var v=videoRef.current;if(!v)return;var up=function up(){return setProgress(v.currentTime/v.duration)};var ud=function ud(){return setDuration(v.duration)};v.addEventListener("timeupdate",up);v.addEventListener("loadedmetadata",ud);return function(){v.removeEventListener("timeupdate",up);v.removeEventListener("loadedmetadata",ud);clearTimeout(controlsTimeoutRef.current)}},[]);useEffect(function(){if(isPlaying){controlsTimeoutRef.current=setTimeout(hideControls,3000)}else{clearTimeout(controlsTimeoutRef.current);setShowControls(true)}},[isPlaying]);useEffect(function(){var h=function h(e){if(speedControlRef.current&&!speedControlRef.current.contains(e.target)){setShowSpeedOptions(false)}};if(showSpeedOptions){document.addEventListener("mousedown",h)}return function(){document.removeEventListener("mousedown",h)}},[showSpeedOptions]);var renderMedia=function renderMedia(){switch(mediaType){case"video":case"video_url":return React.createElement("video",{ref:videoRef,src:url,autoPlay:true,onClick:handleTogglePlay});case"image":return React.createElement("img",{src:url,alt:description});case"pdf":case"link":return React.createElement("iframe",{src:url,title:description,sandbox:"allow-scripts allow-same-origin allow-popups allow-forms"});default:return React.createElement("div",{style:{color:"#fff"}},"Unsupported media type")}};return ReactDOM.createPortal(React.createElement("div",{className:"enhancer-modal-overlay",onClick:handleClose},React.createElement("div",{className:"enhancer-modal-animation-container",style:animationContainerStyle},React.createElement("div",{className:"enhancer-modal-content-wrapper"},React.createElement("div",{className:"enhancer-modal-content ".concat(aspectRatioClass),style:_objectSpread(_objectSpread({},playerContainerStyle),{},{backgroundColor:isVideo?"#000":"#fff"}),onClick:function onClick(e){return e.stopPropagation()},onMouseMove:isVideo?handleMouseMove:null},renderMedia(),isVideo&&React.createElement("div",{className:"enhancer-video-controls-bg",style:{opacity:showControls?1:0}},React.createElement("input",{type:"range",min:"0",max:"1",step:"0.001",value:progress||0,onChange:handleProgressChange}),React.createElement("div",{style:{display:"flex",alignItems:"center",justifyContent:"space-between",marginTop:"0.5rem"}},React.createElement("div",{style:{display:"flex",alignItems:"center",gap:"1rem"}},React.createElement("button",{onClick:handleClose,title:"Close",style:{background:"none",border:"none",color:"white",cursor:"pointer"}},React.createElement(CloseIcon,{style:closeIconStyle})),React.createElement("button",{onClick:handleTogglePlay,style:{background:"none",border:"none",color:"white",cursor:"pointer"}},isPlaying?React.createElement(PauseIcon,{style:iconSizeStyle}):React.createElement(PlayIcon,{style:iconSizeStyle})),React.createElement("div",{style:{display:"flex",alignItems:"center",gap:"0.5rem"}},React.createElement("button",{onClick:function onClick(){return handleVolumeChange({target:{value:volume>0?0:1}})},style:{background:"none",border:"none",color:"white",cursor:"pointer"}},volume>0?React.createElement(VolumeHighIcon,{style:iconSizeStyle}):React.createElement(VolumeLowIcon,{style:iconSizeStyle})),React.createElement("input",{type:"range",min:"0",max:"1",step:"0.01",value:volume,onChange:handleVolumeChange,style:{width:"6rem"}})),React.createElement("span",{style:{fontFamily:"monospace",fontSize:"0.875rem"}},formatTime(progress*duration)," / ",formatTime(duration))),React.createElement("div",{style:{display:"flex",alignItems:"center",gap:"1rem"}},React.createElement("div",{style:{position:"relative"},ref:speedControlRef},React.createElement("button",{onClick:function onClick(){return setShowSpeedOptions(function(p){return!p})},style:{fontFamily:"monospace",fontSize:"0.875rem",width:"4rem",textAlign:"center",padding:"0.25rem 0.5rem",borderRadius:"0.25rem",background:"none",border:"none",color:"white",cursor:"pointer"},title:"Playback Speed"},playbackRate,"x"),showSpeedOptions&&React.createElement("div",{style:{position:"absolute",bottom:"100%",right:0,marginBottom:"0.5rem",backgroundColor:"rgba(0,0,0,0.7)",borderRadius:"0.5rem",padding:"0.25rem",zIndex:10}},[0.5,1,1.5,2,3].map(function(rate){return React.createElement("button",{key:rate,onClick:function onClick(){return handlePlaybackRateChange(rate)},style:{display:"block",width:"100%",textAlign:"center",fontFamily:"monospace",padding:"0.375rem 1rem",fontSize:"0.875rem",borderRadius:"0.375rem",background:playbackRate===rate?"#34d399":"none",fontWeight:playbackRate===rate?"bold":"normal",border:"none",color:"white",cursor:"pointer"}},rate,"x")}))),React.createElement("button",{onClick:function onClick(){return setIsMaximized(!isMaximized)},title:isMaximized?"Restore size":"Maximize",style:{background:"none",border:"none",color:"white",cursor:"pointer"}},isMaximized?React.createElement(MinimizeIcon,{style:iconSizeStyle}):React.createElement(MaximizeIcon,{style:iconSizeStyle}))))),React.createElement("button",{onClick:handleClose,className:"enhancer-modal-close-button"},React.createElement(CloseIcon,{style:closeIconStyle})))))),document.getElementById("enhancer-root"))};var AppManager=function AppManager(){var _useState17=useState(null),_useState18=_slicedToArray(_useState17,2),activeModalItem=_useState18[0],setActiveModalItem=_useState18[1];var _useState19=useState(false),_useState20=_slicedToArray(_useState19,2),isModalVisible=_useState20[0],setIsModalVisible=_useState20[1];var audioRef=useRef(null);var handleHotspotClick=useCallback(function(event){var hotspot=event.target.closest(".enhanced-hotspot");if(!hotspot)return;var _hotspot$dataset=hotspot.dataset,url=_hotspot$dataset.url,target=_hotspot$dataset.target,mediaType=_hotspot$dataset.mediaType,iconType=_hotspot$dataset.iconType,popupWidth=_hotspot$dataset.popupWidth,popupHeight=_hotspot$dataset.popupHeight,description=_hotspot$dataset.description,aspectRatio=_hotspot$dataset.aspectRatio;if(audioRef.current&&!audioRef.current.paused){audioRef.current.pause()}if(mediaType==="audio"){handleAudioPlay(hotspot,url)}else if(target==="embed"){setActiveModalItem({url:url,mediaType:mediaType,description:description,popupWidth:popupWidth,popupHeight:popupHeight,aspectRatio:aspectRatio,origin:{x:event.clientX,y:event.clientY}});setTimeout(function(){return setIsModalVisible(true)},10)}else{var width=popupWidth||800;var height=popupHeight||600;var features=target==="popup"?"width=".concat(width,",height=").concat(height,",resizable=yes,scrollbars=yes"):null;window.open(url,target==="_self"?"_self":"_blank",features)}},[]);var handleAudioPlay=function handleAudioPlay(hotspot,url){var audio=audioRef.current;var isCurrentlyPlayingThis=hotspot.dataset.isPlaying==="true";var anyPlaying=document.querySelector("[data-is-playing=\"true\"]");if(anyPlaying&&anyPlaying!==hotspot){anyPlaying.removeAttribute("data-is-playing");var ring=anyPlaying.querySelector(".audio-pulse-ring");if(ring)ring.remove()}if(isCurrentlyPlayingThis){audio.pause()}else{audio.src=url;audio.play()["catch"](function(e){return console.error("Audio play failed:",e)});hotspot.dataset.isPlaying="true";var _ring=document.createElement("div");_ring.className="audio-pulse-ring";hotspot.appendChild(_ring)}};var handleAudioPauseOrEnd=function handleAudioPauseOrEnd(){var currentlyPlaying=document.querySelector("[data-is-playing=\"true\"]");if(currentlyPlaying){currentlyPlaying.removeAttribute("data-is-playing");var ring=currentlyPlaying.querySelector(".audio-pulse-ring");if(ring)ring.remove()}};var handleCloseModal=useCallback(function(){setIsModalVisible(false);setTimeout(function(){return setActiveModalItem(null)},500)},[]);useEffect(function(){document.body.addEventListener("click",handleHotspotClick);var audio=document.createElement("audio");audioRef.current=audio;audio.addEventListener("pause",handleAudioPauseOrEnd);audio.addEventListener("ended",handleAudioPauseOrEnd);document.body.appendChild(audio);return function(){document.body.removeEventListener("click",handleHotspotClick);audio.removeEventListener("pause",handleAudioPauseOrEnd);audio.removeEventListener("ended",handleAudioPauseOrEnd);if(document.body.contains(audio)){document.body.removeChild(audio)}}},[handleHotspotClick]);return React.createElement(ModalPlayer,{item:activeModalItem,isVisible:isModalVisible,onClose:handleCloseModal})};var rootElement=document.getElementById("enhancer-root");if(rootElement){var root=ReactDOM.createRoot(rootElement);root.render(React.createElement(AppManager,null))}else{console.error("Hotspot Enhancer Error: Root element '#enhancer-root' not found.")}})();})();
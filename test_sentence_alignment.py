@@ -0,0 +1,92 @@
+# D:\projects\singlepage\hotspot_editor\test_sentence_alignment.py
+import os
+import re
+import sys
+from unittest import TestCase, main as unittest_main
+
+# 将项目根目录添加到Python的模块搜索路径中
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from sentence_alignment import SentenceAlignment
+
+
+def make_words(lines):
+    """
+    按行构造与 page.get_text("words") 格式相同的单词元组。
+    每行是一个字符串，单词之间用空格分隔；坐标只需保证顺序，不影响对齐。
+    """
+    words = []
+    for line_no, line in enumerate(lines):
+        for word_no, text in enumerate(line.split()):
+            x0, y0 = word_no * 50.0, line_no * 20.0
+            words.append((x0, y0, x0 + 40.0, y0 + 12.0, text, 0, line_no, word_no))
+    return words
+
+
+def simple_sent_tokenize(text):
+    """测试用的句子分割器: 在句末标点后的空白处断开 (与 nltk 一样原样返回文本片段)。"""
+    return [s for s in re.split(r'(?<=[.!?])\s+', text) if s]
+
+
+class TestSentenceAlignment(TestCase):
+
+    def align_texts(self, words, sentences=None):
+        alignment = SentenceAlignment(words)
+        if sentences is None:
+            sentences = simple_sent_tokenize(alignment.text)
+        return [(sentence, [w[4] for w in words[first:end]])
+                for sentence, first, end in alignment.align(sentences)]
+
+    def test_sentences_map_to_word_ranges(self):
+        words = make_words(["The cat sat. The dog", "ran away! Did it?"])
+        self.assertEqual(self.align_texts(words), [
+            ("The cat sat.", ["The", "cat", "sat."]),
+            ("The dog ran away!", ["The", "dog", "ran", "away!"]),
+            ("Did it?", ["Did", "it?"]),
+        ])
+
+    def test_hyphenated_word_is_joined_across_lines(self):
+        words = make_words(["Reading compre-", "hension matters. Next one."])
+        alignment = SentenceAlignment(words)
+        self.assertIn("Reading comprehension matters.", alignment.text)
+        self.assertEqual(self.align_texts(words)[0][1], ["Reading", "compre-", "hension", "matters."])
+
+    def test_hyphen_within_a_line_is_kept(self):
+        words = make_words(["A well- known fact. End."])
+        self.assertIn("well- known", SentenceAlignment(words).text)
+
+    def test_ligatures_are_expanded(self):
+        words = make_words(["The ﬁnal oﬃce. Done."])
+        alignment = SentenceAlignment(words)
+        self.assertTrue(alignment.text.startswith("The final office."))
+        self.assertEqual(self.align_texts(words)[0][1], ["The", "ﬁnal", "oﬃce."])
+
+    def test_sentences_with_altered_whitespace_are_not_skipped(self):
+        words = make_words(["One two. Three four."])
+        # 分割器改写了空白 (例如把空格合并掉)，仍然应该能定位
+        result = self.align_texts(words, ["One  two.", "Threefour."])
+        self.assertEqual(result, [("One  two.", ["One", "two."]), ("Threefour.", ["Three", "four."])])
+
+    def test_unlocatable_sentence_keeps_its_words(self):
+        words = make_words(["Alpha beta. Gamma delta. Epsilon."])
+        result = self.align_texts(words, ["Alpha beta.", "??? unknown", "Epsilon."])
+        covered = [text for _, texts in result for text in texts]
+        self.assertEqual(covered, ["Alpha", "beta.", "Gamma", "delta.", "Epsilon."])
+
+    def test_dense_page_covers_every_word_once(self):
+        # 400 行、每行 12 个单词，每 7 个单词结束一个句子 (句子经常跨行)
+        lines = [" ".join(f"word{i}{j}" + ("." if (i * 12 + j) % 7 == 6 else "") for j in range(12))
+                 for i in range(400)]
+        words = make_words(lines)
+        result = self.align_texts(words)
+        covered = [text for _, texts in result for text in texts]
+        self.assertEqual(covered, [w[4] for w in words])
+        self.assertGreater(len(result), 600)
+
+    def test_empty_input(self):
+        self.assertEqual(SentenceAlignment([]).align(["Anything."]), [])
+
+
+if __name__ == '__main__':
+    unittest_main()
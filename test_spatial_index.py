@@ -0,0 +1,53 @@
+# D:\projects\singlepage\hotspot_editor\test_spatial_index.py
+import os
+import random
+import sys
+from unittest import TestCase, main as unittest_main
+
+# 将项目根目录添加到Python的模块搜索路径中
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from spatial_index import RectIndex, neighbours_in_groups, tolerance_groups
+
+
+class TestSpatialIndex(TestCase):
+
+    def test_tolerance_groups_are_anchored_to_first_value(self):
+        # 每组以第一个值为基准: 0, 4, 8 中 8 与 0 相差超过容差，开始新的分组
+        self.assertEqual(tolerance_groups([0, 4, 8, 9, 30], 5).tolist(), [0, 0, 1, 1, 2])
+        self.assertEqual(tolerance_groups([1, 1, 1], 0).tolist(), [0, 1, 2])
+        self.assertEqual(tolerance_groups([], 5).tolist(), [])
+
+    def test_neighbours_in_groups(self):
+        labels = [0, 0, 1, 0, 1]
+        keys = [10, 30, 5, 20, 7]
+        self.assertEqual(neighbours_in_groups(labels, keys).tolist(), [3, -1, 4, 1, -1])
+        self.assertEqual(neighbours_in_groups(labels, keys, descending=True).tolist(), [-1, 3, -1, 0, 2])
+
+    def test_query_returns_intersecting_boxes_in_original_order(self):
+        boxes = [(0, 0, 10, 10), (20, 0, 30, 10), (0, 20, 10, 40), (40, 40, 50, 50)]
+        index = RectIndex(boxes)
+        self.assertEqual(index.query((5, 5, 25, 25)).tolist(), [0, 1, 2])
+        # 只接触边界不算相交
+        self.assertEqual(index.query((10, 10, 20, 20)).tolist(), [])
+        # 高度较大的矩形 (y0 在查询范围之上) 也能被找到
+        self.assertEqual(index.query((0, 35, 5, 36)).tolist(), [2])
+
+    def test_query_many_matches_brute_force(self):
+        rng = random.Random(7)
+        boxes = []
+        for _ in range(500):
+            x, y = rng.uniform(0, 500), rng.uniform(0, 800)
+            boxes.append((x, y, x + rng.uniform(1, 40), y + rng.uniform(1, 15)))
+        rects = [(x, y, x + 60, y + 30) for x, y in ((rng.uniform(0, 500), rng.uniform(0, 800)) for _ in range(100))]
+        expected = [[i for i, (bx0, by0, bx1, by1) in enumerate(boxes)
+                     if bx0 < x1 and bx1 > x0 and by0 < y1 and by1 > y0] for x0, y0, x1, y1 in rects]
+        self.assertEqual([r.tolist() for r in RectIndex(boxes).query_many(rects)], expected)
+
+    def test_empty_index(self):
+        self.assertEqual(RectIndex([]).query((0, 0, 10, 10)).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest_main()
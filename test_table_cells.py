@@ -0,0 +1,56 @@
+# D:\projects\singlepage\hotspot_editor\test_table_cells.py
+import os
+import sys
+from unittest import TestCase, main as unittest_main
+
+# 将项目根目录添加到Python的模块搜索路径中
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from table_cells import TableCellSet
+
+
+def grid_bboxes(rows, cols, width=50.0, height=20.0):
+    """按行生成 rows x cols 个相邻单元格的边框 (x0, y0, x1, y1)。"""
+    return [(c * width, r * height, (c + 1) * width, (r + 1) * height) for r in range(rows) for c in range(cols)]
+
+
+class TestTableCellSet(TestCase):
+
+    def test_words_are_assigned_to_cells_by_center(self):
+        words = [
+            (5, 2, 20, 12, "top", 0, 0, 0), (22, 2, 45, 12, "left", 0, 0, 1),
+            (5, 12, 30, 18, "second", 0, 1, 0),
+            (48, 2, 70, 12, "right", 1, 0, 0),  # 跨越单元格边界，中心点在右侧单元格
+            (200, 200, 210, 210, "outside", 2, 0, 0),
+        ]
+        cells = TableCellSet.from_bboxes(grid_bboxes(1, 2), words)
+        self.assertEqual(cells.texts, ["top left\nsecond", "right"])
+        self.assertEqual(cells.rects.tolist(), [[0, 0, 50, 20], [50, 0, 50, 20]])
+
+    def test_vertical_merge_chunks_each_column(self):
+        bboxes = grid_bboxes(5, 2)
+        cells = TableCellSet.from_bboxes(bboxes)
+        cells.texts = [f"r{i // 2}c{i % 2}" for i in range(len(bboxes))]
+        merged = cells.merge(2, 0, 5, 5).to_dicts()
+        self.assertEqual([(c['x'], c['y'], c['width'], c['height']) for c in merged],
+                         [(0, 0, 50, 40), (0, 40, 50, 40), (0, 80, 50, 20),
+                          (50, 0, 50, 40), (50, 40, 50, 40), (50, 80, 50, 20)])
+        self.assertEqual([c['text'] for c in merged][:3], ["r0c0 r1c0", "r2c0 r3c0", "r4c0"])
+
+    def test_horizontal_merge_groups_rows_within_tolerance(self):
+        # 第二个单元格略微偏移，仍在容差内，与第一个属于同一行
+        cells = TableCellSet([(0, 0, 10, 10), (10, 3, 10, 10), (20, 0, 10, 10), (0, 30, 10, 10)],
+                             ["a", "", "c", "d"])
+        merged = cells.merge(0, 2, 5, 5)
+        self.assertEqual(merged.rects.tolist(), [[0, 0, 20, 13], [20, 0, 10, 10], [0, 30, 10, 10]])
+        self.assertEqual(merged.texts, ["a", "c", "d"])
+
+    def test_no_merge_and_empty(self):
+        cells = TableCellSet.from_bboxes(grid_bboxes(2, 2))
+        self.assertIs(cells.merge(0, 0, 5, 5), cells)
+        self.assertEqual(len(TableCellSet([], []).merge(3, 0, 5, 5)), 0)
+
+
+if __name__ == '__main__':
+    unittest_main()
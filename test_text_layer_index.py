@@ -0,0 +1,80 @@
+# D:\projects\singlepage\hotspot_editor\test_text_layer_index.py
+import os
+import sys
+import tempfile
+from unittest import TestCase, main as unittest_main
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# 将项目根目录添加到Python的模块搜索路径中
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from text_layer_index import PageText, PdfTextLayer, TextLayerIndex, index_path_for
+
+
+def make_page(word_texts, line_texts):
+    """构造一个页面的文本层，坐标不影响保存格式。"""
+    return PageText([(0, 0, 1, 1)] * len(word_texts), [(0, 0, i) for i in range(len(word_texts))], word_texts,
+                    [(0, 0, 1, 1)] * len(line_texts), [10.0] * len(line_texts), line_texts)
+
+
+class TestTextLayerIndex(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "text_layer.npz")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_texts_round_trip_unchanged(self):
+        # 空文本、末尾的 \x00 和非 ASCII 字符都必须原样还原；未提取的页面不保存
+        word_texts = ["alpha", "", "tail\x00", "中文\x00\x00", ""]
+        layer = PdfTextLayer("book.pdf", {"size": 1, "sha256": "x"}, 5,
+                             {1: make_page(word_texts, ["line one", ""]), 3: make_page([], ["only line"])})
+        layer.save(self.path)
+        loaded = PdfTextLayer.load(self.path, "book.pdf")
+        self.assertEqual(sorted(loaded._pages), [1, 3])
+        self.assertEqual(loaded.page(1).word_texts, word_texts)
+        self.assertEqual(loaded.lines(1)[0]['text'], "line one")
+        self.assertEqual(loaded.words(1)[3][4], "中文\x00\x00")
+        self.assertEqual(loaded.words(3), [])
+
+    def test_index_with_mismatched_counts_is_rejected(self):
+        PdfTextLayer("book.pdf", {"sha256": "x"}, 1, {0: make_page(["a", "b", "c"], ["a b c"])}).save(self.path)
+        with np.load(self.path) as data:
+            arrays = dict(data)
+        # 文本数量比单词框少一个
+        arrays["word_texts_offsets"] = arrays["word_texts_offsets"][:-1]
+        arrays["word_texts"] = arrays["word_texts"][:arrays["word_texts_offsets"][-1]]
+        np.savez(self.path, **arrays)
+        self.assertIsNone(PdfTextLayer.load(self.path, "book.pdf"))
+
+    def test_pages_are_extracted_on_demand_and_saved(self):
+        sources_dir = os.path.join(self.temp_dir.name, "sources")
+        os.makedirs(sources_dir)
+        pdf_path = os.path.join(sources_dir, "book.pdf")
+        doc = fitz.open()
+        for i in range(3):
+            doc.new_page().insert_text((72, 72), f"page{i} hello")
+        doc.save(pdf_path)
+        doc.close()
+
+        index = TextLayerIndex()
+        layer = index.get(pdf_path)
+        self.assertEqual((layer.page_count, len(layer._pages)), (3, 0))
+        self.assertEqual([w[4] for w in index.words(pdf_path, 1)], ["page1", "hello"])
+        self.assertEqual(sorted(layer._pages), [1])
+
+        index.save_pending(background=False)
+        self.assertFalse(layer.unsaved_pages)
+        stored = TextLayerIndex().get(pdf_path)
+        self.assertEqual(sorted(stored._pages), [1])
+        self.assertTrue(os.path.exists(index_path_for(pdf_path)))
+        self.assertEqual([w[4] for w in stored.words(2)], ["page2", "hello"])
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -0,0 +1,380 @@
+# FILE: text_layer_index.py
+#
+# 功能: PDF 文本层索引。
+#       每个源 PDF 的每一页只提取一次文本 (单词框、所在块/行编号、文本行及字号)，
+#       以紧凑的 NumPy 数组保存到工作区中该 PDF 的资产目录 (text_layer.npz)。
+#       PDF 工具箱中的各个工具从这里查询，而不是每次运行都重新调用 page.get_text()，
+#       因此换一组选项重新运行工具几乎是即时的。
+#       页面在第一次被查询时才提取 (只处理一页的工具不会提取整本书)，
+#       工具运行结束后新提取的页面在后台线程中写入索引文件。
+#       索引记录源 PDF 的哈希，PDF 被替换后自动重建。
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from pdf_document_pool import pdf_document_pool
+from pdf_processor import _file_sha256
+
+INDEX_FILENAME = "text_layer.npz"
+# 索引格式版本。提取方式或保存格式变化时递增，旧索引会被重建
+INDEX_VERSION = 3
+# 文本行提取不需要图片块，去掉 TEXT_PRESERVE_IMAGES 可以避免解码页面中的图片
+_LINE_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def index_path_for(pdf_path: str) -> str | None:
+    """
+    索引文件的保存位置: 工作区 sources/ 中的 PDF 对应 assets/<文件名的MD5>/text_layer.npz
+    (与 PdfProcessor 渲染的页面图片在同一目录)。不在工作区中的 PDF 返回 None，索引只保存在内存中。
+    """
+    sources_dir = os.path.dirname(os.path.abspath(pdf_path))
+    if os.path.basename(sources_dir) != "sources":
+        return None
+    asset_dir_name = hashlib.md5(os.path.basename(pdf_path).encode()).hexdigest()
+    return os.path.join(os.path.dirname(sources_dir), "assets", asset_dir_name, INDEX_FILENAME)
+
+
+class PageText:
+    """
+    一个页面的文本层。对象只包含数组和字符串列表，可以在进程之间传递。
+
+    Attributes:
+        word_boxes (np.ndarray): (n, 4) 单词框 x0, y0, x1, y1 (单位: 点)。
+        word_ids (np.ndarray): (n, 3) 单词所在的块号、行号、行内序号 (与 get_text("words") 一致)。
+        line_boxes (np.ndarray): (m, 4) 文本行的边框。
+        line_sizes (np.ndarray): (m,) 文本行第一个文字片段 (span) 的字号。
+    """
+
+    def __init__(self, word_boxes, word_ids, word_texts: list, line_boxes, line_sizes, line_texts: list):
+        self.word_boxes = np.asarray(word_boxes, dtype=np.float64).reshape(-1, 4)
+        self.word_ids = np.asarray(word_ids, dtype=np.int32).reshape(-1, 3)
+        self.word_texts = word_texts
+        self.line_boxes = np.asarray(line_boxes, dtype=np.float64).reshape(-1, 4)
+        self.line_sizes = np.asarray(line_sizes, dtype=np.float64).reshape(-1)
+        self.line_texts = line_texts
+
+    @classmethod
+    def extract(cls, page: fitz.Page) -> 'PageText':
+        word_boxes, word_ids, word_texts = [], [], []
+        for x0, y0, x1, y1, text, block_no, line_no, word_no in page.get_text("words"):
+            word_boxes.append((x0, y0, x1, y1))
+            word_ids.append((block_no, line_no, word_no))
+            word_texts.append(text)
+
+        line_boxes, line_sizes, line_texts = [], [], []
+        for block in page.get_text("dict", flags=_LINE_TEXT_FLAGS)["blocks"]:
+            if block['type'] != 0:
+                continue
+            for line in block["lines"]:
+                spans = line['spans']
+                if not spans:
+                    continue
+                line_boxes.append(line['bbox'])
+                line_sizes.append(spans[0]['size'])
+                line_texts.append("".join(span['text'] for span in spans))
+        return cls(word_boxes, word_ids, word_texts, line_boxes, line_sizes, line_texts)
+
+    def words(self) -> list:
+        """与 page.get_text("words") 格式相同的列表: (x0, y0, x1, y1, 文本, 块号, 行号, 序号)。"""
+        return [(*box, text, *ids) for box, text, ids in
+                zip(self.word_boxes.tolist(), self.word_texts, self.word_ids.tolist())]
+
+    def lines(self) -> list:
+        """页面中的文本行 (不含没有文字片段的行): [{'text', 'bbox', 'size'}, ...]，text 为各片段原样拼接。"""
+        return [{'text': text, 'bbox': tuple(box), 'size': size} for box, size, text in
+                zip(self.line_boxes.tolist(), self.line_sizes.tolist(), self.line_texts)]
+
+
+class PdfTextLayer:
+    """
+    一个 PDF 的文本层。页面在第一次被查询时从 PDF 中提取，之后保存在内存中，
+    尚未写入索引文件的页面记录在 unsaved_pages 中。
+
+    提取页面时不持有任何锁 (文档池为每个线程提供各自的文档)，两个线程同时请求同一页时
+    可能各提取一次，只保留先完成的结果。
+    """
+
+    def __init__(self, pdf_path: str, source: dict, page_count: int, pages: dict = None):
+        self.pdf_path = pdf_path
+        self.source = source
+        self.page_count = page_count
+        self._pages = dict(pages or {})  # 页码 -> PageText
+        self.unsaved_pages = set()
+        self._lock = threading.Lock()
+
+    def _check_page(self, page_index: int):
+        if not 0 <= page_index < self.page_count:
+            raise IndexError(f"页码 {page_index + 1} 超出范围")
+
+    def page(self, page_index: int) -> PageText:
+        """返回页面的文本层，尚未提取时从 PDF 中提取。"""
+        self._check_page(page_index)
+        with self._lock:
+            page_text = self._pages.get(page_index)
+        if page_text is None:
+            with pdf_document_pool.borrow(self.pdf_path) as doc:
+                page_text = PageText.extract(doc[page_index])
+            with self._lock:
+                if page_index not in self._pages:
+                    self._pages[page_index] = page_text
+                    self.unsaved_pages.add(page_index)
+                page_text = self._pages[page_index]
+        return page_text
+
+    def words(self, page_index: int) -> list:
+        return self.page(page_index).words()
+
+    def lines(self, page_index: int) -> list:
+        return self.page(page_index).lines()
+
+    def take_unsaved_pages(self, page_indices) -> dict:
+        """
+        取出 page_indices 中已提取、但尚未保存的页面 (不再视为未保存)。
+        工作进程用它把新提取的页面交回主进程，由主进程统一写入索引文件。
+        """
+        with self._lock:
+            taken = {i: self._pages[i] for i in page_indices if i in self.unsaved_pages}
+            self.unsaved_pages.difference_update(taken)
+        return taken
+
+    def add_pages(self, pages: dict):
+        """加入在其他进程中提取的页面，它们会在下次保存时写入索引文件。"""
+        with self._lock:
+            for page_index, page_text in pages.items():
+                if 0 <= page_index < self.page_count and page_index not in self._pages:
+                    self._pages[page_index] = page_text
+                    self.unsaved_pages.add(page_index)
+
+    # --- 保存与读取 ---
+
+    def save(self, path: str):
+        """
+        保存所有已提取的页面。各页的数据按页码顺序拼接在同一组数组中，
+        page_word_offsets[k]:page_word_offsets[k + 1] 是第 pages[k] 页的单词 (文本行同理)。
+        先写入临时文件再替换，避免中途崩溃留下半截索引。
+        """
+        with self._lock:
+            saved_pages = set(self.unsaved_pages)
+            pages = sorted(self._pages.items())
+        if "sha256" not in self.source:
+            self.source = {**self.source, "sha256": _file_sha256(self.pdf_path)}
+
+        page_texts = [page_text for _, page_text in pages]
+        word_texts = [text for p in page_texts for text in p.word_texts]
+        line_texts = [text for p in page_texts for text in p.line_texts]
+        temp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            temp_path,
+            meta=np.array(json.dumps({"version": INDEX_VERSION, "source": self.source,
+                                      "page_count": self.page_count})),
+            pages=np.array([page_index for page_index, _ in pages], dtype=np.int64),
+            page_word_offsets=_offsets([len(p.word_texts) for p in page_texts]),
+            word_boxes=_concatenate([p.word_boxes for p in page_texts], (0, 4), np.float64),
+            word_ids=_concatenate([p.word_ids for p in page_texts], (0, 3), np.int32),
+            **_pack_texts("word_texts", word_texts),
+            page_line_offsets=_offsets([len(p.line_texts) for p in page_texts]),
+            line_boxes=_concatenate([p.line_boxes for p in page_texts], (0, 4), np.float64),
+            line_sizes=_concatenate([p.line_sizes for p in page_texts], (0,), np.float64),
+            **_pack_texts("line_texts", line_texts),
+        )
+        os.replace(temp_path, path)
+        with self._lock:
+            self.unsaved_pages.difference_update(saved_pages)
+
+    @classmethod
+    def load(cls, path: str, pdf_path: str) -> 'PdfTextLayer | None':
+        """读取索引文件。文件不存在、已损坏、版本不符或各数组的长度互相矛盾时返回 None。"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != INDEX_VERSION:
+                    return None
+                page_count = int(meta["page_count"])
+                page_indices = data["pages"].tolist()
+                word_offsets, line_offsets = data["page_word_offsets"], data["page_line_offsets"]
+                word_boxes, word_ids = data["word_boxes"], data["word_ids"]
+                line_boxes, line_sizes = data["line_boxes"], data["line_sizes"]
+                word_texts, line_texts = _unpack_texts(data, "word_texts"), _unpack_texts(data, "line_texts")
+        except (OSError, ValueError, KeyError, TypeError, UnicodeDecodeError):
+            return None
+
+        word_count, line_count = len(word_boxes), len(line_boxes)
+        if not (len(word_ids) == len(word_texts) == word_count and len(line_sizes) == len(line_texts) == line_count
+                and len(set(page_indices)) == len(page_indices)
+                and all(0 <= i < page_count for i in page_indices)
+                and _offsets_valid(word_offsets, len(page_indices), word_count)
+                and _offsets_valid(line_offsets, len(page_indices), line_count)):
+            return None
+
+        pages = {}
+        word_bounds, line_bounds = word_offsets.tolist(), line_offsets.tolist()
+        for k, page_index in enumerate(page_indices):
+            (w0, w1), (l0, l1) = word_bounds[k:k + 2], line_bounds[k:k + 2]
+            pages[page_index] = PageText(word_boxes[w0:w1], word_ids[w0:w1], word_texts[w0:w1],
+                                         line_boxes[l0:l1], line_sizes[l0:l1], line_texts[l0:l1])
+        return cls(pdf_path, meta["source"], page_count, pages)
+
+
+def _offsets(counts: list) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _offsets_valid(offsets, part_count: int, total: int) -> bool:
+    return (len(offsets) == part_count + 1 and offsets[0] == 0 and offsets[-1] == total
+            and bool(np.all(np.diff(offsets) >= 0)))
+
+
+def _concatenate(arrays: list, empty_shape: tuple, dtype) -> np.ndarray:
+    return np.concatenate(arrays) if arrays else np.empty(empty_shape, dtype=dtype)
+
+
+def _pack_texts(key: str, texts: list) -> dict:
+    """
+    把文本列表保存为 UTF-8 字节数组和每个文本的字节偏移 (key 与 key_offsets)。
+    不使用分隔符拼接，文本中含有任何字符 (包括 \\x00) 都能原样还原。
+    """
+    encoded = [text.encode("utf-8") for text in texts]
+    return {key: np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            f"{key}_offsets": _offsets([len(b) for b in encoded])}
+
+
+def _unpack_texts(data, key: str) -> list:
+    """
+    _pack_texts() 的逆操作。
+
+    Raises:
+        ValueError: 偏移与字节数组不一致。
+        UnicodeDecodeError: 字节不是有效的 UTF-8。
+    """
+    blob = data[key].tobytes()
+    offsets = data[f"{key}_offsets"]
+    if not _offsets_valid(offsets, len(offsets) - 1, len(blob)):
+        raise ValueError(f"文本层索引中的 {key} 偏移无效")
+    bounds = offsets.tolist()
+    return [blob[start:end].decode("utf-8") for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+class TextLayerIndex:
+    """
+    进程内共享的文本层索引缓存 (LRU，按 PDF 的路径、修改时间和大小为键)。
+
+    查找顺序: 内存 -> 资产目录中的索引文件 (源 PDF 哈希一致时) -> 新建空的文本层 (页面按需提取)。
+    get() 只读取索引文件或打开 PDF 获取页数，不提取任何页面；读取和提取都在锁外进行。
+    """
+
+    def __init__(self, capacity: int = 4):
+        self.capacity = capacity
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._layers = OrderedDict()  # (绝对路径, 修改时间, 大小) -> PdfTextLayer
+
+    def get(self, pdf_path: str) -> PdfTextLayer:
+        """
+        返回 PDF 的文本层。
+
+        Raises:
+            FileNotFoundError / RuntimeError: 文件不存在或无法被 fitz 打开。
+        """
+        abs_path = os.path.abspath(pdf_path)
+        stat = os.stat(abs_path)
+        key = (abs_path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            layer = self._layers.get(key)
+            if layer is not None:
+                self._layers.move_to_end(key)
+                return layer
+
+        layer = self._load_or_create(abs_path, stat)
+        with self._lock:
+            # 另一个线程可能同时完成了读取，保留先加入的文本层
+            if key not in self._layers:
+                for stale_key in [k for k in self._layers if k[0] == abs_path]:
+                    del self._layers[stale_key]
+                self._layers[key] = layer
+                while len(self._layers) > self.capacity:
+                    self._layers.popitem(last=False)
+            self._layers.move_to_end(key)
+            return self._layers[key]
+
+    def words(self, pdf_path: str, page_index: int) -> list:
+        return self.get(pdf_path).words(page_index)
+
+    def lines(self, pdf_path: str, page_index: int) -> list:
+        return self.get(pdf_path).lines(page_index)
+
+    def take_unsaved_pages(self, pdf_path: str, page_indices) -> dict:
+        """见 PdfTextLayer.take_unsaved_pages()。PDF 的文本层不在缓存中时返回空字典。"""
+        abs_path = os.path.abspath(pdf_path)
+        with self._lock:
+            layers = [layer for key, layer in self._layers.items() if key[0] == abs_path]
+        return layers[-1].take_unsaved_pages(page_indices) if layers else {}
+
+    def add_pages(self, pdf_path: str, pages: dict):
+        if pages:
+            self.get(pdf_path).add_pages(pages)
+
+    def save_pending(self, background: bool = True) -> threading.Thread | None:
+        """
+        把所有文本层中新提取的页面写入各自的索引文件。工具运行结束后调用。
+
+        默认在后台线程中写入 (计算源 PDF 的哈希、压缩数组都可能较慢)，返回该线程；
+        没有需要保存的内容时返回 None。
+        """
+        with self._lock:
+            layers = [layer for layer in self._layers.values()
+                      if layer.unsaved_pages and index_path_for(layer.pdf_path)]
+        if not layers:
+            return None
+        if not background:
+            self._save_layers(layers)
+            return None
+        thread = threading.Thread(target=self._save_layers, args=(layers,), name="TextLayerIndexSave")
+        thread.start()
+        return thread
+
+    def _save_layers(self, layers: list):
+        with self._save_lock:
+            for layer in layers:
+                index_path = index_path_for(layer.pdf_path)
+                try:
+                    stat = os.stat(layer.pdf_path)
+                    if (stat.st_size, stat.st_mtime_ns) != (layer.source.get("size"), layer.source.get("mtime_ns")):
+                        continue  # PDF 已被替换，这些页面已经过期
+                    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+                    layer.save(index_path)
+                except OSError as e:
+                    print(f"警告: 无法保存文本层索引 {index_path}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._layers.clear()
+
+    @staticmethod
+    def _load_or_create(abs_path: str, stat) -> PdfTextLayer:
+        index_path = index_path_for(abs_path)
+        stored = PdfTextLayer.load(index_path, abs_path) if index_path and os.path.exists(index_path) else None
+        if stored is not None:
+            source = stored.source
+            # 大小和修改时间一致时不必重新计算哈希
+            if source.get("size") == stat.st_size and source.get("mtime_ns") == stat.st_mtime_ns:
+                return stored
+            if source.get("sha256") == _file_sha256(abs_path):
+                # 内容未变 (例如文件被复制过)，下次保存时记录新的大小和修改时间
+                stored.source = {**source, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                return stored
+
+        # 源 PDF 的哈希在第一次保存时才计算
+        return PdfTextLayer(abs_path, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+                            pdf_document_pool.page_count(abs_path))
+
+
+# 创建一个全局实例供其他模块使用
+text_layer_index = TextLayerIndex()
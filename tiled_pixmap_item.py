@@ -0,0 +1,264 @@
+# FILE: tiled_pixmap_item.py
+#
+# 功能: 一个按缩放级别分块渲染PDF页面的图形项，用来代替整页的 QGraphicsPixmapItem。
+#
+#       场景坐标仍然是导入时PNG的像素坐标 (热区数据依赖于此)，但图像内容不再来自
+#       整张解码后的PNG，而是:
+#         - 一张常驻内存的低分辨率预览图 (由导入时生成的页面PNG缩小解码而来)；
+#         - 按当前缩放级别 (考虑屏幕的设备像素比)、只为视口内可见区域从源PDF渲染的图块 (fitz clip rect)。
+#       缩小时只渲染低分辨率图块，放大时可以超过导入DPI的清晰度。
+#       预览图和图块都在后台线程中生成，界面线程激活页面时不会等待渲染，完成后只重绘对应区域。
+
+import math
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+from PySide6.QtCore import QObject, QRectF, QRunnable, QSize, QThreadPool, Signal
+from PySide6.QtGui import QImage, QImageReader, QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+
+from pdf_document_pool import pdf_document_pool
+
+# 每个图块的边长 (设备像素)
+TILE_SIZE = 512
+# 预览图的最长边 (像素)
+PREVIEW_MAX_SIDE = 1024
+# 相对于导入分辨率的最大放大倍数 (超过后不再渲染更清晰的图块)
+MAX_DETAIL_SCALE = 4.0
+# 相对于导入分辨率的最小缩小倍数
+MIN_DETAIL_SCALE = 1.0 / 16
+# 每个图形项最多缓存的图块数
+MAX_CACHED_TILES = 64
+
+
+def _render_pdf_region(pdf_path: str, page_index: int, clip: fitz.Rect, zoom: float) -> QImage:
+    """把PDF页面的一个矩形区域 (单位: 点) 按给定缩放渲染为 QImage。"""
+    with pdf_document_pool.borrow(pdf_path) as doc:
+        pix = doc.load_page(page_index).get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+    # fitz 的像素缓冲区在函数返回后失效，必须复制
+    return QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888).copy()
+
+
+class _TileSignals(QObject):
+    # (代次, 缩放级别指数, 列, 行, 图像)
+    tile_ready = Signal(int, int, int, int, QImage)
+    # (代次, 预览图)
+    preview_ready = Signal(int, QImage)
+    # 图形项占用的图片内存发生变化 (预览图就绪，或新增、淘汰了图块)
+    memory_changed = Signal()
+
+
+class _TileJob(QRunnable):
+    def __init__(self, signals, generation, level, column, row, pdf_path, page_index, clip, zoom):
+        super().__init__()
+        self.signals = signals
+        self.args = (generation, level, column, row)
+        self.pdf_path = pdf_path
+        self.page_index = page_index
+        self.clip = clip
+        self.zoom = zoom
+
+    def run(self):
+        try:
+            image = _render_pdf_region(self.pdf_path, self.page_index, self.clip, self.zoom)
+        except Exception as e:
+            print(f"渲染图块失败: {e}")
+            return
+        self.signals.tile_ready.emit(*self.args, image)
+
+
+class _PreviewJob(QRunnable):
+    """
+    生成预览图: 优先把页面PNG缩小解码 (不需要访问PDF)，PNG不可用时从PDF渲染整页。
+    """
+
+    def __init__(self, signals, generation, image_path, size: QSize, pdf_path, page_index, zoom):
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.image_path = image_path
+        self.size = size
+        self.pdf_path = pdf_path
+        self.page_index = page_index
+        self.zoom = zoom
+
+    def run(self):
+        image = QImage()
+        if self.image_path:
+            reader = QImageReader(self.image_path)
+            reader.setScaledSize(self.size)
+            image = reader.read()
+        if image.isNull():
+            try:
+                page_rect = pdf_document_pool.get_page_rect(self.pdf_path, self.page_index)
+                image = _render_pdf_region(self.pdf_path, self.page_index, page_rect, self.zoom)
+            except Exception as e:
+                print(f"渲染页面预览失败: {e}")
+        self.signals.preview_ready.emit(self.generation, image)
+
+
+class TiledPixmapItem(QGraphicsItem):
+    """
+    从源PDF按需渲染图块的页面图像项。
+
+    Args:
+        pdf_path (str): 源PDF (多页) 的路径。
+        page_index (int): 页码 (0-based)。
+        scene_width, scene_height (int): 导入时PNG的像素尺寸，即场景坐标范围。
+        preview_image_path (str): 导入时生成的页面PNG，用来生成预览图。
+    """
+
+    def __init__(self, pdf_path: str, page_index: int, scene_width: int, scene_height: int,
+                 preview_image_path: str = None, parent=None):
+        super().__init__(parent)
+        self.pdf_path = pdf_path
+        self.page_index = page_index
+        self.preview_image_path = preview_image_path
+        self._rect = QRectF(0, 0, scene_width, scene_height)
+        page_width = pdf_document_pool.get_page_rect(pdf_path, page_index).width
+        # 场景像素 / PDF点。直接由PNG宽度推算，与导入时使用的DPI无关
+        self._scene_per_point = scene_width / page_width if page_width else 1.0
+
+        self._preview = QPixmap()
+        self._preview_pending = False
+        self._tiles = OrderedDict()  # (level, column, row) -> QPixmap
+        self._pending = set()
+        self._generation = 0
+        self._signals = _TileSignals()
+        self._signals.tile_ready.connect(self._on_tile_ready)
+        self._signals.preview_ready.connect(self._on_preview_ready)
+        # 预览图就绪、图块增减都会改变内存占用，PixmapCache 据此更新该页面的开销并重新检查预算
+        self.memory_changed = self._signals.memory_changed
+
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)  # 需要 exposedRect
+        self.setFlag(QGraphicsItem.ItemIsSelectable, False)
+
+    @staticmethod
+    def can_render(pdf_path: str, page_index: int) -> bool:
+        """该页面能否使用分块渲染 (旋转过的页面使用整页图片)。"""
+        try:
+            with pdf_document_pool.borrow(pdf_path) as doc:
+                return 0 <= page_index < len(doc) and doc.load_page(page_index).rotation == 0
+        except Exception:
+            return False
+
+    # --- 与 PixmapCache 配合的接口 ---
+
+    def load(self) -> bool:
+        """
+        在后台线程中生成低分辨率预览图，立即返回 True。预览图就绪前，可见区域直接由图块填充。
+        """
+        if self.is_resident():
+            return True
+        preview_scale = min(1.0, PREVIEW_MAX_SIDE / max(self._rect.width(), self._rect.height(), 1))
+        size = QSize(max(1, round(self._rect.width() * preview_scale)),
+                     max(1, round(self._rect.height() * preview_scale)))
+        self._preview_pending = True
+        QThreadPool.globalInstance().start(_PreviewJob(self._signals, self._generation, self.preview_image_path,
+                                                       size, self.pdf_path, self.page_index,
+                                                       preview_scale * self._scene_per_point))
+        return True
+
+    def release(self):
+        """释放预览图和所有图块；正在生成的预览图和图块结果会被丢弃。"""
+        self._generation += 1
+        self._preview = QPixmap()
+        self._preview_pending = False
+        self._tiles.clear()
+        self._pending.clear()
+
+    def is_resident(self) -> bool:
+        return self._preview_pending or not self._preview.isNull()
+
+    def memory_cost_bytes(self) -> int:
+        pixmaps = [self._preview, *self._tiles.values()]
+        return sum(p.width() * p.height() * max(p.depth(), 8) // 8 for p in pixmaps)
+
+    # --- QGraphicsItem ---
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget=None):
+        exposed = option.exposedRect.intersected(self._rect)
+        if exposed.isEmpty():
+            return
+
+        # 1. 先画预览图，尚未渲染完成的图块区域不会出现空白
+        if not self._preview.isNull():
+            painter.save()
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+            painter.drawPixmap(self._rect, self._preview, QRectF(self._preview.rect()))
+            painter.restore()
+
+        # 2. 选择与当前缩放 (乘以设备像素比，HiDPI 屏幕上按物理像素渲染) 最接近的级别 (2 的整数次幂)，
+        #    只处理与暴露区域相交的图块
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        device_pixel_ratio = widget.devicePixelRatioF() if widget is not None else 1.0
+        level = self._level_for_detail(lod * device_pixel_ratio)
+        scale = 2.0 ** level
+        tile_extent = TILE_SIZE / scale  # 一个图块覆盖的场景宽度
+        if self._preview_is_sufficient(scale):
+            return
+
+        first_column = int(exposed.left() // tile_extent)
+        last_column = int(math.ceil(exposed.right() / tile_extent))
+        first_row = int(exposed.top() // tile_extent)
+        last_row = int(math.ceil(exposed.bottom() / tile_extent))
+        for row in range(first_row, last_row):
+            for column in range(first_column, last_column):
+                key = (level, column, row)
+                tile_rect = QRectF(column * tile_extent, row * tile_extent, tile_extent, tile_extent) \
+                    .intersected(self._rect)
+                if tile_rect.isEmpty():
+                    continue
+                tile = self._tiles.get(key)
+                if tile is None:
+                    self._request_tile(key, tile_rect, scale)
+                    continue
+                self._tiles.move_to_end(key)
+                painter.drawPixmap(tile_rect, tile, QRectF(tile.rect()))
+
+    # --- 内部实现 ---
+
+    @staticmethod
+    def _level_for_detail(lod: float) -> int:
+        lod = min(max(lod, MIN_DETAIL_SCALE), MAX_DETAIL_SCALE)
+        return int(math.ceil(math.log2(lod) - 1e-6))
+
+    def _preview_is_sufficient(self, scale: float) -> bool:
+        # 视图分辨率不超过预览图时，直接使用预览图即可
+        return not self._preview.isNull() and self._preview.width() >= self._rect.width() * scale
+
+    def _request_tile(self, key, tile_rect: QRectF, scale: float):
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        points_per_scene = 1.0 / self._scene_per_point
+        clip = fitz.Rect(tile_rect.left() * points_per_scene, tile_rect.top() * points_per_scene,
+                         tile_rect.right() * points_per_scene, tile_rect.bottom() * points_per_scene)
+        job = _TileJob(self._signals, self._generation, *key, self.pdf_path, self.page_index, clip,
+                       self._scene_per_point * scale)
+        QThreadPool.globalInstance().start(job)
+
+    def _on_preview_ready(self, generation: int, image: QImage):
+        if generation != self._generation:
+            return
+        self._preview_pending = False
+        if image.isNull():
+            return
+        self._preview = QPixmap.fromImage(image)
+        self.update()
+        self.memory_changed.emit()
+
+    def _on_tile_ready(self, generation: int, level: int, column: int, row: int, image: QImage):
+        key = (level, column, row)
+        self._pending.discard(key)
+        if generation != self._generation:
+            return
+        self._tiles[key] = QPixmap.fromImage(image)
+        while len(self._tiles) > MAX_CACHED_TILES:
+            self._tiles.popitem(last=False)
+        self.memory_changed.emit()
+        tile_extent = TILE_SIZE / (2.0 ** level)
+        self.update(QRectF(column * tile_extent, row * tile_extent, tile_extent, tile_extent))
@@ -1,6 +1,42 @@
 # D:\projects\singlepage\hotspot_editor\tools\base_tool.py (新版本 - 支持选项)
-from PySide6.QtCore import QObject
-from PySide6.QtWidgets import QWidget
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from PySide6.QtCore import QObject, QSettings, Qt
+from PySide6.QtWidgets import QWidget, QMessageBox, QProgressDialog, QApplication
+
+from commands import BatchAddHotspotsCommand
+from pdf_document_pool import pdf_document_pool
+from pdf_processor import resolve_worker_count
+from text_layer_index import text_layer_index
+from utils import create_default_data
+
+# 批量处理时，页数少于此值直接在当前进程中串行提取 (启动进程池的开销大于收益)
+PARALLEL_MIN_PAGES = 4
+# 每个工作进程一次领取的最大页数
+MAX_PAGES_PER_CHUNK = 8
+# 并行提取时轮询已完成分块的间隔 (秒)，期间处理界面事件以响应“取消”
+POLL_INTERVAL_SECONDS = 0.1
+
+
+def _extract_page_list(extract_page, pdf_path: str, jobs: list, options: dict) -> tuple[list, dict]:
+    """
+    进程池的工作函数: 依次提取同一个 PDF 中的多个页面。
+
+    子进程有自己的文档池，同一分块内的页面共用一次打开的文档。
+    该函数必须定义在模块顶层，以便能被 pickle 传递给子进程。
+
+    Args:
+        extract_page: 工具类的 extract_page 静态方法。
+        jobs (list): [(页码, 缩放比例), ...]
+
+    Returns:
+        tuple: (每个页面的提取结果, 本进程为这些页面新提取的文本层 {页码: PageText})。
+               文本层交回主进程保存，下次运行工具时无需再次提取。
+    """
+    results = [extract_page(pdf_path, page_index, scale_factor, options) for page_index, scale_factor in jobs]
+    return results, text_layer_index.take_unsaved_pages(pdf_path, [page_index for page_index, _ in jobs])
 
 
 class AbstractPdfTool(QObject):
@@ -10,6 +46,10 @@ class AbstractPdfTool(QObject):
     """
     name = "未命名工具"
     description = "无详细描述。"
+    # 实现了 extract_page() 的工具可以一次处理多个页面 (见 run_batch)
+    supports_batch = False
+    # extract_page() 是否从文本层索引读取文本 (批量处理时工作进程新提取的页面会交回当前进程保存)
+    uses_text_layer = False
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -37,4 +77,210 @@ class AbstractPdfTool(QObject):
         """
         可选方法。工具箱在执行 run() 之前会调用此方法。
         """
-        self.options = options
\ No newline at end of file
+        self.options = options
+
+    def _get_pdf_page_source(self, session) -> tuple[str, int] | None:
+        """
+        确定工具应从哪个PDF文件的哪一页读取内容。
+
+        导入时不再预先生成单页PDF，因此优先直接读取原始多页PDF中的
+        第 source_page_index 页；只有在原始PDF丢失、而旧项目中仍保留着
+        单页PDF时，才退回到单页PDF的第 0 页。
+
+        Args:
+            session: 当前的 ImageEditingSession。
+
+        Returns:
+            tuple[str, int] | None: (PDF路径, 页码)。如果该页面不是从PDF导入的，
+                                    或源文件都已不存在，则返回 None。
+        """
+        if not session:
+            return None
+        original_pdf_path = session.original_multipage_pdf_path
+        if original_pdf_path and os.path.exists(original_pdf_path):
+            return original_pdf_path, session.source_page_index
+        if session.source_pdf_path and os.path.exists(session.source_pdf_path):
+            return session.source_pdf_path, 0
+        return None
+
+    def _compute_scale_factor(self, session, pdf_path: str, page_index: int) -> float:
+        """
+        计算 PDF 坐标 (点) 到页面图像像素的缩放比例。
+
+        页面尺寸取自共享文档池的缓存，对同一个 PDF 连续运行工具时无需重复打开文件；
+        图像宽度取自 session.image_width (只读取文件头)，不会为尚未显示的页面创建场景。
+
+        Raises:
+            ValueError: PDF页面宽度为0，或无法读取页面图像的尺寸。
+        """
+        page_point_width = pdf_document_pool.get_page_rect(pdf_path, page_index).width
+        if page_point_width == 0:
+            raise ValueError("PDF页面宽度为0，无法计算缩放比例。")
+        if not session.image_width and not session.read_image_size():
+            raise ValueError(f"无法读取页面图像的尺寸: {session.image_path}")
+        return session.image_width / page_point_width
+
+
+    # --- 批量处理 ---
+
+    @staticmethod
+    def extract_page(pdf_path: str, page_index: int, scale_factor: float, options: dict) -> tuple[bool, list | str]:
+        """
+        提取单个页面上需要创建热区的区域。支持批量处理的工具必须实现此方法。
+
+        批量处理时此方法在工作进程中执行，因此必须是静态方法，且只能返回可 pickle 的普通数据。
+
+        Returns:
+            tuple: (True, [{'x', 'y', 'w', 'h', 'description'}, ...]) 像素坐标的区域列表，
+                   或 (False, 错误信息)。
+        """
+        raise NotImplementedError("extract_page() must be implemented by batch-capable tools.")
+
+    def validate_options(self, main_window) -> bool:
+        """在提取之前检查选项。选项无效时应提示用户并返回 False。"""
+        return True
+
+    def build_hotspots(self, regions: list) -> list:
+        """把 extract_page() 返回的区域转换为 BatchAddHotspotsCommand 使用的热区数据。"""
+        link_type = self.options.get('link_type', 'file')
+        hotspots = []
+        for region in regions:
+            data = create_default_data()
+            data['description'] = region.get('description', '')
+            data['hotspot_type'] = link_type
+            hotspots.append({'pos': {'x': region['x'], 'y': region['y']},
+                             'rect': {'w': region['w'], 'h': region['h']},
+                             'type': 'rectangle', 'data': data})
+        return hotspots
+
+    def push_hotspots(self, main_window, session, hotspots: list):
+        """
+        为一个页面创建热区，作为该页面撤销栈中的一步。
+
+        页面的场景尚未创建时 (批量处理中从未显示过的页面)，命令只把热区数据追加到
+        session.pending_hotspots_data，场景在页面首次显示时再创建。
+        """
+        scene = session.scene if session.has_scene() else None
+        command = BatchAddHotspotsCommand(scene, session.viewer, main_window, hotspots, session=session)
+        command.setText(self.name)
+        session.undo_stack.push(command)
+
+    def run_batch(self, main_window, sessions: list):
+        """
+        对多个页面运行工具: 在进程池中并行提取，再为每个页面推入一个撤销命令。
+
+        多个页面来自同一个 PDF 的同一页时只提取一次。
+        """
+        if not self.validate_options(main_window):
+            return
+
+        page_jobs = {}  # session -> (PDF路径, 页码, 缩放比例)
+        for session in sessions:
+            pdf_source = self._get_pdf_page_source(session)
+            if not pdf_source:
+                continue
+            try:
+                page_jobs[session] = (*pdf_source, self._compute_scale_factor(session, *pdf_source))
+            except Exception as e:
+                print(f"跳过页面 (无法计算缩放比例): {e}")
+        if not page_jobs:
+            QMessageBox.warning(main_window, "操作无效", "所选范围内没有从PDF文件导入的页面。")
+            return
+
+        results = self._extract_pages(main_window, sorted(set(page_jobs.values())))
+        if results is None:
+            return  # 用户取消
+
+        pending = []  # [(session, hotspots), ...]
+        failed_pages = 0
+        for session, job in page_jobs.items():
+            success, regions = results[job]
+            if not success:
+                failed_pages += 1
+            elif regions:
+                pending.append((session, self.build_hotspots(regions)))
+
+        hotspot_count = sum(len(hotspots) for _, hotspots in pending)
+        if hotspot_count == 0:
+            QMessageBox.information(main_window, "提示", f"在所选的 {len(page_jobs)} 个页面中没有找到可以创建热区的内容。")
+            return
+
+        reply = QMessageBox.question(main_window, "确认创建",
+                                     f"在 {len(pending)} 个页面中识别到 {hotspot_count} 个热区"
+                                     f"（{failed_pages} 个页面没有结果）。\n是否为它们创建热区？",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.No:
+            return
+
+        for session, hotspots in pending:
+            self.push_hotspots(main_window, session, hotspots)
+        QMessageBox.information(main_window, "操作成功",
+                                f"已在 {len(pending)} 个页面中创建了 {hotspot_count} 个热区，每个页面可单独撤销。")
+
+    def _extract_pages(self, main_window, jobs: list) -> dict | None:
+        """
+        提取 jobs 中的所有页面，返回 {(PDF路径, 页码, 缩放比例): (成功与否, 结果)}；用户取消时返回 None。
+
+        页数较多时按 PDF 分块交给进程池，吞吐量随 CPU 核心数增长；进程池不可用时回退到串行。
+        并行提取时以短超时轮询已完成的分块并处理界面事件，点击“取消”后立即返回，
+        不等待正在运行的分块 (其结果被丢弃)。无论以何种方式返回，进度对话框都会被关闭。
+        """
+        progress = QProgressDialog(f"正在运行“{self.name}”...", "取消", 0, len(jobs), main_window)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        try:
+            return self._run_extraction(jobs, progress)
+        finally:
+            progress.close()
+
+    def _run_extraction(self, jobs: list, progress: QProgressDialog) -> dict | None:
+        results = {}
+
+        def record(chunk, chunk_results):
+            results.update(zip(chunk, chunk_results))
+            progress.setValue(len(results))
+            QApplication.processEvents()
+
+        workers = QSettings("MyCompany", "HotspotEditor").value("pdf/render_workers", 0, type=int)
+        worker_count = min(resolve_worker_count(workers), len(jobs))
+        if worker_count > 1 and len(jobs) >= PARALLEL_MIN_PAGES:
+            # 让每个进程大约领取 4 个分块，以便负载均衡
+            chunk_size = max(1, min(MAX_PAGES_PER_CHUNK, -(-len(jobs) // (worker_count * 4))))
+            chunks = []
+            for pdf_path in dict.fromkeys(job[0] for job in jobs):
+                same_pdf = [job for job in jobs if job[0] == pdf_path]
+                chunks += [same_pdf[start:start + chunk_size] for start in range(0, len(same_pdf), chunk_size)]
+            # 不使用 with 语句: 退出 with 时会等待所有正在运行的分块，取消后无法立即返回
+            executor = None
+            try:
+                executor = ProcessPoolExecutor(max_workers=worker_count)
+                chunk_of = {executor.submit(_extract_page_list, type(self).extract_page, chunk[0][0],
+                                            [job[1:] for job in chunk], self.options): chunk
+                            for chunk in chunks}
+                not_done = set(chunk_of)
+                while not_done:
+                    if progress.wasCanceled():
+                        return None
+                    done, not_done = wait(not_done, timeout=POLL_INTERVAL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk = chunk_of[future]
+                        chunk_results, page_texts = future.result()
+                        if self.uses_text_layer:
+                            text_layer_index.add_pages(chunk[0][0], page_texts)
+                        record(chunk, chunk_results)
+                    QApplication.processEvents()
+                return results
+            except (BrokenProcessPool, OSError) as e:
+                # 某些受限环境下无法创建子进程，回退到串行模式
+                print(f"多进程提取不可用，回退到串行模式: {e}")
+                results.clear()
+            finally:
+                if executor is not None:
+                    # 正常完成时所有分块都已结束；取消或出错时丢弃排队的分块，不等待正在运行的分块
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+        for job in jobs:
+            if progress.wasCanceled():
+                return None
+            record([job], [self.extract_page(job[0], job[1], job[2], self.options)])
+        return results
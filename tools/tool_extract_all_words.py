@@ -1,16 +1,14 @@
 # D:\projects\singlepage\hotspot_editor\tools\tool_extract_all_words.py (已修复签名)
-import fitz
 import re
 
-from PySide6.QtCore import Qt, QRect
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QApplication, QMessageBox, QWidget, QFormLayout,
     QComboBox, QCheckBox, QLabel
 )
 
+from text_layer_index import text_layer_index
 from tools.base_tool import AbstractPdfTool
-from commands import BatchAddHotspotsCommand
-from utils import create_default_data
 
 
 class AllWordsOptionsWidget(QWidget):
@@ -45,6 +43,8 @@ class ExtractAllWordsTool(AbstractPdfTool):
         "自动扫描当前 PDF 页面中的所有独立单词，并为每一个单词创建一个热区。\n\n"
         "可自定义排除中文或英文，并指定生成热区的默认类型。"
     )
+    supports_batch = True
+    uses_text_layer = True
 
     # --- *** 核心修复: 添加 main_window 参数以匹配基类签名 *** ---
     def get_options_widget(self, main_window) -> QWidget:
@@ -54,36 +54,20 @@ class ExtractAllWordsTool(AbstractPdfTool):
 
     def run(self, main_window):
         session = main_window.active_session
-        if not session or not session.source_pdf_path:
+        pdf_source = self._get_pdf_page_source(session)
+        if not pdf_source:
             QMessageBox.warning(main_window, "操作无效", "此工具仅适用于从PDF文件导入的页面。")
             return
-
-        link_type = self.options.get('link_type', 'file')
-        exclude_chinese = self.options.get('exclude_chinese', True)
-        exclude_english = self.options.get('exclude_english', False)
+        pdf_path, page_index = pdf_source
 
         try:
-            image_pixel_width = session.scene.width()
-            doc = fitz.open(session.original_multipage_pdf_path or session.source_pdf_path)
-            page = doc.load_page(session.source_page_index)
-            page_point_width = page.rect.width
-            doc.close()
-            if page_point_width == 0:
-                raise ValueError("PDF页面宽度为0，无法计算缩放比例。")
-            scale_factor = image_pixel_width / page_point_width
+            scale_factor = self._compute_scale_factor(session, pdf_path, page_index)
         except Exception as e:
             QMessageBox.critical(main_window, "计算失败", f"无法计算正确的缩放比例: {e}")
             return
 
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        page_index = 0
-        success, result = self._get_word_hotspots(
-            session.source_pdf_path,
-            page_index,
-            scale_factor=scale_factor,
-            exclude_chinese=exclude_chinese,
-            exclude_english=exclude_english
-        )
+        success, result = self.extract_page(pdf_path, page_index, scale_factor, self.options)
         QApplication.restoreOverrideCursor()
 
         if not success:
@@ -101,34 +85,20 @@ class ExtractAllWordsTool(AbstractPdfTool):
         if reply == QMessageBox.No:
             return
 
-        hotspots_to_add = []
-        for hotspot_data in result:
-            q_rect = hotspot_data['rect']
-            pos = {'x': q_rect.x(), 'y': q_rect.y()}
-            rect = {'w': q_rect.width(), 'h': q_rect.height()}
-            data = create_default_data()
-            data['description'] = hotspot_data.get('description', '')
-            data['hotspot_type'] = link_type
-            hotspots_to_add.append({
-                'pos': pos, 'rect': rect, 'type': 'rectangle', 'data': data
-            })
-
-        command = BatchAddHotspotsCommand(session.scene, session.viewer, main_window, hotspots_to_add)
-        main_window.active_session.undo_stack.push(command)
+        self.push_hotspots(main_window, session, self.build_hotspots(result))
         QMessageBox.information(main_window, "操作成功", f"已成功为 {word_count} 个单词创建了热区。")
 
-    def _get_word_hotspots(self, pdf_path: str, page_num: int, scale_factor: float,
-                           exclude_chinese: bool, exclude_english: bool):
+    @staticmethod
+    def extract_page(pdf_path: str, page_num: int, scale_factor: float, options: dict):
+        exclude_chinese = options.get('exclude_chinese', True)
+        exclude_english = options.get('exclude_english', False)
         try:
-            doc = fitz.open(pdf_path)
+            # 单词来自文本层索引，同一个 PDF 只提取一次
+            words = text_layer_index.words(pdf_path, page_num)
+        except IndexError as e:
+            return False, str(e)
         except Exception as e:
             return False, f"无法打开PDF文件: {e}"
-        if not (0 <= page_num < len(doc)):
-            doc.close()
-            return False, f"页码 {page_num + 1} 超出范围"
-        page = doc[page_num]
-        words = page.get_text("words")
-        doc.close()
         if not words:
             return False, "在当前页面上未检测到任何单词。"
         RE_CHINESE = re.compile(r'[\u4e00-\u9fa5]')
@@ -142,13 +112,8 @@ class ExtractAllWordsTool(AbstractPdfTool):
             is_english = bool(RE_ENGLISH_LIKE.match(text))
             if exclude_chinese and is_chinese: continue
             if exclude_english and is_english: continue
-            pixel_rect = QRect(
-                int(x0 * scale_factor),
-                int(y0 * scale_factor),
-                int((x1 - x0) * scale_factor),
-                int((y1 - y0) * scale_factor)
-            )
-            if pixel_rect.width() < 1 or pixel_rect.height() < 1: continue
-            hotspot_info = { "rect": pixel_rect, "description": text }
-            hotspots.append(hotspot_info)
+            width, height = int((x1 - x0) * scale_factor), int((y1 - y0) * scale_factor)
+            if width < 1 or height < 1: continue
+            hotspots.append({"x": int(x0 * scale_factor), "y": int(y0 * scale_factor),
+                             "w": width, "h": height, "description": text})
         return True, hotspots
\ No newline at end of file
@@ -1,16 +1,18 @@
 # D:\projects\singlepage\hotspot_editor\tools\tool_extract_p_words.py (已优化默认参数)
 import fitz
 import re
-from PySide6.QtCore import Qt, QRect, QSettings
+import numpy as np
+from PySide6.QtCore import Qt, QSettings
 from PySide6.QtGui import QIntValidator
 from PySide6.QtWidgets import (
     QApplication, QMessageBox, QWidget, QFormLayout,
     QLineEdit, QLabel, QComboBox
 )
 
+from pdf_document_pool import pdf_document_pool
+from spatial_index import RectIndex, neighbours_in_groups, tolerance_groups
+from text_layer_index import text_layer_index
 from tools.base_tool import AbstractPdfTool
-from commands import BatchAddHotspotsCommand
-from utils import create_default_data
 
 
 # --- *** 核心修改 1/4: 让 PWordsOptionsWidget 接收 DPI 参数 *** ---
@@ -84,6 +86,8 @@ class ExtractPWordsTool(AbstractPdfTool):
         "根据指定的文本模式（默认为'p. *'）批量查找并创建热区。\n\n"
         "用户可以自定义生成热区的尺寸、偏移量，并对特殊的'p. *'模式进行上下文分析和高度调整，以适应段落间隔。"
     )
+    supports_batch = True
+    uses_text_layer = True
 
     # --- *** 核心修改 3/4: 在 get_options_widget 中读取 DPI 设置 *** ---
     def get_options_widget(self, main_window) -> QWidget:
@@ -100,45 +104,23 @@ class ExtractPWordsTool(AbstractPdfTool):
     def run(self, main_window):
         # ... (此方法的所有内容都保持不变) ...
         session = main_window.active_session
-        if not session or not session.source_pdf_path:
+        pdf_source = self._get_pdf_page_source(session)
+        if not pdf_source:
             QMessageBox.warning(main_window, "操作无效", "此工具仅适用于从PDF文件导入的页面。")
             return
+        pdf_path, page_index = pdf_source
 
-        def to_int(text_value, default_val):
-            return int(text_value) if text_value and text_value.lstrip('-').isdigit() else default_val
-
-        link_type = self.options.get('link_type', 'file')
-        pattern = self.options.get('pattern', 'p. *').strip()
-        if not pattern:
-            QMessageBox.warning(main_window, "输入错误", "查找的文本模式不能为空。")
+        if not self.validate_options(main_window):
             return
 
-        custom_width = to_int(self.options.get('custom_width'), None)
-        custom_height = to_int(self.options.get('custom_height'), None)
-        x_offset = to_int(self.options.get('x_offset'), 0)
-        y_offset = to_int(self.options.get('y_offset'), 0)
-        height_adjustment = to_int(self.options.get('height_adjustment'), 30)
-
         try:
-            image_pixel_width = session.scene.width()
-            doc = fitz.open(session.original_multipage_pdf_path or session.source_pdf_path)
-            page = doc.load_page(session.source_page_index)
-            page_point_width = page.rect.width
-            doc.close()
-            if page_point_width == 0:
-                raise ValueError("PDF页面宽度为0，无法计算缩放比例。")
-            scale_factor = image_pixel_width / page_point_width
+            scale_factor = self._compute_scale_factor(session, pdf_path, page_index)
         except Exception as e:
             QMessageBox.critical(main_window, "计算失败", f"无法计算正确的缩放比例: {e}")
             return
 
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        page_index = 0
-        success, result = self._get_text_pattern_hotspots(
-            session.source_pdf_path, page_index, pattern,
-            custom_width, custom_height, x_offset, y_offset, height_adjustment,
-            scale_factor=scale_factor
-        )
+        success, result = self.extract_page(pdf_path, page_index, scale_factor, self.options)
         QApplication.restoreOverrideCursor()
 
         if not success:
@@ -151,39 +133,48 @@ class ExtractPWordsTool(AbstractPdfTool):
         if reply == QMessageBox.No:
             return
 
-        hotspots_to_add = []
-        for hotspot_data in result:
-            q_rect = hotspot_data['rect']
-            pos = {'x': q_rect.x(), 'y': q_rect.y()}
-            rect = {'w': q_rect.width(), 'h': q_rect.height()}
-            data = create_default_data()
-            data['description'] = hotspot_data.get('description', '')
-            data['hotspot_type'] = link_type
-            hotspots_to_add.append({
-                'pos': pos, 'rect': rect, 'type': 'rectangle', 'data': data
-            })
-
-        command = BatchAddHotspotsCommand(session.scene, session.viewer, main_window, hotspots_to_add)
-        main_window.active_session.undo_stack.push(command)
-        QMessageBox.information(main_window, "操作成功", f"已成功创建 {len(hotspots_to_add)} 个热区。")
-
-    def _get_text_pattern_hotspots(self, pdf_path, page_num, pattern, custom_width, custom_height, x_offset, y_offset,
+        self.push_hotspots(main_window, session, self.build_hotspots(result))
+        QMessageBox.information(main_window, "操作成功", f"已成功创建 {len(result)} 个热区。")
+
+    def validate_options(self, main_window) -> bool:
+        if not self.options.get('pattern', 'p. *').strip():
+            QMessageBox.warning(main_window, "输入错误", "查找的文本模式不能为空。")
+            return False
+        return True
+
+    @staticmethod
+    def extract_page(pdf_path, page_num, scale_factor, options):
+        def to_int(text_value, default_val):
+            return int(text_value) if text_value and text_value.lstrip('-').isdigit() else default_val
+
+        return ExtractPWordsTool._get_text_pattern_hotspots(
+            pdf_path, page_num, options.get('pattern', 'p. *').strip(),
+            to_int(options.get('custom_width'), None), to_int(options.get('custom_height'), None),
+            to_int(options.get('x_offset'), 0), to_int(options.get('y_offset'), 0),
+            to_int(options.get('height_adjustment'), 30), scale_factor=scale_factor
+        )
+
+    @staticmethod
+    def _get_text_pattern_hotspots(pdf_path, page_num, pattern, custom_width, custom_height, x_offset, y_offset,
                                    height_adjustment, scale_factor):
-        # ... (此方法的所有内容都保持不变) ...
-        doc = None
         try:
-            doc = fitz.open(pdf_path)
+            layer = text_layer_index.get(pdf_path)
         except Exception as e:
             return False, f"无法打开PDF文件: {e}"
-        if not (0 <= page_num < len(doc)):
-            if doc: doc.close()
+        if not (0 <= page_num < layer.page_count):
             return False, f"页码 {page_num + 1} 超出范围"
-        page = doc[page_num]
+        # 单词来自文本层索引；页面对象只用于自定义文本的搜索和热区内文字的读取
+        with pdf_document_pool.borrow(pdf_path) as doc:
+            return ExtractPWordsTool._find_pattern_hotspots_on_page(doc[page_num], layer.words(page_num), page_num,
+                                                                    pattern, custom_width, custom_height,
+                                                                    x_offset, y_offset, height_adjustment, scale_factor)
+
+    @staticmethod
+    def _find_pattern_hotspots_on_page(page, words, page_num, pattern, custom_width, custom_height, x_offset, y_offset,
+                                       height_adjustment, scale_factor):
         found_rects_pdf = []
         if pattern.lower() == "p. *":
-            words = page.get_text("words")
             if not words:
-                doc.close();
                 return False, "页面上未检测到任何文本。"
             i = 0
             while i < len(words) - 1:
@@ -198,56 +189,42 @@ class ExtractPWordsTool(AbstractPdfTool):
         else:
             found_rects_pdf = page.search_for(pattern)
         if not found_rects_pdf:
-            doc.close()
             return False, f"在页面 {page_num + 1} 上未找到文本 '{pattern}'。"
-        final_rects_pixels = [fitz.Rect(r * scale_factor) for r in found_rects_pdf]
-        rect_ids_to_extend = set()
-        if pattern.lower() == "p. *":
-            columns = [];
-            tolerance = 10
-            for rect in sorted(final_rects_pixels, key=lambda r: r.x0):
-                placed = False
-                for col in columns:
-                    if abs(rect.x0 - col[0].x0) < tolerance:
-                        col.append(rect);
-                        placed = True;
-                        break
-                if not placed: columns.append([rect])
-            if not final_rects_pixels:
-                doc.close();
-                return False, "未找到矩形。"
-            avg_height = sum(r.height for r in final_rects_pixels) / len(final_rects_pixels)
-            for col in columns:
-                col.sort(key=lambda r: r.y0, reverse=True)
-                for i, current_rect in enumerate(col):
-                    if i < len(col) - 1:
-                        next_rect_above = col[i + 1]
-                        y_diff = current_rect.y0 - next_rect_above.y0
-                        if y_diff >= 2 * avg_height: rect_ids_to_extend.add(id(current_rect))
+        # --- *** 核心修改: 热区的分栏、高度扩展和文字读取都用数组批量计算 (见 spatial_index) *** ---
+        is_p_pattern = pattern.lower() == "p. *"
+        rects_px = np.array([tuple(r) for r in found_rects_pdf], dtype=np.float64).reshape(-1, 4) * scale_factor
+        extend = np.zeros(len(rects_px), dtype=bool)
+        if is_p_pattern:
+            # 按 x0 分栏 (容差 10 像素)；每栏内从下往上，与上方相邻热区的距离不小于平均高度两倍的热区需要加高
+            order = np.argsort(rects_px[:, 0], kind='stable')
+            sorted_rects = rects_px[order]
+            columns = tolerance_groups(sorted_rects[:, 0], 10)
+            above = neighbours_in_groups(columns, sorted_rects[:, 1], descending=True)
+            avg_height = float(np.mean(sorted_rects[:, 3] - sorted_rects[:, 1]))
+            has_above = above >= 0
+            extend[order[has_above]] = (sorted_rects[has_above, 1] - sorted_rects[above[has_above], 1]
+                                        >= 2 * avg_height)
+
+        offset_x1 = rects_px[:, 2] + x_offset
+        offset_y1 = rects_px[:, 3] + y_offset
+        final_w = np.full(len(rects_px), custom_width, dtype=np.float64) if custom_width is not None \
+            else rects_px[:, 2] - rects_px[:, 0]
+        final_h = np.full(len(rects_px), custom_height, dtype=np.float64) if custom_height is not None \
+            else rects_px[:, 3] - rects_px[:, 1]
+        final_h = final_h + np.where(extend, height_adjustment, 0)
+        final_x = offset_x1 - final_w
+        final_y = offset_y1 - final_h
+
+        # 热区内的文字: 与热区 (换算回 PDF 坐标) 相交的单词，按阅读顺序拼接 (page.get_textbox 会截断单词)
+        word_index = RectIndex([w[:4] for w in words])
+        extract_rects = np.column_stack([final_x, final_y, final_x + final_w, final_y + final_h]) / scale_factor
         hotspots = []
-        for rect in final_rects_pixels:
-            offset_rect_px = fitz.Rect(rect)
-            offset_rect_px.x0 += x_offset;
-            offset_rect_px.y0 += y_offset
-            offset_rect_px.x1 += x_offset;
-            offset_rect_px.y1 += y_offset
-            final_w_px = custom_width if custom_width is not None else offset_rect_px.width
-            final_h_px = custom_height if custom_height is not None else offset_rect_px.height
-            if pattern.lower() == "p. *" and id(rect) in rect_ids_to_extend:
-                final_h_px += height_adjustment
-            final_x_px = offset_rect_px.x1 - final_w_px
-            final_y_px = offset_rect_px.y1 - final_h_px
-            q_rect_px = QRect(int(final_x_px), int(final_y_px), int(final_w_px), int(final_h_px))
-            pdf_rect_to_extract = fitz.Rect(
-                final_x_px / scale_factor, final_y_px / scale_factor,
-                (final_x_px + final_w_px) / scale_factor, (final_y_px + final_h_px) / scale_factor
-            )
-            extracted_text = page.get_textbox(pdf_rect_to_extract)
+        for x, y, w, h, word_indices in zip(final_x.tolist(), final_y.tolist(), final_w.tolist(), final_h.tolist(),
+                                            word_index.query_many(extract_rects)):
+            extracted_text = " ".join(words[i][4] for i in word_indices.tolist())
             clean_text = re.sub(r'\s+', ' ', extracted_text).strip()
-            if pattern.lower() == "p. *":
+            if is_p_pattern:
                 clean_text = re.sub(r'p\.\s*\d+\s*', '', clean_text, flags=re.IGNORECASE).strip()
-            hotspot = {"rect": q_rect_px, "description": clean_text}
+            hotspot = {"x": int(x), "y": int(y), "w": int(w), "h": int(h), "description": clean_text}
             hotspots.append(hotspot)
-        if doc:
-            doc.close()
         return True, hotspots
\ No newline at end of file
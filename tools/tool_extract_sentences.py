@@ -7,9 +7,9 @@ from PySide6.QtWidgets import (
     QComboBox, QLabel
 )
 
+from sentence_alignment import SentenceAlignment
+from text_layer_index import text_layer_index
 from tools.base_tool import AbstractPdfTool
-from commands import BatchAddHotspotsCommand
-from utils import create_default_data
 
 
 class SentenceOptionsWidget(QWidget):
@@ -33,6 +33,8 @@ class SentenceOptionsWidget(QWidget):
 class AutoHotspotFromSentencesTool(AbstractPdfTool):
     name = "从英文句子创建热区"
     description = "自动扫描当前 PDF 页面中的所有英文文本，使用NLTK库进行句子分割，并为每个句子（或其跨行部分）创建一个热区。\n\n注意：对非标准文本布局或图文混排页面，效果可能不佳。"
+    supports_batch = True
+    uses_text_layer = True
 
     # --- *** 核心修复: 添加 main_window 参数以匹配基类签名 *** ---
     def get_options_widget(self, main_window) -> QWidget:
@@ -41,27 +43,20 @@ class AutoHotspotFromSentencesTool(AbstractPdfTool):
 
     def run(self, main_window):
         session = main_window.active_session
-        if not session or not session.source_pdf_path:
+        pdf_source = self._get_pdf_page_source(session)
+        if not pdf_source:
             QMessageBox.warning(main_window, "操作无效", "此工具仅适用于从PDF文件导入的页面。")
             return
-
-        link_type = self.options.get('link_type', 'file')
+        pdf_path, page_index = pdf_source
 
         try:
-            image_pixel_width = session.scene.width()
-            doc = fitz.open(session.original_multipage_pdf_path or session.source_pdf_path)
-            page = doc.load_page(session.source_page_index)
-            page_point_width = page.rect.width
-            doc.close()
-            if page_point_width == 0:
-                raise ValueError("PDF页面宽度为0，无法计算缩放比例。")
-            scale_factor = image_pixel_width / page_point_width
+            scale_factor = self._compute_scale_factor(session, pdf_path, page_index)
         except Exception as e:
             QMessageBox.critical(main_window, "计算失败", f"无法计算正确的缩放比例: {e}")
             return
 
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        success, result = self._extract_sentences_with_coords(session.source_pdf_path, 0)
+        success, result = self.extract_page(pdf_path, page_index, scale_factor, self.options)
         QApplication.restoreOverrideCursor()
 
         if not success:
@@ -76,51 +71,35 @@ class AutoHotspotFromSentencesTool(AbstractPdfTool):
         if reply == QMessageBox.No:
             return
 
-        hotspots_to_add = []
-        for sentence_info in result:
-            pos = {'x': sentence_info['x'] * scale_factor, 'y': sentence_info['y'] * scale_factor}
-            rect = {'w': sentence_info['width'] * scale_factor, 'h': sentence_info['height'] * scale_factor}
-            data = create_default_data()
-            data['description'] = sentence_info.get('full_text', '')
-            data['hotspot_type'] = link_type
-            hotspots_to_add.append({'pos': pos, 'rect': rect, 'type': 'rectangle', 'data': data})
-
-        command = BatchAddHotspotsCommand(session.scene, session.viewer, main_window, hotspots_to_add)
-        main_window.active_session.undo_stack.push(command)
-        QMessageBox.information(main_window, "操作成功", f"已成功创建 {len(hotspots_to_add)} 个热区。")
+        self.push_hotspots(main_window, session, self.build_hotspots(result))
+        QMessageBox.information(main_window, "操作成功", f"已成功创建 {sentence_parts_count} 个热区。")
 
-    def _extract_sentences_with_coords(self, pdf_path, page_num):
+    @staticmethod
+    def extract_page(pdf_path, page_num, scale_factor, options):
+        success, result = AutoHotspotFromSentencesTool._extract_sentences_with_coords(pdf_path, page_num)
+        if not success:
+            return success, result
+        return True, [{"x": info['x'] * scale_factor, "y": info['y'] * scale_factor,
+                       "w": info['width'] * scale_factor, "h": info['height'] * scale_factor,
+                       "description": info['full_text'], "sentence_id": info['sentence_id']}
+                      for info in result]
+
+    @staticmethod
+    def _extract_sentences_with_coords(pdf_path, page_num):
         try:
-            doc = fitz.open(pdf_path)
-            if not 0 <= page_num < len(doc):
-                doc.close()
+            layer = text_layer_index.get(pdf_path)
+            if not 0 <= page_num < layer.page_count:
                 return False, f"错误: 页面索引 {page_num} 超出范围。"
-            page = doc[page_num]
-            words = page.get_text("words")
+            words = layer.words(page_num)
             if not words:
-                doc.close()
                 return False, f"在页面 {page_num + 1} 上未找到任何文本。"
             words.sort(key=lambda w: (w[3], w[0]))
-            full_text = " ".join(w[4] for w in words)
-            sentences = nltk.sent_tokenize(full_text)
+            # --- *** 核心修改: 按字符偏移一次性把句子映射回单词，不再逐词拼接比较 *** ---
+            alignment = SentenceAlignment(words)
+            sentences = nltk.sent_tokenize(alignment.text)
             all_sentence_parts_info = []
-            word_idx = 0
-            for sent_idx, sentence_text in enumerate(sentences):
-                target_word_combo = "".join(sentence_text.replace(" ", ""))
-                current_sentence_words = []
-                buffer_word_combo = ""
-                start_word_idx = word_idx
-                while word_idx < len(words):
-                    word_info = words[word_idx]
-                    current_sentence_words.append(word_info)
-                    buffer_word_combo += word_info[4]
-                    word_idx += 1
-                    if "".join(buffer_word_combo.split()) == target_word_combo:
-                        break
-                else:
-                    word_idx = start_word_idx
-                    print(f"警告：无法精确匹配句子 '{sentence_text}'，可能已被跳过。")
-                    continue
+            for sent_idx, (sentence_text, first_word, end_word) in enumerate(alignment.align(sentences)):
+                current_sentence_words = words[first_word:end_word]
                 lines = {}
                 for word_info in current_sentence_words:
                     line_key = round(word_info[1])
@@ -143,7 +122,6 @@ class AutoHotspotFromSentencesTool(AbstractPdfTool):
                     }
                     all_sentence_parts_info.append(info)
                     part_num += 1
-            doc.close()
             if not all_sentence_parts_info:
                 return False, f"在页面 {page_num + 1} 上未能成功提取和映射句子。"
             return True, all_sentence_parts_info
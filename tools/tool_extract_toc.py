@@ -1,11 +1,11 @@
 # D:\projects\singlepage\hotspot_editor\tools\tool_extract_toc.py (已修复签名)
 import re
-import fitz
 import os
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (QMessageBox, QApplication, QWidget, QFormLayout,
                                QLineEdit, QLabel)
 
+from text_layer_index import text_layer_index
 from tools.base_tool import AbstractPdfTool
 
 
@@ -147,27 +147,18 @@ class ExtractTocTool(AbstractPdfTool):
     def _process_pdf_pages_to_lines(self, pdf_path, page_indices):
         all_lines_data = []
         try:
-            with open(pdf_path, "rb") as pdf_file:
-                pdf_data = pdf_file.read()
-            doc = fitz.open(stream=pdf_data, filetype="pdf")
-
+            # 文本行来自文本层索引，同一个 PDF 只提取一次
+            layer = text_layer_index.get(pdf_path)
             for page_num in page_indices:
-                if not (0 <= page_num < len(doc)): continue
-                page = doc[page_num]
-                blocks = page.get_text("dict")["blocks"]
-                for b in blocks:
-                    if b['type'] == 0:
-                        for l in b["lines"]:
-                            spans = l['spans']
-                            if not spans: continue
-                            text = "".join(s['text'] for s in spans).strip()
-                            if not text or "目录" in text or "contents" in text.lower(): continue
-                            text = re.sub(r'\s+', ' ', text).strip()
-                            text = re.sub(r'[\. ]{3,}', ' ', text).strip()
-                            all_lines_data.append({
-                                'text': text, 'x': l['bbox'][0], 'y': l['bbox'][1], 'size': spans[0]['size']
-                            })
-            doc.close()
+                if not (0 <= page_num < layer.page_count): continue
+                for l in layer.lines(page_num):
+                    text = l['text'].strip()
+                    if not text or "目录" in text or "contents" in text.lower(): continue
+                    text = re.sub(r'\s+', ' ', text).strip()
+                    text = re.sub(r'[\. ]{3,}', ' ', text).strip()
+                    all_lines_data.append({
+                        'text': text, 'x': l['bbox'][0], 'y': l['bbox'][1], 'size': l['size']
+                    })
             return all_lines_data
         except Exception as e:
             return f"错误：处理PDF时发生未知异常: {e}"